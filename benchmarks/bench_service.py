@@ -0,0 +1,143 @@
+"""Load test for the prediction service (pumpkin_service.py).
+
+Opens ``--connections`` keep-alive connections to a localhost instance and
+sends /predict requests as fast as each connection gets answers, for
+``--duration`` seconds.  ``--edit-every N`` makes every Nth request a new
+shot instead, so predictions are measured while the model is hot-swapped.
+
+    python benchmarks/bench_service.py --spawn --connections 32 --duration 10
+    python benchmarks/bench_service.py --port 8765 --batch 100 -o service.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def request(reader, writer, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        if key.strip().lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, deadline, batch, edit_every, seed, latencies, counts):
+    rng = np.random.default_rng(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            i += 1
+            if edit_every and i % edit_every == 0:
+                m, p = rng.uniform(600, 1250), rng.uniform(550, 950)
+                path, payload = '/edits', {'edits': [{'op': 'add', 'row': [m, p, -30 - 0.14 * m + 0.42 * p]}]}
+            elif batch > 1:
+                path, payload = '/predict', {'mass': rng.uniform(600, 1250, batch).tolist(),
+                                             'distance': rng.uniform(50, 200, batch).tolist()}
+            else:
+                path, payload = '/predict', {'mass': rng.uniform(600, 1250), 'distance': rng.uniform(50, 200)}
+            start = time.perf_counter()
+            status = await request(reader, writer, path, payload)
+            latencies.append(time.perf_counter() - start)
+            counts['ok' if status == 200 else 'errors'] += 1
+            if status == 200 and path == '/predict':
+                counts['predictions'] += batch
+    finally:
+        writer.close()
+
+
+async def load_test(host, port, connections, duration, batch, edit_every):
+    latencies, counts = [], {'ok': 0, 'errors': 0, 'predictions': 0}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(host, port, deadline, batch, edit_every, seed, latencies, counts)
+                           for seed in range(connections)))
+    elapsed = time.perf_counter() - start
+    ms = np.array(latencies) * 1000
+    return {'connections': connections, 'batch': batch, 'edit_every': edit_every,
+            'requests': len(ms), **counts, 'seconds': elapsed,
+            'requests_per_s': len(ms) / elapsed,
+            'predictions_per_s': counts['predictions'] / elapsed,
+            'p50_ms': float(np.percentile(ms, 50)) if len(ms) else None,
+            'p99_ms': float(np.percentile(ms, 99)) if len(ms) else None}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"service on {host}:{port} did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--spawn', action='store_true',
+                        help="start a service on a temporary copy of the 2024 season CSV")
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--batch', type=int, default=1, help="predictions per request")
+    parser.add_argument('--edit-every', type=int, default=0, help="every Nth request adds a shot")
+    parser.add_argument('-o', '--output', help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    proc = tmp = None
+    if args.spawn:
+        tmp = tempfile.mkdtemp()
+        path = os.path.join(tmp, 'pumpkin.csv')
+        shutil.copy(os.path.join(REPO, 'pumpkin 2024.csv'), path)
+        args.port = free_port()
+        proc = subprocess.Popen([sys.executable, 'pumpkin_service.py', path,
+                                 '--host', args.host, '--port', str(args.port)],
+                                cwd=REPO, stdout=subprocess.DEVNULL)
+    try:
+        wait_for(args.host, args.port)
+        results = asyncio.run(load_test(args.host, args.port, args.connections,
+                                        args.duration, args.batch, args.edit_every))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Startup-time benchmark for the model core.
+
+Each measurement runs in a fresh interpreter so import costs are included:
+
+- ``import``: everything p-LR-model.py imports before its window appears
+- ``plot_import``: the plotting modules (matplotlib, seaborn) imported on a
+  thread when the plot pane is first shown
+- ``cold``:   first start on a data file (parse, fit, write the cache)
+- ``warm``:   start with unchanged data (hash the files, load the cache)
+
+    python benchmarks/bench_startup.py --rows 100000 --repeat 5 -o startup.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Keep in step with the top-level imports of p-LR-model.py, so a module that
+# starts importing something slow (e.g. scipy) shows up here
+IMPORT_SNIPPET = """
+import numpy, tkinter, tkinter.ttk, tkinter.filedialog, tkinter.messagebox, tkinter.simpledialog
+import pumpkin_profile, pumpkin_store, pumpkin_service, pumpkin_watch, pumpkin_table
+import pumpkin_worker, pumpkin_edits, pumpkin_influence, pumpkin_intervals, pumpkin_model
+"""
+
+PLOT_IMPORT_SNIPPET = """
+import matplotlib.pyplot, matplotlib.backends.backend_tkagg, pumpkin_plot
+"""
+
+STARTUP_SNIPPET = """
+import sys
+from pumpkin_store import ShotStore
+from pumpkin_model import RunningFit, cached_fit, FEATURE_COLS, DIST_COL
+path = sys.argv[1]
+store = ShotStore(path)
+def data():
+    df = store.load()
+    return df[FEATURE_COLS].values, df[DIST_COL].values
+cached_fit(path + '.model.json', store.files(), RunningFit(), data, with_rows=True)
+store.close()  # No-op unless the data was loaded
+"""
+
+
+def write_synthetic_csv(path, rows, seed=0):
+    # Same schema as the season CSVs, roughly the same value ranges
+    rng = np.random.default_rng(seed)
+    mass = rng.uniform(600, 1250, rows).round()
+    pull = rng.uniform(550, 950, rows).round()
+    dist = (-30 - 0.14 * mass + 0.42 * pull + rng.normal(0, 15, rows)).round()
+    np.savetxt(path, np.c_[mass, pull, dist], fmt='%.1f', delimiter=',',
+               header='mass(g),pull strength(lbs),distance feet', comments='')
+
+
+def run(snippet, *args):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', snippet, *args], cwd=REPO, check=True)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=0, help="synthetic rows (default: the 2024 season CSV)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('-o', '--output', help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = {'rows': args.rows, 'repeat': args.repeat}
+    timings = {'import': [], 'plot_import': [], 'cold': [], 'warm': []}
+    for _ in range(args.repeat):
+        timings['import'].append(run(IMPORT_SNIPPET))
+        timings['plot_import'].append(run(PLOT_IMPORT_SNIPPET))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'pumpkin.csv')
+            if args.rows:
+                write_synthetic_csv(path, args.rows)
+            else:
+                shutil.copy(os.path.join(REPO, 'pumpkin 2024.csv'), path)
+            timings['cold'].append(run(STARTUP_SNIPPET, path))
+            timings['warm'].append(run(STARTUP_SNIPPET, path))
+    for name, values in timings.items():
+        results[name + '_s'] = {'median': statistics.median(values), 'min': min(values), 'max': max(values)}
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""Benchmark suite for the model, I/O, table and plot hot paths.
+
+Synthetic shot logs in the schema of ``pumpkin 2024.csv`` are generated for
+each ``--sizes`` entry (10 rows up to 10M; files are kept in ``--data-dir``
+between runs) and each case is timed ``--repeat`` times:
+
+- ``csv_load``:        ``pd.read_csv`` of the shot log
+- ``refit``:           what ``refit_from_df`` does (running statistics + batch fit)
+- ``force_scalar``:    ``calculate_force`` one shot at a time (per prediction)
+- ``force_batched``:   one vectorized ``calculate_force`` call (per prediction)
+- ``mesh``:            the ``create_plot`` wireframe and interval-band meshes
+- ``agg_render``:      a full offscreen Agg render of the 3D scene
+- ``table_refresh``:   a Data Collection table refresh (needs a display; an
+                       ``Xvfb`` virtual display is started when there is none)
+
+Results are written as JSON.  With ``--baseline`` the run is compared to an
+earlier JSON and exits non-zero when a case got slower than ``--threshold``.
+Differences within the noise are not counted: under ``--noise-floor-us`` per
+timed run, or within ``IQR_FACTOR`` interquartile ranges of the baseline's
+repeats.
+
+    python benchmarks/bench_suite.py --sizes 10 1000 100000 -o bench.json
+    python benchmarks/bench_suite.py --sizes 10 1000 100000 --baseline bench.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from bench_startup import write_synthetic_csv  # noqa: E402
+from pumpkin_model import RunningFit, batch_theta, predict_pull, FEATURE_COLS, DIST_COL  # noqa: E402
+
+SCALAR_CALLS = 10_000     # Cap on one-at-a-time predictions per repeat
+IQR_FACTOR = 3.0          # A slowdown within this many baseline IQRs is noise
+RENDER_MAX_ROWS = 1_000_000  # Larger scatters are skipped for agg_render
+TABLE_MAX_ROWS = 1_000_000   # Larger logs are skipped for table_refresh
+
+
+def timeit(func, repeat, per=1):
+    # Median/min/max/IQR seconds of func() over `repeat` runs, divided by `per`
+    # (recorded as 'calls', so the noise floor applies to the whole run)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) / per)
+    q1, _, q3 = statistics.quantiles(times, n=4) if len(times) > 1 else (times[0],) * 3
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'max_s': max(times),
+            'iqr_s': q3 - q1, 'calls': per}
+
+
+def data_file(data_dir, rows):
+    path = os.path.join(data_dir, f'synthetic_{rows}.csv')
+    if not os.path.exists(path):
+        write_synthetic_csv(path + '.tmp', rows)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def virtual_display():
+    # Returns an Xvfb process when one had to be started, else None
+    if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+        return None
+    if shutil.which('Xvfb') is None:
+        return None
+    display = ':%d' % (90 + os.getpid() % 10)
+    proc = subprocess.Popen(['Xvfb', display, '-screen', '0', '1920x1080x24'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ['DISPLAY'] = display
+    time.sleep(1.0)
+    return proc
+
+
+def bench_size(path, rows, repeat, tk_root):
+    import pandas as pd
+    results = {}
+    results['csv_load'] = timeit(lambda: pd.read_csv(path), repeat)
+    df = pd.read_csv(path)
+
+    def refit():
+        X = df[FEATURE_COLS].values
+        y = df[DIST_COL].values
+        RunningFit().reset(X, y)
+        return batch_theta(X, y)
+    results['refit'] = timeit(refit, repeat)
+    theta = refit()
+
+    mass = df['mass(g)'].values
+    dist = df[DIST_COL].values
+    k = min(rows, SCALAR_CALLS)
+    scalar_mass, scalar_dist = mass[:k].tolist(), dist[:k].tolist()
+
+    def force_scalar():
+        for m, d in zip(scalar_mass, scalar_dist):
+            predict_pull(theta, m, d)
+    results['force_scalar'] = timeit(force_scalar, repeat, per=k)
+    results['force_batched'] = timeit(lambda: predict_pull(theta, mass, dist), repeat, per=rows)
+
+    from pumpkin_intervals import ols_uncertainty, analytic_interval
+    from pumpkin_plot import wireframe_mesh
+    fit = RunningFit()
+    fit.reset(df[FEATURE_COLS].values, dist)
+    _, cov, s2, dof = ols_uncertainty(fit.n, fit.mean, fit.comoment)
+
+    def mesh():
+        mesh = wireframe_mesh(theta, (mass.min(), mass.max()), (dist.min(), dist.max()))
+        analytic_interval(theta, cov, s2, dof, mesh[0], mesh[2])
+    results['mesh'] = timeit(mesh, repeat)
+
+    if rows <= RENDER_MAX_ROWS:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from pumpkin_plot import ScenePlot
+        fig = Figure(figsize=(8, 5), dpi=100)
+        canvas = FigureCanvasAgg(fig)
+        scene = ScenePlot(fig.add_subplot(111, projection='3d'), canvas)
+        pull = df['pull strength(lbs)'].values
+        scene.set_data(mass, pull, dist)
+        scene.set_model(theta, (mass.min(), mass.max()), (dist.min(), dist.max()),
+                        interval=lambda m, d: analytic_interval(theta, cov, s2, dof, m, d)[2])
+        results['agg_render'] = timeit(canvas.draw, repeat)
+    else:
+        results['agg_render'] = {'skipped': f'more than {RENDER_MAX_ROWS} rows'}
+
+    if tk_root is None:
+        results['table_refresh'] = {'skipped': 'no display'}
+    elif rows > TABLE_MAX_ROWS:
+        results['table_refresh'] = {'skipped': f'more than {TABLE_MAX_ROWS} rows'}
+    else:
+        from tkinter import ttk
+        from pumpkin_table import VirtualTable
+        frame = ttk.Frame(tk_root)
+        frame.pack(fill='both', expand=True)
+        cols = list(df.columns)
+        tree = ttk.Treeview(frame, columns=cols, show='headings')
+        vscroll = ttk.Scrollbar(frame)
+        tree.pack(fill='both', expand=True)
+        table = VirtualTable(tree, vscroll, cols)
+
+        def refresh():
+            table.set_rows(df)
+            tk_root.update_idletasks()
+        results['table_refresh'] = timeit(refresh, repeat)
+        frame.destroy()
+    return results
+
+
+def compare(results, baseline, threshold, noise_floor=50e-6):
+    # Returns the list of (case, old median, new median) that regressed: slower
+    # by more than threshold, by more than noise_floor seconds per timed run,
+    # and by more than IQR_FACTOR of the baseline's interquartile ranges
+    regressions = []
+    for case, new in results['cases'].items():
+        old = baseline.get('cases', {}).get(case)
+        if old and 'median_s' in old and 'median_s' in new:
+            slower = new['median_s'] - old['median_s']
+            if (new['median_s'] > old['median_s'] * (1 + threshold)
+                    and slower * new.get('calls', 1) > noise_floor
+                    and slower > IQR_FACTOR * old.get('iqr_s', 0.0)):
+                regressions.append((case, old['median_s'], new['median_s']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100_000, 1_000_000],
+                        help="synthetic log sizes in rows (up to 10000000)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--data-dir', default=os.path.join(REPO, 'benchmarks', '.data'),
+                        help="where generated shot logs are kept between runs")
+    parser.add_argument('-o', '--output', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown of a median before it counts as a regression")
+    parser.add_argument('--noise-floor-us', type=float, default=50.0,
+                        help="slowdowns under this many microseconds per timed run are noise (default: 50)")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    import pandas as pd
+    matplotlib.use('Agg')
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    xvfb = virtual_display()
+    try:
+        import tkinter as tk
+        try:
+            tk_root = tk.Tk()
+            tk_root.geometry('900x700')
+        except tk.TclError:
+            tk_root = None
+
+        results = {'meta': {'python': platform.python_version(), 'numpy': np.__version__,
+                            'pandas': pd.__version__, 'matplotlib': matplotlib.__version__,
+                            'machine': platform.machine(), 'system': platform.system(),
+                            'repeat': args.repeat, 'sizes': args.sizes},
+                   'cases': {}}
+        for rows in args.sizes:
+            path = data_file(args.data_dir, rows)
+            for case, timing in bench_size(path, rows, args.repeat, tk_root).items():
+                results['cases'][f'{case}/{rows}'] = timing
+        if tk_root is not None:
+            tk_root.destroy()
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.noise_floor_us * 1e-6)
+        for case, old, new in regressions:
+            print(f"REGRESSION {case}: {old * 1e3:.3f} ms -> {new * 1e3:.3f} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
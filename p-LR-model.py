@@ -1,99 +1,438 @@
-import pandas as pd
+import os
+import sys
+import threading
 import numpy as np
 import tkinter as tk
-from tkinter import messagebox, ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import seaborn as sns
+from tkinter import filedialog, messagebox, simpledialog, ttk
+import pumpkin_profile
+from pumpkin_profile import span, timed
+if '--profile' in sys.argv:
+    pumpkin_profile.enable()  # Same as PUMPKIN_PROFILE=1; must run before the @timed functions below
+from pumpkin_store import ShotStore
+from pumpkin_service import RemoteStore
+from pumpkin_watch import CsvTail
+from pumpkin_table import VirtualTable
+from pumpkin_worker import ModelWorker, BatchError
+from pumpkin_edits import EditHistory, check_transaction, parse_rows, read_rows
+from pumpkin_influence import influence
+from pumpkin_intervals import ols_uncertainty, analytic_interval, bootstrap_interval
+from pumpkin_model import (RunningFit, batch_theta, predict_pull, cached_fit, data_digest,
+                           save_fit_cache, FEATURE_COLS, DIST_COL)
+# pandas, matplotlib and seaborn are imported lazily (see ensure_data / build_plot)
 
-# Load the data from the CSV file
-file_path = 'C:/Users/morei/OneDrive/Connor The Maker/Pumpkin Launcher/pumpkin (1).csv'  # Adjust this path
-df = pd.read_csv(file_path)
+# Location of the CSV data file (override with the PUMPKIN_DATA environment variable)
+file_path = os.environ.get('PUMPKIN_DATA',
+                           'C:/Users/morei/OneDrive/Connor The Maker/Pumpkin Launcher/pumpkin (1).csv')  # Adjust this path
+# Point at a shared pumpkin_service instance instead (e.g. http://127.0.0.1:8765) with PUMPKIN_SERVICE
+service_url = os.environ.get('PUMPKIN_SERVICE')
+if service_url:
+    store = RemoteStore(service_url)  # Shots and edits live in the service; no local CSV
+else:
+    store = ShotStore(file_path)  # Edits are journaled next to the CSV, which is kept as an export
+cache_path = file_path + '.model.json'  # Fitted coefficients keyed by a hash of the data files
+df = None  # Loaded on first use; indexed by stable row id
+data_lock = threading.RLock()  # Guards df and running_fit, which the model worker mutates
 
-# Globals for model matrices
+def ensure_data():
+    # Parse the shot log the first time the table, plot or a full refit needs it
+    global df
+    with data_lock:
+        if df is None:
+            df = store.load()
+        return df
+
+# Globals for the fitted model
 theta_best = None
-X_b = None
+running_fit = RunningFit()  # Sufficient statistics for O(1) refits on edits
+
+def df_arrays():
+    ensure_data()
+    X = df[FEATURE_COLS].values  # Features: mass and pull strength
+    y = df[DIST_COL].values  # Target variable: distance
+    return X, y
 
 # --- Refit helper (recomputes theta_best from current df) ---
+@timed('refit_from_df')
 def refit_from_df():
-    global theta_best, X_b
-    X = df[['mass(g)', 'pull strength(lbs)']].values  # Features: mass and pull strength
-    y = df['distance feet'].values  # Target variable: distance
-    X_b = np.c_[np.ones(X.shape[0]), X]  # Add bias term
+    global theta_best
+    X, y = df_arrays()
+    running_fit.reset(X, y)
+    theta_best = batch_theta(X, y)
+
+# Compute initial coefficients (from the cache when the data files are unchanged).
+# startup_rows: (n, 3) [mass, pull, distance] cached with them, which the first
+# plot and the first file-watcher read use while df is still unparsed
+startup_rows = None
+if service_url:
+    refit_from_df()
+else:
+    theta_best, startup_rows = cached_fit(cache_path, store.files(), running_fit, data=df_arrays,
+                                          with_rows=True)
+# (theta, coefficient covariance, s^2, dof) for the interval columns and plot band
+model_uncertainty = ols_uncertainty(running_fit.n, running_fit.mean, running_fit.comoment)
+plot_data = None  # (mass, pull, distance) arrays behind the displayed model
+model_influence = None  # Influence diagnostics of the displayed model (while wanted)
+show_influence = False  # Compute diagnostics after each refit (Data Collection open)
+exclude_flagged = False  # Fit the model without the flagged rows
+# Rows the worker changed that the Data Collection window did not (file watcher,
+# other stations, undo/redo); kept until the Tk thread shows them, since only the
+# newest worker result is published.  A None row was deleted; None instead of
+# the dict means the table needs a full refresh.
+table_backlog = {}
+history = EditHistory()  # Undo/redo of Data Collection edits, as row deltas (guarded by data_lock)
+edit_notes = []  # Undo/redo outcomes for the Data Collection status line
+CONFIRM_DELETE_ROWS = 3  # Ask before deleting more rows than this (the undo history ends with the session)
+
+# Follows rows that other tools append to the CSV (not used with a shared service).
+# The first read resumes from the store's last export, so rows appended while
+# the GUI was closed are picked up before the next compaction re-exports the CSV.
+csv_tail = None if service_url else CsvTail(file_path)
+tail_queued = False
+
+@timed('snapshot_plot_data')
+def snapshot_plot_data():
+    with data_lock:
+        ensure_data()
+        return tuple(df[c].values.copy() for c in ('mass(g)', 'pull strength(lbs)', 'distance feet'))
+
+def apply_transaction(ids, rows, added):
+    # Caller holds data_lock.  rows[i] is the new value of ids[i] (a NaN row
+    # deletes it); ids not flagged `added` only change rows that still exist.
+    # One journal record, one vectorized DataFrame and running-fit update.
+    # Returns (ids, before, after) of the rows that actually changed, or None.
+    import pandas as pd
+    global df
+    cols = ['mass(g)', 'pull strength(lbs)', 'distance feet']
+    ids = np.asarray(ids, dtype=np.int64)
+    rows = np.asarray(rows, dtype=float).reshape(-1, 3)
+    added = np.asarray(added, dtype=bool)
+    exists = np.isin(ids, df.index.values)
+    keep = exists | added
+    ids, rows, exists, added = ids[keep], rows[keep], exists[keep], added[keep]
+    before = np.full_like(rows, np.nan)
+    before[exists] = df.loc[ids[exists], cols].values
+    deleted = np.isnan(rows[:, 0])
+    same = (before == rows).all(axis=1) | (deleted & ~exists)
+    ids, rows, before, exists, deleted, added = (a[~same] for a in (ids, rows, before, exists, deleted, added))
+    if not len(ids):
+        return None
+
+    # The flags go along so a shared service does not bring back rows another station deleted
+    store.commit(ids.tolist(), rows.tolist(), added.tolist())
+    old, new = before[exists], rows[~deleted]
+    running_fit.retract(old[:, :2], old[:, 2])
+    running_fit.extend(new[:, :2], new[:, 2])
+    if deleted.any():
+        df = df.drop(index=ids[deleted])
+    changed = exists & ~deleted
+    if changed.any():
+        df.loc[ids[changed], cols] = rows[changed]
+    inserted = ~exists & ~deleted
+    if inserted.any():
+        df = pd.concat([df, pd.DataFrame(rows[inserted], index=ids[inserted], columns=cols)])
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()  # Undone deletes come back at their old ids
+    return ids, before, rows
+
+def apply_edit(op, arg, payload):
+    # Caller holds data_lock.  Applies one queued edit to the store, df and
+    # running_fit; returns False when it turned out to change nothing.
+    # A poll or tail read that finds nothing new does not parse the data.
+    import pandas as pd
+    global df, table_backlog, tail_queued
+    cols = ['mass(g)', 'pull strength(lbs)', 'distance feet']
+    if op in ('txn', 'undo', 'redo'):
+        ensure_data()
+    if op == 'poll':
+        # Shots logged by other stations?  (HTTP, so here rather than on the Tk thread)
+        try:
+            store.model()
+        except OSError:
+            return False  # Service unreachable; try again next round
+        if not store.stale:
+            return False
+        op = 'reload'
+    if op == 'txn':
+        # arg: label for the undo history; payload: (ids, rows, added)
+        ids, rows, added = payload
+        if ids is None:
+            # Rows added with a shared service: reserving their ids is an HTTP
+            # call, so it happens here and the table shows them once applied
+            ids = store.new_ids(len(rows))
+            if table_backlog is not None:
+                table_backlog.update(zip(ids, map(tuple, np.asarray(rows, dtype=float).tolist())))
+        applied = apply_transaction(ids, rows, added)
+        if applied is not None:
+            history.record(arg, *applied)
+    elif op in ('undo', 'redo'):
+        delta = history.undo() if op == 'undo' else history.redo()
+        if delta is None:
+            edit_notes.append(f"Nothing to {op}")
+            return True
+        target, other = (delta.before, delta.after) if op == 'undo' else (delta.after, delta.before)
+        try:
+            applied = apply_transaction(delta.ids, target, np.isnan(other[:, 0]))
+        except Exception:
+            history.redo() if op == 'undo' else history.undo()  # Keep the step for a retry
+            raise
+        edit_notes.append(f"{'Undid' if op == 'undo' else 'Redid'}: {delta.label}")
+        if applied is not None and table_backlog is not None:
+            ids, _, rows = applied
+            table_backlog.update((i, None if np.isnan(r[0]) else tuple(r))
+                                 for i, r in zip(ids.tolist(), rows.tolist()))
+    elif op == 'refit':
+        pass  # Model settings changed; the refit below picks them up
+    elif op == 'reload':
+        # Another station changed the shared data: start over from the service
+        df = store.load()
+        running_fit.reset(*df_arrays())
+        history.clear()  # Row ids from before may be gone
+        table_backlog = None
+    elif op == 'tail':
+        tail_queued = False
+        checkpoint = csv_tail.checkpoint()
+        try:
+            if csv_tail.identity is None:
+                known = startup_rows if df is None else df[cols].values
+                kind, rows = csv_tail.resume(store.last_export(), known)
+            else:
+                kind, rows = csv_tail.read(store.last_export())
+            if kind == 'append' and not len(rows):
+                store.csv_seen = csv_tail.stamp
+                return False
+            ensure_data()
+            if kind == 'reload':
+                # Truncated or rewritten by another tool: it becomes the shot log
+                store.replace_all(csv_tail.read_all())
+                df = store.to_frame()
+                running_fit.reset(*df_arrays())
+                history.clear()
+                table_backlog = None
+            elif len(rows):
+                ids = store.add_many(rows)
+                df = pd.concat([df, pd.DataFrame(rows, index=ids, columns=cols)])
+                running_fit.extend(rows[:, :2], rows[:, 2])
+                if table_backlog is not None:
+                    table_backlog.update(zip(ids, map(tuple, rows.tolist())))
+            store.csv_seen = csv_tail.stamp  # Its rows are stored: the CSV may be rewritten over them
+        except Exception:
+            csv_tail.rewind(checkpoint)  # Read these rows again on the next poll
+            raise
+    return True
+
+def rollback_data():
+    # Caller holds data_lock.  The store journals each edit as one record, so
+    # it holds exactly the edits that went through: rebuild df and the fit from it
+    global df, table_backlog
+    if df is None:
+        return  # Nothing was loaded, so nothing was applied
     try:
-        theta_best = np.linalg.inv(X_b.T @ X_b) @ (X_b.T @ y)
-    except np.linalg.LinAlgError:
-        # Fallback if matrix is singular (very few points or collinearity)
-        theta_best = np.linalg.pinv(X_b) @ y
+        df = store.load() if service_url else store.to_frame()
+    except OSError:
+        store.stale = True  # Service unreachable: poll_service reloads once it is back
+        return
+    running_fit.reset(*df_arrays())
+    table_backlog = None
+
+# --- Model worker job: apply a coalesced batch of edits, save, refit once, snapshot for the plot ---
+@timed('worker.apply_edits')
+def apply_edits(edits):
+    # All or nothing: a malformed edit rejects the batch before anything is
+    # saved, and an edit that fails midway rolls df and running_fit back to
+    # the store.  Either way BatchError carries the Data Collection edits that
+    # did not go through, for on_model_error to retry.
+    global tail_queued
+    for op, arg, payload in edits:
+        if op == 'bootstrap':
+            run_bootstrap(*arg, payload)  # Outside data_lock: it only reads its own snapshot
+    edits = [e for e in edits if e[0] != 'bootstrap']
+    if not edits:
+        return None
+    retry = lambda pending: [e for e in pending if e[0] in ('txn', 'undo', 'redo')]
+    valid, bad = [], None
+    for edit in edits:
+        try:
+            if edit[0] == 'txn':
+                check_transaction(*edit[2])
+            valid.append(edit)
+        except ValueError as exc:
+            bad = exc
+    if bad is not None:
+        tail_queued = False  # The file watcher queues its read again
+        raise BatchError(retry(valid), bad)
+    with data_lock:
+        changed = False
+        for i, edit in enumerate(edits):
+            try:
+                changed |= apply_edit(*edit)
+            except Exception as exc:
+                rollback_data()
+                tail_queued = False
+                raise BatchError(retry(edits[i:]), exc) from exc
+        if not changed:
+            return None  # Only polls that found nothing new: keep the displayed model
+
+        # Falls back to a full re-solve from df when conditioning gets bad
+        with span('model.refit'):
+            theta = running_fit.theta(data=df_arrays)
+            fit, diag, keep = running_fit, None, None
+            if show_influence or exclude_flagged:
+                with span('model.influence'):
+                    X, y = df_arrays()
+                    diag = influence(X, y, fit.n, fit.mean, fit.comoment, ids=df.index.values)
+                if exclude_flagged and diag.flagged.any():
+                    # Take the flagged rows out of a copy of the running statistics
+                    keep = ~diag.flagged
+                    fit = RunningFit()
+                    fit.restore(running_fit.state())
+                    fit.retract(X[diag.flagged], y[diag.flagged])
+                    theta = fit.theta(data=lambda: (X[keep], y[keep]))
+            uncertainty = ols_uncertainty(fit.n, fit.mean, fit.comoment)
+        data = snapshot_plot_data()
+        if keep is not None:
+            data = tuple(a[keep] for a in data)  # Plot only the rows the model was fitted to
+        return theta, uncertainty, data, diag
+
+def on_model_published(version, result):
+    # Runs on the Tk thread with the newest finished model
+    global theta_best, model_uncertainty, plot_data, table_backlog, model_influence
+    theta_best, model_uncertainty, plot_data, model_influence = result
+    with data_lock:
+        backlog, table_backlog = table_backlog, {}
+        notes = edit_notes[:]
+        del edit_notes[:]
+    if update_data_table is not None:
+        update_data_table(backlog, notes, model_influence)
+    create_plot()
+    update_model_status()
+
+def on_model_error(exc):
+    # The worker rolled the failed batch back; offer to re-queue the edits it kept
+    update_model_status()
+    edits = exc.edits if isinstance(exc, BatchError) else []
+    if not edits:
+        messagebox.showerror("Save Error", f"Could not apply an edit: {exc}", parent=root)
+        submit_edit('refit')  # Show the model and table as saved
+        return
+    if messagebox.askretrycancel("Save Error", f"Could not apply {len(edits)} edit(s): {exc}\n\n"
+                                 "Retry them? Cancel discards them.", parent=root):
+        for edit in edits:
+            submit_edit(*edit)
+    else:
+        submit_edit('refit')
 
-# Compute initial coefficients
-refit_from_df()
+def submit_edit(op, arg=None, payload=None):
+    # Queued edits are never dropped; bursts are coalesced into one refit
+    worker.submit((op, arg, payload))
+    update_model_status()
+
+def poll_csv(interval_ms=500):
+    # Only a stat() here; the worker reads and parses whatever was appended
+    global tail_queued
+    if not tail_queued and csv_tail.changed():
+        tail_queued = True
+        submit_edit('tail', None)
+    root.after(interval_ms, poll_csv)
+
+def poll_service(interval_ms=5000):
+    # Pick up shots logged by other stations once our own edits are through;
+    # the worker makes the HTTP call and reloads if the service moved on
+    if not worker.pending:
+        worker.submit(('poll', None, None))
+    root.after(interval_ms, poll_service)
+
+def update_model_status():
+    if getattr(store, 'error', None) is not None:
+        # Edits are still journaled; the background save keeps retrying
+        model_status.config(text=f"Model: saving failed ({store.error}), retrying")
+    elif worker.pending:
+        model_status.config(text=f"Model: updating ({worker.pending} edit(s) pending)")
+    elif exclude_flagged and model_influence is not None and model_influence.flagged.any():
+        model_status.config(text=f"Model: up to date, {int(model_influence.flagged.sum())} flagged row(s) excluded")
+    else:
+        model_status.config(text="Model: up to date")
 
 # Predicting the required pull strength to achieve a target distance
 def calculate_force(mass, target_distance):
     # theta_best: [b0, b_mass, b_pull]; solve for pull strength
-    pull_strength = (target_distance - theta_best[0] - theta_best[1] * mass) / theta_best[2]
-    return pull_strength
-
-# Function to create the plot
-def create_plot(mass=None, target_distance=None):
-    ax.clear()
-    num_points = 5  # Decrease the number of points for a less dense mesh
-    x_range = np.linspace(df['mass(g)'].min(), df['mass(g)'].max(), num_points)
-    y_range = np.linspace(df['distance feet'].min(), df['distance feet'].max(), num_points)
+    # Accepts scalars or NumPy arrays (broadcast together)
+    return predict_pull(theta_best, mass, target_distance)
 
-    x_mesh, y_mesh = np.meshgrid(x_range, y_range)
-    z_mesh = np.array([calculate_force(x, y) for x, y in zip(np.ravel(x_mesh), np.ravel(y_mesh))])
-    z_mesh = z_mesh.reshape(x_mesh.shape)
+# 95% intervals for the required pull strength: (pull, (ci_lo, ci_hi), (pi_lo, pi_hi))
+def pull_interval(mass, target_distance):
+    _, cov, s2, dof = model_uncertainty
+    return analytic_interval(theta_best, cov, s2, dof, mass, target_distance)
 
-    sns.set_style('darkgrid')
-    sns.set_palette('husl')
+# Bootstrap intervals are computed by the model worker: (mass, target distance) -> interval
+bootstrap_results = {}
 
-    # Plot with updated colors for dark theme
-    ax.scatter(df['mass(g)'], df['pull strength(lbs)'], df['distance feet'],
-               color='lightblue', marker='o', s=100)
-    ax.plot_wireframe(x_mesh, z_mesh, y_mesh, color='#2ECC71', alpha=0.8)
+def run_bootstrap(mass, target_distance, data):
+    # Worker thread.  data: the (mass, pull, distance) arrays of the displayed model
+    mass_v, pull_v, dist_v = data if data is not None else snapshot_plot_data()
+    with span('model.bootstrap'):
+        try:
+            # Fixed seed so repeated predictions show the same interval
+            result = bootstrap_interval(np.c_[mass_v, pull_v], dist_v, mass, target_distance,
+                                        resamples=10_000, seed=0)
+        except Exception as exc:
+            result = exc
+    bootstrap_results[(mass, target_distance)] = result
 
-    added_label = False
+# Function to create the plot
+@timed('create_plot')
+def create_plot(mass=None, target_distance=None):
+    # Updates the persistent scene in place; only redraws what changed
+    if scene is None or plot_data is None:
+        return  # Plot pane not shown yet; build_plot draws it on first show
+    mass_v, pull_v, dist_v = plot_data
+    scene.set_data(mass_v, pull_v, dist_v)
+    if len(mass_v):
+        scene.set_model(theta_best, (mass_v.min(), mass_v.max()), (dist_v.min(), dist_v.max()),
+                        interval=lambda m, d: pull_interval(m, d)[2])  # 95% prediction band
     if mass is not None and target_distance is not None:
-        required_pull_strength = calculate_force(mass, target_distance)
-        ax.scatter(mass, required_pull_strength, target_distance,
-                   color='#E74C3C', marker='o', s=200, label='Prediction')
-        added_label = True
+        scene.set_prediction(mass, calculate_force(mass, target_distance), target_distance)
+    else:
+        scene.set_prediction(None)
+    scene.draw()
 
-    # Update plot styling for dark theme
-    ax.set_facecolor('#1E272E')
-    ax.xaxis.label.set_color('#D3E0EA')
-    ax.yaxis.label.set_color('#D3E0EA')
-    ax.zaxis.label.set_color('#D3E0EA')
-    ax.tick_params(colors='#D3E0EA', labelsize=16)
+# GUI setup
+shown_prediction = None  # (mass, target distance) in the result table
 
-    ax.set_xlabel('Mass (g)', fontsize=16)
-    ax.set_ylabel('Pull Strength (lbs)', fontsize=16)
-    ax.set_zlabel('Distance (feet)', fontsize=16)
-    ax.set_title('3D Scatter Plot of Mass, Pull Strength, and Distance', fontsize=18, color='#D3E0EA')
-    if added_label:
-        ax.legend(fontsize=18)
+def show_prediction(mass, target_distance, interval, source=""):
+    required_pull_strength = calculate_force(mass, target_distance)
+    _, (ci_lo, ci_hi), (pi_lo, pi_hi) = interval
 
-    canvas.draw()
+    # Clear previous entries in the result_table
+    for item in result_table.get_children():
+        result_table.delete(item)
 
-# GUI setup
+    # Insert the new results into the table
+    result_table.insert('', 'end', values=("Force (lbs):", f"{required_pull_strength:.1f}"))
+    result_table.insert('', 'end', values=(f"95% CI (lbs{source}):", f"{float(ci_lo):.1f} – {float(ci_hi):.1f}"))
+    result_table.insert('', 'end', values=(f"95% PI (lbs{source}):", f"{float(pi_lo):.1f} – {float(pi_hi):.1f}"))
+    result_table.insert('', 'end', values=("Mass (g):", mass))
+    result_table.insert('', 'end', values=("Distance (feet):", target_distance))
+
+def wait_for_bootstrap(key, analytic, poll_ms=100):
+    # Swap the bootstrap interval in once the worker has it, unless the
+    # table has moved on to another prediction meanwhile
+    if shown_prediction != key:
+        bootstrap_results.pop(key, None)
+        return
+    result = bootstrap_results.pop(key, None)
+    if result is None and worker.pending:
+        root.after(poll_ms, wait_for_bootstrap, key, analytic, poll_ms)
+    elif result is None or isinstance(result, Exception):
+        show_prediction(*key, analytic, ", analytic; bootstrap failed")
+    else:
+        show_prediction(*key, result, ", bootstrap")
+
+@timed('on_predict')
 def on_predict(event=None):
+    global shown_prediction
     try:
         mass = float(mass_entry.get())
         target_distance = float(distance_entry.get())
-        required_pull_strength = calculate_force(mass, target_distance)
-
-        # Clear previous entries in the result_table
-        for item in result_table.get_children():
-            result_table.delete(item)
-
-        # Insert the new results into the table
-        result_table.insert('', 'end', values=("Force (lbs):", f"{required_pull_strength:.1f}"))
-        result_table.insert('', 'end', values=("Mass (g):", mass))
-        result_table.insert('', 'end', values=("Distance (feet):", target_distance))
-
-        create_plot(mass, target_distance)
     except ValueError:
         # Ensure this dialog stays above the main window
         messagebox.showerror(
@@ -101,12 +440,237 @@ def on_predict(event=None):
             "Please enter valid numerical values for mass and target distance.",
             parent=root
         )
+        return
+    analytic = pull_interval(mass, target_distance)
+    shown_prediction = (mass, target_distance)
+    if bootstrap_var.get():
+        # 10k resamples take a while: show the analytic interval until they are done
+        show_prediction(mass, target_distance, analytic, ", analytic; bootstrapping…")
+        worker.submit(('bootstrap', shown_prediction, plot_data))
+        wait_for_bootstrap(shown_prediction, analytic)
+    else:
+        show_prediction(mass, target_distance, analytic)
+    create_plot(mass, target_distance)
 
 def on_exit(event=None):
+    if loadcell is not None:
+        loadcell.close()
+    if csv_tail is not None:
+        # Rows other tools appended since the last poll go in before the final export
+        worker.submit(('tail', None, None))
+    worker.close()  # Applies every queued edit before the store is closed
+    if df is not None:
+        try:
+            store.close()  # Flush the journal and compact it into a snapshot + CSV export
+        except OSError as exc:
+            messagebox.showerror("Save Error", f"Could not export {os.path.basename(file_path)}: {exc}\n\n"
+                                 "Every edit is kept in the journal and exported next time.", parent=root)
+        if not service_url:
+            X, y = df_arrays()
+            save_fit_cache(cache_path, data_digest(store.files()), theta_best, running_fit, np.c_[X, y])
+    if pumpkin_profile.TRACE_PATH:
+        pumpkin_profile.export_chrome_trace(pumpkin_profile.TRACE_PATH)
     root.destroy()
 
+# --- Profiling (PUMPKIN_PROFILE=1 or --profile): status bar and trace export ---
+def update_profile_status():
+    profile_status.config(text=pumpkin_profile.summary_line())
+    root.after(1000, update_profile_status)
+
+def export_profile(event=None):
+    path = filedialog.asksaveasfilename(parent=root, title="Export Chrome Trace",
+                                        defaultextension='.json', initialfile='pumpkin-trace.json',
+                                        filetypes=[("Chrome trace", "*.json")])
+    if path:
+        pumpkin_profile.export_chrome_trace(path)
+
+update_data_table = None  # Set while the Data Collection window is open
+prefill_pull = None  # Likewise; puts a load-cell peak into the pull strength field
+
+# --- Live pull capture from a load cell (PUMPKIN_LOADCELL, see pumpkin_loadcell.py) ---
+loadcell = None
+last_peak = None  # Peak pull of the latest shot (lbs)
+
+def poll_loadcell(interval_ms=50):
+    # Drains finished shots only; sampling and peak detection run on the reader thread
+    global last_peak
+    peaks = loadcell.new_peaks()
+    if peaks:
+        last_peak = peaks[-1][0]
+        if prefill_pull is not None:
+            prefill_pull(last_peak)
+    if loadcell.error is not None:
+        messagebox.showerror("Load Cell Error", f"Load cell stopped: {loadcell.error}", parent=root)
+        return
+    root.after(interval_ms, poll_loadcell)
+
+# --- Shot planner: pair the pumpkins on hand with the targets (see pumpkin_schedule.py) ---
+def open_shot_planner():
+    import pandas as pd
+    from pumpkin_schedule import schedule, format_order
+
+    pumpkins_path = filedialog.askopenfilename(parent=root, title="Pumpkins CSV (mass(g) column)",
+                                               filetypes=[("CSV files", "*.csv")])
+    if not pumpkins_path:
+        return
+    targets_path = filedialog.askopenfilename(parent=root, title="Targets CSV (distance feet column)",
+                                              filetypes=[("CSV files", "*.csv")])
+    if not targets_path:
+        return
+    max_pull = simpledialog.askfloat("Maximum Safe Pull",
+                                     "Maximum safe pull strength (lbs).\nCancel for no limit.",
+                                     parent=root, minvalue=0)
+    try:
+        pumpkins = pd.read_csv(pumpkins_path)
+        targets = pd.read_csv(targets_path)
+    except (OSError, ValueError) as exc:
+        messagebox.showerror("Planner Error", f"Could not read the CSV files: {exc}", parent=root)
+        return
+
+    win = tk.Toplevel(root)
+    win.title("Shot Order")
+    win.configure(bg='#1E272E')
+    win.transient(root)
+
+    objective = tk.StringVar(value='total')
+    controls = ttk.Frame(win)
+    controls.pack(side=tk.TOP, fill=tk.X, padx=20, pady=(20, 10))
+    text = tk.Text(win, font=("Courier New", 14), bg='#2C3A47', fg='#D3E0EA', width=90, height=30)
+    text.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+    result = {}
+
+    def render():
+        try:
+            plan, left_pumpkins, left_targets = schedule(theta_best, pumpkins, targets, max_pull, objective.get())
+        except KeyError as exc:
+            messagebox.showerror("Planner Error", f"Missing column {exc}", parent=win)
+            win.destroy()
+            return
+        result['plan'] = plan
+        limit = f"{max_pull:.1f} lbs" if max_pull is not None else "none"
+        text.delete('1.0', 'end')
+        text.insert('end', f"Max safe pull: {limit}\n\n" + format_order(plan, left_pumpkins, left_targets))
+
+    def save():
+        path = filedialog.asksaveasfilename(parent=win, title="Save Shot Order", defaultextension='.csv',
+                                            filetypes=[("CSV files", "*.csv"), ("Text files", "*.txt")])
+        if not path:
+            return
+        if path.lower().endswith('.txt'):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text.get('1.0', 'end'))
+        else:
+            result['plan'].to_csv(path, index=False)
+
+    ttk.Radiobutton(controls, text="Minimize total pull", variable=objective, value='total',
+                    command=render).pack(side=tk.LEFT, padx=5)
+    ttk.Radiobutton(controls, text="Minimize peak pull", variable=objective, value='peak',
+                    command=render).pack(side=tk.LEFT, padx=5)
+    ttk.Button(controls, text="Close", command=win.destroy).pack(side=tk.RIGHT, padx=5)
+    ttk.Button(controls, text="Save…", command=save).pack(side=tk.RIGHT, padx=5)
+    render()
+
+# --- Monte Carlo hit probability for the mass/distance entered (see pumpkin_hitprob.py) ---
+def open_hit_probability():
+    try:
+        mass = float(mass_entry.get())
+        target_distance = float(distance_entry.get())
+    except ValueError:
+        messagebox.showerror("Input Error", "Enter the mass and target distance first.", parent=root)
+        return
+
+    win = tk.Toplevel(root)
+    win.title("Hit Probability")
+    win.configure(bg='#1E272E')
+    win.transient(root)
+
+    form = ttk.Frame(win)
+    form.pack(side=tk.TOP, fill=tk.X, padx=20, pady=(20, 10))
+    fields = {}
+    for i, (key, label, default) in enumerate([('window', "Target window (± ft):", "10"),
+                                               ('mass_sd', "Mass error (g, 1 sd):", "5"),
+                                               ('pull_sd', "Pull setting error (lbs, 1 sd):", "10"),
+                                               ('draws', "Draws:", "1000000")]):
+        ttk.Label(form, text=label).grid(row=i, column=0, padx=8, pady=4, sticky='e')
+        entry = ttk.Entry(form, font=("Segoe UI", 16), width=12)
+        entry.insert(0, default)
+        entry.grid(row=i, column=1, padx=8, pady=4, sticky='w')
+        fields[key] = entry
+    summary = ttk.Label(win, text=f"Mass {mass:g} g, target {target_distance:g} ft")
+    summary.pack(side=tk.TOP, fill=tk.X, padx=20, pady=10)
+
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    fig = Figure(figsize=(7, 3.5), dpi=100, facecolor='#1E272E')
+    hist_ax = fig.add_subplot(111)
+    hist_canvas = FigureCanvasTkAgg(fig, master=win)
+    hist_canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+
+    def show(outcome):
+        if isinstance(outcome, Exception):
+            summary.config(text=f"Simulation failed: {outcome}")
+            return
+        nominal, at_nominal, best, result, window = outcome
+        summary.config(text=f"Model pull {nominal:.1f} lbs: P(hit) {at_nominal.probability[0]:.1%}\n"
+                            f"Best pull {result.pulls[best]:.1f} lbs: P(hit) {result.probability[best]:.1%} "
+                            f"(± {result.stderr[best]:.1%}, {result.draws:,} draws)")
+        edges = result.edges
+        hist_ax.clear()
+        hist_ax.set_facecolor('#2C3A47')
+        hist_ax.stairs(result.hist[best] / result.draws, edges, fill=True, color='#27AE60', alpha=0.8)
+        hist_ax.axvspan(*window, color='#F39C12', alpha=0.25)
+        hist_ax.set_xlabel("Landing distance (ft) at the best pull", color='#D3E0EA')
+        hist_ax.tick_params(colors='#D3E0EA')
+        fig.tight_layout()
+        hist_canvas.draw_idle()
+
+    def run():
+        from pumpkin_hitprob import simulate, best_pull
+        try:
+            half = float(fields['window'].get())
+            mass_sd = float(fields['mass_sd'].get())
+            pull_sd = float(fields['pull_sd'].get())
+            draws = int(float(fields['draws'].get()))
+        except ValueError:
+            messagebox.showerror("Input Error", "Please enter numeric values for all fields.", parent=win)
+            return
+        theta, (_, cov, s2, _) = theta_best, model_uncertainty
+        window = (target_distance - half, target_distance + half)
+        nominal = float(calculate_force(mass, target_distance))
+        summary.config(text=f"Simulating {draws:,} shots…")
+        outcome = []
+
+        def work():
+            # Off the Tk thread; single process since this script is not import-safe for workers
+            try:
+                kw = dict(cov=cov, s=float(np.sqrt(s2)), mass_sd=mass_sd, pull_sd=pull_sd)
+                at_nominal = simulate(theta, mass, [nominal], window, draws, **kw)
+                best, result = best_pull(theta, mass, window, draws, **kw)
+                outcome.append((nominal, at_nominal, best, result, window))
+            except Exception as exc:
+                outcome.append(exc)
+
+        def wait():
+            if not win.winfo_exists():
+                return  # Closed while simulating
+            if outcome:
+                show(outcome[0])
+            else:
+                win.after(100, wait)
+
+        threading.Thread(target=work, name='hit-probability', daemon=True).start()
+        wait()
+
+    btns = ttk.Frame(win)
+    btns.pack(side=tk.TOP, fill=tk.X, padx=20, pady=(0, 10), before=summary)
+    ttk.Button(btns, text="Run", command=run).pack(side=tk.LEFT, padx=5)
+    ttk.Button(btns, text="Close", command=win.destroy).pack(side=tk.RIGHT, padx=5)
+    run()
+
 # --- Data Collection window with live CSV view, add/edit/delete, fullscreen + always-on-top ---
 def open_data_collection():
+    global update_data_table, prefill_pull, show_influence
+    ensure_data()
     win = tk.Toplevel(root)
     win.title("Data Collection")
     win.configure(bg='#1E272E')
@@ -145,15 +709,58 @@ def open_data_collection():
         dist_e.delete(0, 'end')
         mass_e.focus_set()
 
+    # Peak pull from the load cell, when one is connected
+    peak_label = ttk.Label(form, text="")
+    peak_label.grid(row=1, column=2, columnspan=4, padx=8, pady=(0, 6), sticky='w')
+
+    def prefill(peak):
+        pull_e.delete(0, 'end')
+        pull_e.insert(0, f"{peak:.1f}")
+        peak_label.config(text=f"Load cell: peak {peak:.1f} lbs")
+
+    if loadcell is not None:
+        peak_label.config(text="Load cell: waiting for a shot")
+        prefill_pull = prefill
+        if last_peak is not None:
+            prefill(last_peak)
+
     # ---- Buttons ----
     btns = ttk.Frame(win)
     btns.pack(side=tk.TOP, fill=tk.X, padx=20, pady=(0, 10))
     ttk.Button(btns, text="Add Row", command=lambda: add_row()).pack(side=tk.LEFT, padx=5)
     ttk.Button(btns, text="Update Selected", command=lambda: update_selected()).pack(side=tk.LEFT, padx=5)
     ttk.Button(btns, text="Delete Selected", command=lambda: delete_selected()).pack(side=tk.LEFT, padx=5)
+    ttk.Button(btns, text="Paste Rows", command=lambda: paste_rows()).pack(side=tk.LEFT, padx=5)
+    ttk.Button(btns, text="Import CSV", command=lambda: import_rows()).pack(side=tk.LEFT, padx=5)
+    ttk.Button(btns, text="Undo", command=lambda: undo_redo('undo')).pack(side=tk.LEFT, padx=5)
+    ttk.Button(btns, text="Redo", command=lambda: undo_redo('redo')).pack(side=tk.LEFT, padx=5)
     ttk.Button(btns, text="Clear Fields", command=clear_fields).pack(side=tk.LEFT, padx=5)
     ttk.Button(btns, text="Close", command=win.destroy).pack(side=tk.RIGHT, padx=5)
 
+    # Outcome of the last edit (instead of a dialog per edit)
+    status = ttk.Label(win, text="Blank fields are left unchanged when updating rows.")
+    status.pack(side=tk.TOP, fill=tk.X, padx=25, pady=(0, 10))
+
+    def show_status(text, error=False):
+        status.config(text=text, foreground='#E74C3C' if error else '#D3E0EA')
+        if error:
+            win.bell()
+
+    # Influential rows (leverage, studentized residual, Cook's distance) are highlighted
+    influence_bar = ttk.Frame(win)
+    influence_bar.pack(side=tk.TOP, fill=tk.X, padx=20, pady=(0, 10))
+    exclude_var = tk.BooleanVar(value=exclude_flagged)
+
+    def toggle_exclude():
+        global exclude_flagged
+        exclude_flagged = exclude_var.get()
+        submit_edit('refit')
+
+    ttk.Checkbutton(influence_bar, text="Refit without flagged rows", variable=exclude_var,
+                    command=toggle_exclude).pack(side=tk.LEFT, padx=5)
+    influence_label = ttk.Label(influence_bar, text="Checking for influential rows...")
+    influence_label.pack(side=tk.LEFT, padx=15)
+
     # ---- Table container (with scrollbars) ----
     table_frame = ttk.Frame(win)
     table_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
@@ -167,11 +774,9 @@ def open_data_collection():
         columns=cols,
         show='headings',
         style='Tiny.Treeview',
-        yscrollcommand=vscroll.set,
         xscrollcommand=hscroll.set,
         selectmode='extended'
     )
-    vscroll.config(command=data_tree.yview)
     hscroll.config(command=data_tree.xview)
 
     vscroll.pack(side=tk.RIGHT, fill=tk.Y)
@@ -182,81 +787,171 @@ def open_data_collection():
         data_tree.heading(c, text=c, anchor='w')
         data_tree.column(c, anchor='w', width=160)
 
-    def refresh_table():
+    # Only the visible rows exist as Treeview items; edits touch just the affected ones
+    table = VirtualTable(data_tree, vscroll, cols)
+    data_tree.tag_configure('marked', background='#8E3B46')
+
+    def reassert_topmost():
         # Reassert topmost in case a dialog changed stacking
         win.after(10, lambda: (win.lift(), win.attributes('-topmost', True)))
-        data_tree.delete(*data_tree.get_children())
-        for idx, row in df.iterrows():
-            data_tree.insert('', 'end', iid=str(idx), values=tuple(row[c] for c in cols))
+
+    @timed('refresh_table')
+    def refresh_table():
+        reassert_topmost()
+        with data_lock:
+            table.set_rows(df)
+
+    def show_influence_rows(diag):
+        flagged = diag.ids[diag.flagged]
+        table.set_marked(flagged.tolist())
+        if len(flagged):
+            influence_label.config(text=f"{len(flagged)} influential row(s) highlighted")
+        else:
+            influence_label.config(text="No influential rows")
+
+    def update_table(rows, notes=(), diag=None):
+        # Rows that changed outside this window's own edits; None means reload everything
+        if diag is not None:
+            show_influence_rows(diag)
+        if rows is None:
+            refresh_table()
+        elif rows:
+            gone = [row_id for row_id, row in rows.items() if row is None]
+            kept = [(row_id, row) for row_id, row in rows.items() if row is not None]
+            if gone:
+                table.remove(gone)
+            if kept:
+                table.upsert_many(*zip(*kept))
+        if notes:
+            show_status(notes[-1])
+
+    def forget_table(event):
+        global update_data_table, prefill_pull, show_influence
+        if event.widget is win:
+            update_data_table = prefill_pull = None
+            show_influence = False
+
+    update_data_table = update_table
+    win.bind('<Destroy>', forget_table)
+
+    def read_fields(required):
+        # Entry values as floats; None for blank fields unless required
+        values = []
+        for entry in (mass_e, pull_e, dist_e):
+            text = entry.get().strip()
+            if not text and not required:
+                values.append(None)
+                continue
+            values.append(float(text))
+        return values
+
+    def commit(label, ids, rows, added):
+        # One transaction: a single journal record, refit and undo step
+        submit_edit('txn', label, (ids, rows, added))
+        reassert_topmost()
+
+    def reserve_ids(count):
+        # Ids to show new rows under right away; with a shared service that
+        # is an HTTP call, so the worker reserves them (None) and the rows
+        # appear once it has added them
+        return None if service_url else store.new_ids(count)
 
     def add_row():
         try:
-            m = float(mass_e.get()); p = float(pull_e.get()); d = float(dist_e.get())
-            global df
-            new_row = pd.DataFrame({'mass(g)': [m], 'pull strength(lbs)': [p], 'distance feet': [d]})
-            df = pd.concat([df, new_row], ignore_index=True)
-            df.to_csv(file_path, index=False)
-            refit_from_df(); create_plot(); refresh_table()
-            messagebox.showinfo("Saved", "Row added, model updated.", parent=win)
-            clear_fields()
+            m, p, d = read_fields(required=True)
         except ValueError:
-            messagebox.showerror("Input Error", "Please enter numeric values for all fields.", parent=win)
+            show_status("Please enter numeric values for all fields.", error=True); return
+        ids = reserve_ids(1)
+        if ids is not None:
+            table.upsert(ids[0], (m, p, d)); table.see(ids[0])
+        commit("Add row", ids, [(m, p, d)], [True])
+        show_status(f"Added row {ids[0]}; model updating." if ids else "Adding row; model updating.")
+        clear_fields()
+
+    def add_rows(rows, skipped, source):
+        if not len(rows):
+            show_status(f"No rows of three numbers found in the {source}.", error=True); return
+        ids = reserve_ids(len(rows))
+        if ids is not None:
+            table.upsert_many(ids, rows.tolist()); table.see(ids[-1])
+        commit(f"{source.capitalize()} {len(rows)} row(s)", ids, rows, np.ones(len(rows), dtype=bool))
+        note = f", skipped {skipped} line(s)" if skipped else ""
+        show_status(f"Added {len(rows)} row(s) from the {source}{note}; model updating.")
+
+    def paste_rows(event=None):
+        # Tab/comma separated mass, pull, distance lines, e.g. copied from a spreadsheet
+        try:
+            text = win.clipboard_get()
+        except tk.TclError:
+            show_status("The clipboard is empty.", error=True); return
+        add_rows(*parse_rows(text), "paste")
+
+    def import_rows():
+        path = filedialog.askopenfilename(parent=win, title="Import Shots",
+                                          filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            rows, skipped = read_rows(path)
+        except (OSError, ValueError) as exc:
+            show_status(f"Could not read {os.path.basename(path)}: {exc}", error=True); return
+        add_rows(rows, skipped, "import")
 
     def update_selected():
-        sel = data_tree.selection()
+        sel = [int(iid) for iid in table.selection() if int(iid) in table.values]
         if not sel:
-            messagebox.showwarning("No Selection", "Select a single row to update.", parent=win); return
-        if len(sel) > 1:
-            messagebox.showwarning("Multiple Selected", "Please select only one row to update.", parent=win); return
+            show_status("Select the row(s) to update.", error=True); return
         try:
-            m = float(mass_e.get()); p = float(pull_e.get()); d = float(dist_e.get())
+            fields = read_fields(required=len(sel) == 1)
         except ValueError:
-            messagebox.showerror("Input Error", "Please enter numeric values for all fields.", parent=win); return
+            show_status("Please enter numeric values.", error=True); return
+        if all(v is None for v in fields):
+            show_status("Enter the value(s) to set on the selected rows.", error=True); return
 
-        idx = int(sel[0])
-        try:
-            df.at[idx, 'mass(g)'] = m
-            df.at[idx, 'pull strength(lbs)'] = p
-            df.at[idx, 'distance feet'] = d
-        except KeyError:
-            messagebox.showerror("Update Error", "Could not update the selected row.", parent=win); return
-
-        df.to_csv(file_path, index=False)
-        refit_from_df(); create_plot(); refresh_table()
-        try: data_tree.selection_set(str(idx))
-        except tk.TclError: pass
-        messagebox.showinfo("Updated", "Row updated and model refreshed.", parent=win)
+        rows = np.array([table.values[i] for i in sel], dtype=float)
+        for col, value in enumerate(fields):
+            if value is not None:
+                rows[:, col] = value
+        table.upsert_many(sel, rows.tolist())
+        commit(f"Update {len(sel)} row(s)", sel, rows, np.zeros(len(sel), dtype=bool))
+        show_status(f"Updated {len(sel)} row(s); model updating.")
 
     def delete_selected():
-        sel = data_tree.selection()
+        sel = [int(iid) for iid in table.selection()]
         if not sel:
-            messagebox.showwarning("No Selection", "Select at least one row to delete.", parent=win); return
-
-        if not messagebox.askyesno("Confirm Delete",
-                                   f"Delete {len(sel)} selected row(s)?",
-                                   parent=win):
+            show_status("Select at least one row to delete.", error=True); return
+        if len(sel) > CONFIRM_DELETE_ROWS and not messagebox.askyesno(
+                "Confirm Delete", f"Delete {len(sel)} selected rows?\n\n"
+                "Ctrl+Z undoes this until the program is closed.", parent=win):
             return
-
-        global df
-        drop_idxs = [int(iid) for iid in sel]
-        df = df.drop(index=drop_idxs).reset_index(drop=True)
-        df.to_csv(file_path, index=False)
-        refit_from_df(); create_plot(); refresh_table()
-        messagebox.showinfo("Deleted", "Selected row(s) deleted and model refreshed.", parent=win)
+        table.remove(sel)
+        commit(f"Delete {len(sel)} row(s)", sel, np.full((len(sel), 3), np.nan), np.zeros(len(sel), dtype=bool))
+        show_status(f"Deleted {len(sel)} row(s) (Ctrl+Z to undo); model updating.")
         clear_fields()
 
+    def undo_redo(op):
+        submit_edit(op)
+        show_status(f"{op.capitalize()} queued.")
+
     def on_row_select(event):
-        sel = data_tree.selection()
-        if not sel: return
-        iid = sel[0]
-        vals = data_tree.item(iid, 'values')
+        sel = table.selection()
+        clear_fields()
+        if len(sel) != 1:
+            return  # Several rows: fill in only the fields to change
+        vals = table.values[int(sel[0])]
         if len(vals) == 3:
-            clear_fields()
             mass_e.insert(0, vals[cols.index('mass(g)')])
             pull_e.insert(0, vals[cols.index('pull strength(lbs)')])
             dist_e.insert(0, vals[cols.index('distance feet')])
+        diag = model_influence
+        if diag is not None:
+            i = int(np.searchsorted(diag.ids, int(sel[0])))
+            if i < len(diag.ids) and diag.ids[i] == int(sel[0]):
+                flag = " (flagged)" if diag.flagged[i] else ""
+                show_status(f"Row {sel[0]}: leverage {diag.leverage[i]:.3f}, studentized residual "
+                            f"{diag.studentized[i]:+.2f}, Cook's distance {diag.cooks[i]:.3f}{flag}")
 
-    data_tree.bind('<<TreeviewSelect>>', on_row_select)
+    data_tree.bind('<<TableSelect>>', on_row_select)
 
     # Reassert topmost periodically (paranoid fix for some window managers)
     win.after(50, lambda: (win.lift(), win.attributes('-topmost', True)))
@@ -264,9 +959,15 @@ def open_data_collection():
     # Keyboard shortcuts
     win.bind('<Return>', lambda e: add_row())
     win.bind('<Escape>', lambda e: win.destroy())
+    win.bind('<Control-z>', lambda e: undo_redo('undo'))
+    win.bind('<Control-y>', lambda e: undo_redo('redo'))
+    win.bind('<Control-Z>', lambda e: undo_redo('redo'))  # Ctrl+Shift+Z
+    data_tree.bind('<Control-v>', paste_rows)
 
     refresh_table()
     mass_e.focus_set()
+    show_influence = True
+    submit_edit('refit')  # Diagnostics for the rows as they are now
 
 # Creating main GUI window with theme
 root = tk.Tk()
@@ -290,6 +991,14 @@ style.configure('TLabel',
     background='#1E272E',
     foreground='#D3E0EA',
     font=("Helvetica", 18))
+style.configure('TCheckbutton',
+    background='#1E272E',
+    foreground='#D3E0EA',
+    font=("Helvetica", 18))
+style.configure('TRadiobutton',
+    background='#1E272E',
+    foreground='#D3E0EA',
+    font=("Helvetica", 18))
 style.configure('TEntry',
     fieldbackground='#2C3A47',
     foreground='#D3E0EA',
@@ -335,8 +1044,16 @@ style.map('Treeview',
 # Key bindings
 root.bind('<Return>', on_predict)
 root.bind('<Escape>', on_exit)
+root.protocol('WM_DELETE_WINDOW', on_exit)
 root.bind('<Control-d>', lambda e: open_data_collection())  # Optional shortcut
 
+# Latency status bar across the bottom, only when profiling
+if pumpkin_profile.ENABLED:
+    profile_status = ttk.Label(root, font=("Helvetica", 12))
+    profile_status.pack(side=tk.BOTTOM, fill=tk.X, padx=20, pady=(0, 10))
+    root.bind('<Control-t>', export_profile)  # Save the timeline as a Chrome trace
+    update_profile_status()
+
 # Create frames using ttk
 input_frame = ttk.Frame(root)
 input_frame.pack(side=tk.LEFT, padx=20, pady=20)
@@ -370,15 +1087,81 @@ result_table.grid(row=3, column=0, columnspan=2, padx=20, pady=20)
 ttk.Button(input_frame, text="Open Data Collection", command=open_data_collection)\
     .grid(row=4, column=0, columnspan=2, padx=10, pady=10, sticky='ew')
 
-# Create and configure the plot
-fig = plt.Figure(figsize=(8, 5), dpi=100, facecolor='#1E272E')
-ax = fig.add_subplot(111, projection='3d')
-ax.set_facecolor('#1E272E')
-canvas = FigureCanvasTkAgg(fig, master=plot_frame)
-canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+# Shows whether the displayed model includes every edit
+model_status = ttk.Label(input_frame, text="Model: up to date")
+model_status.grid(row=5, column=0, columnspan=2, padx=10, pady=10, sticky='w')
+
+# Interval source for the result table: analytic (default) or 10k bootstrap resamples
+bootstrap_var = tk.BooleanVar(value=False)
+ttk.Checkbutton(input_frame, text="Bootstrap intervals", variable=bootstrap_var)\
+    .grid(row=6, column=0, columnspan=2, padx=10, pady=10, sticky='w')
+
+# Pair a table of pumpkins with a list of targets and print the shot order
+ttk.Button(input_frame, text="Plan Shot Order", command=open_shot_planner)\
+    .grid(row=7, column=0, columnspan=2, padx=10, pady=10, sticky='ew')
+
+# Chance of landing in a window around the target, and the pull that maximizes it
+ttk.Button(input_frame, text="Hit Probability", command=open_hit_probability)\
+    .grid(row=8, column=0, columnspan=2, padx=10, pady=10, sticky='ew')
+
+# Refits, saves and plot data run here instead of in button callbacks
+worker = ModelWorker(root, apply_edits, on_model_published, on_model_error)
+if service_url:
+    root.after(5000, poll_service)
+else:
+    root.after(500, poll_csv)
+
+loadcell_spec = os.environ.get('PUMPKIN_LOADCELL')  # e.g. serial:COM3@115200 or replay:shots.txt@2000
+if loadcell_spec:
+    from pumpkin_loadcell import LoadCellReader
+    loadcell = LoadCellReader(loadcell_spec,
+                              scale=float(os.environ.get('PUMPKIN_LOADCELL_SCALE', 1.0)),
+                              offset=float(os.environ.get('PUMPKIN_LOADCELL_OFFSET', 0.0))).start()
+    root.after(50, poll_loadcell)
+
+# The plot is created the first time its pane is shown
+fig = ax = canvas = scene = None
+plot_imports = None  # Thread importing the plotting modules
+
+def build_plot(event=None):
+    # matplotlib and seaborn (which pulls in scipy) take seconds to import:
+    # that happens on a thread, and the canvas is made once they are in
+    global plot_imports
+    if canvas is not None or plot_imports is not None:
+        return
+    def work():
+        import matplotlib.pyplot, matplotlib.backends.backend_tkagg, pumpkin_plot
+    plot_imports = threading.Thread(target=work, name='plot-imports', daemon=True)
+    plot_imports.start()
+    finish_plot()
+
+def finish_plot(poll_ms=50):
+    global fig, ax, canvas, scene, plot_data
+    if plot_imports.is_alive():
+        root.after(poll_ms, finish_plot)
+        return
+    if plot_data is None:
+        # The cached rows when the data has not been parsed (no edit yet)
+        plot_data = tuple(startup_rows.T) if startup_rows is not None else snapshot_plot_data()
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from pumpkin_plot import ScenePlot
+
+    # Create and configure the plot
+    fig = plt.Figure(figsize=(8, 5), dpi=100, facecolor='#1E272E')
+    ax = fig.add_subplot(111, projection='3d')
+    ax.set_facecolor('#1E272E')
+    canvas = FigureCanvasTkAgg(fig, master=plot_frame)
+    if pumpkin_profile.ENABLED:
+        canvas.draw = timed('canvas.draw')(canvas.draw)  # draw_idle renders through this
+    canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    scene = ScenePlot(ax, canvas)  # Persistent scatter, wireframe and prediction marker
+
+    # Initial plot, with a prediction made while it was loading
+    create_plot(*(shown_prediction or ()))
 
-# Initial plot
-create_plot()
+# Build after the window has appeared so the inputs are usable right away
+plot_frame.bind('<Map>', lambda e: root.after_idle(build_plot))
 
 # Run the GUI
 root.mainloop()
\ No newline at end of file
@@ -1,10 +1,16 @@
+import os
+import json
+import threading
 import pandas as pd
 import numpy as np
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import filedialog, messagebox, ttk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import seaborn as sns
+from pumpkin_model import predict_pull
+from pumpkin_errors import analyze
+from pumpkin_solver import fit
 
 # Load the data from the CSV file
 file_path = 'C:/Users/Peter Cetner/Documents/pumpkin.csv'  # Adjust this path
@@ -14,16 +20,55 @@ df = pd.read_csv(file_path)
 X = df[['mass(g)', 'pull strength(lbs)']].values  # Features: mass and pull strength
 y = df['distance feet'].values  # Target variable: distance
 
-# Adding a column of ones for the intercept term
-X_b = np.c_[np.ones(X.shape[0]), X]  # Add bias term
-
-# Calculating the coefficients using the normal equation
-theta_best = np.linalg.inv(X_b.T.dot(X_b)).dot(X_b.T).dot(y)
+# Calculating the coefficients (centered/scaled QR solve, safe for singular data)
+theta_best = fit(X, y)
+
+# Per-shot percent errors, leave-one-out residuals and k-fold CV spread.
+# The 50 CV fits run on a background thread once the window is up (see start_analysis)
+error_columns = error_summary = None
+analysis = []  # (columns, summary) or the exception, appended by the worker
+
+def start_analysis():
+    def work():
+        try:
+            analysis.append(analyze(X, y, folds=5, repeats=10))
+        except Exception as exc:
+            analysis.append(exc)
+
+    threading.Thread(target=work, name='error-analysis', daemon=True).start()
+    wait_for_analysis()
+
+def wait_for_analysis(poll_ms=100):
+    global error_columns, error_summary
+    if not analysis:
+        root.after(poll_ms, wait_for_analysis)
+        return
+    if isinstance(analysis[0], Exception):
+        analysis_status.config(text=f"Error analysis failed: {analysis[0]}")
+        return
+    error_columns, error_summary = analysis[0]
+    analysis_status.config(text="Error analysis: done")
+
+def export_errors():
+    if error_summary is None:
+        messagebox.showinfo("Error Report", "The error analysis is still running.", parent=root)
+        return
+    path = filedialog.asksaveasfilename(parent=root, title="Export Error Report",
+                                        defaultextension='.csv', filetypes=[("CSV", "*.csv")])
+    if not path:
+        return
+    rows = df.copy()
+    for name, values in error_columns.items():
+        rows[name] = values
+    rows.to_csv(path, index=False)
+    with open(os.path.splitext(path)[0] + '_summary.json', 'w') as f:
+        json.dump(error_summary, f, indent=2)
+    messagebox.showinfo("Exported", f"Per-shot errors and summary written next to {path}", parent=root)
 
 # Predicting the required pull strength to achieve a target distance
 def calculate_force(mass, target_distance):
-    pull_strength = (target_distance - theta_best[0] - theta_best[1] * mass) / theta_best[2]
-    return pull_strength
+    # Accepts scalars or NumPy arrays (broadcast together)
+    return predict_pull(theta_best, mass, target_distance)
 
 # Function to create the plot
 def create_plot(mass=None, target_distance=None):
@@ -33,8 +78,7 @@ def create_plot(mass=None, target_distance=None):
     y_range = np.linspace(df['distance feet'].min(), df['distance feet'].max(), num_points)
 
     x_mesh, y_mesh = np.meshgrid(x_range, y_range)
-    z_mesh = np.array([calculate_force(x, y) for x, y in zip(np.ravel(x_mesh), np.ravel(y_mesh))])
-    z_mesh = z_mesh.reshape(x_mesh.shape)
+    z_mesh = calculate_force(x_mesh, y_mesh)  # One vectorized call for the whole grid
 
     sns.set_style('darkgrid')
     sns.set_palette('husl')
@@ -77,6 +121,9 @@ def on_predict(event=None):
         result_table.insert('', 'end', values=("Force (lbs):", f"{required_pull_strength:.1f}"))
         result_table.insert('', 'end', values=("Mass (g):", mass))
         result_table.insert('', 'end', values=("Distance (feet):", target_distance))
+        loo_pull = error_summary['loo pull abs error %']['mean'] if error_summary is not None else None
+        if loo_pull is not None:
+            result_table.insert('', 'end', values=("Typical pull error (LOO, %):", f"{loo_pull:.1f}"))
 
         create_plot(mass, target_distance)
     except ValueError:
@@ -165,6 +212,12 @@ result_table.column("Description", width=500, anchor='w')
 result_table.column("Value", width=300, anchor='center')
 result_table.grid(row=3, column=0, columnspan=2, padx=20, pady=20)
 
+# Export per-shot error columns and the summary report
+ttk.Button(input_frame, text="Export Error Report", command=export_errors)\
+    .grid(row=4, column=0, columnspan=2, padx=10, pady=10, sticky='ew')
+analysis_status = ttk.Label(input_frame, text="Error analysis: running…")
+analysis_status.grid(row=5, column=0, columnspan=2, padx=10, pady=10, sticky='w')
+
 # Create and configure the plot
 fig = plt.Figure(figsize=(8, 5), dpi=100, facecolor='#1E272E')
 ax = fig.add_subplot(111, projection='3d')
@@ -175,5 +228,8 @@ canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 # Initial plot
 create_plot()
 
+# Error analysis after the window has appeared
+root.after_idle(start_analysis)
+
 # Run the GUI
 root.mainloop()
\ No newline at end of file
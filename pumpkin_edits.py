@@ -0,0 +1,115 @@
+"""Row-level edit transactions and a bounded undo/redo history.
+
+A transaction gives new values for a set of row ids; a NaN row deletes the
+row.  The history keeps, for every transaction, only the ids and the rows
+before and after it as NumPy arrays (NaN where the row did not exist), so
+undo is just applying the "before" rows as another transaction.  Memory is
+capped by a total row budget rather than growing with DataFrame copies.
+
+Pasted or imported blocks of shots go through ``parse_rows`` / ``read_rows``:
+
+    rows, skipped = parse_rows(root.clipboard_get())
+"""
+from collections import deque, namedtuple
+
+import numpy as np
+
+from pumpkin_store import COLUMNS
+
+# before/after: (n, 3) float arrays in COLUMNS order, NaN rows for absent rows
+Delta = namedtuple('Delta', 'label ids before after')
+
+
+def check_transaction(ids, rows, added):
+    # Raises ValueError unless there is one row and one added flag per id
+    # (ids None: still to be reserved) and every row is three numbers or all
+    # NaN (a delete)
+    rows = np.asarray(rows, dtype=float)
+    if rows.ndim != 2 or rows.shape[1] != 3:
+        raise ValueError("transaction rows must be (mass, pull, distance) triples")
+    if ids is None:
+        ids = rows
+    if not len(ids) == len(rows) == len(added):
+        raise ValueError(f"transaction has {len(ids)} id(s), {len(rows)} row(s) and {len(added)} flag(s)")
+    deleted = np.isnan(rows).all(axis=1)
+    if not np.isfinite(rows[~deleted]).all():
+        raise ValueError("transaction rows must be finite numbers")
+
+
+class EditHistory:
+    def __init__(self, max_rows=200_000, max_steps=1000):
+        self.max_rows = max_rows    # Rows kept over all steps (~56 bytes each)
+        self.max_steps = max_steps
+        self.rows = 0
+        self._undo = deque()
+        self._redo = []
+
+    def record(self, label, ids, before, after):
+        for delta in self._redo:
+            self.rows -= len(delta.ids)
+        self._redo.clear()
+        delta = Delta(label, np.asarray(ids, dtype=np.int64), np.asarray(before, dtype=float),
+                      np.asarray(after, dtype=float))
+        self._undo.append(delta)
+        self.rows += len(delta.ids)
+        # Forget the oldest steps first; a single huge step can drop itself
+        while self._undo and (self.rows > self.max_rows or len(self._undo) > self.max_steps):
+            self.rows -= len(self._undo.popleft().ids)
+
+    def undo(self):
+        # The step to revert (apply its `before` rows), or None
+        if not self._undo:
+            return None
+        delta = self._undo.pop()
+        self._redo.append(delta)
+        return delta
+
+    def redo(self):
+        # The step to re-apply (apply its `after` rows), or None
+        if not self._redo:
+            return None
+        delta = self._redo.pop()
+        self._undo.append(delta)
+        return delta
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self.rows = 0
+
+    @property
+    def undo_label(self):
+        return self._undo[-1].label if self._undo else None
+
+    @property
+    def redo_label(self):
+        return self._redo[-1].label if self._redo else None
+
+
+def parse_rows(text):
+    # Pasted spreadsheet or CSV text -> ((n, 3) rows, lines skipped); every
+    # line must be three numbers in COLUMNS order, so headers are skipped
+    rows, skipped = [], 0
+    for line in text.splitlines():
+        parts = line.replace(',', ' ').replace(';', ' ').split()
+        if not parts:
+            continue
+        try:
+            values = [float(p) for p in parts]
+        except ValueError:
+            skipped += 1
+            continue
+        if len(values) != 3 or not np.all(np.isfinite(values)):
+            skipped += 1
+            continue
+        rows.append(values)
+    return np.array(rows, dtype=float).reshape(-1, 3), skipped
+
+
+def read_rows(path):
+    # Shots from a CSV in the shot-log format -> ((n, 3) rows, rows skipped)
+    import pandas as pd
+    data = pd.read_csv(path, usecols=COLUMNS)
+    rows = data[COLUMNS].apply(pd.to_numeric, errors='coerce').values.astype(float)
+    good = np.isfinite(rows).all(axis=1)
+    return rows[good], int((~good).sum())
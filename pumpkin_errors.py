@@ -0,0 +1,179 @@
+"""Error analysis for the pull-strength model.
+
+- Per-shot percent error of the predicted distance and the predicted pull
+  strength (the pull the model would have asked for to hit the logged
+  distance with the logged mass).
+- Leave-one-out residuals from the hat-matrix shortcut: ``e / (1 - h)`` and
+  the closed-form leave-one-out coefficients, without n refits.
+- Repeated k-fold cross-validation, optionally spread across a process pool.
+
+    python pumpkin_errors.py . --folds 5 --repeats 20 --workers 4 --rows errors.csv --report report.json
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pumpkin_model import batch_theta, predict_pull
+
+
+def design(X):
+    return np.c_[np.ones(len(X)), X]
+
+
+def percent_error(predicted, actual):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (predicted - actual) / actual * 100.0
+
+
+def leave_one_out(X, y):
+    # Returns (theta, hat leverages, LOO distance residuals, LOO thetas (n, 3))
+    X_b = design(X)
+    Q, R = np.linalg.qr(X_b)
+    theta = np.linalg.lstsq(R, Q.T @ y, rcond=None)[0]
+    h = np.einsum('ij,ij->i', Q, Q)  # Diagonal of the hat matrix
+    e = y - X_b @ theta
+    with np.errstate(divide='ignore', invalid='ignore'):
+        loo_e = e / (1.0 - h)
+    # theta_(-i) = theta - (X^T X)^-1 x_i e_i / (1 - h_i), all rows at once
+    R_inv_QT = np.linalg.lstsq(R, Q.T, rcond=None)[0]  # (X^T X)^-1 X^T
+    loo_theta = theta - (R_inv_QT * loo_e).T
+    return theta, h, loo_e, loo_theta
+
+
+def shot_errors(X, y):
+    # Per-row error columns as a dict of arrays, plus the fitted theta
+    theta, h, loo_e, loo_theta = leave_one_out(X, y)
+    mass, pull = X[:, 0], X[:, 1]
+    pred_dist = design(X) @ theta
+    pred_pull = predict_pull(theta, mass, y)
+    loo_pull = (y - loo_theta[:, 0] - loo_theta[:, 1] * mass) / loo_theta[:, 2]
+    columns = {
+        'predicted distance': pred_dist,
+        'distance error %': percent_error(pred_dist, y),
+        'predicted pull': pred_pull,
+        'pull error %': percent_error(pred_pull, pull),
+        'leverage': h,
+        'loo distance residual': loo_e,
+        'loo distance error %': percent_error(y - loo_e, y),
+        'loo pull error %': percent_error(loo_pull, pull),
+    }
+    return theta, columns
+
+
+def _fold_errors(X_train, y_train, X_test, y_test):
+    # Error metrics of one train/test split
+    theta = batch_theta(X_train, y_train)
+    dist_err = percent_error(design(X_test) @ theta, y_test)
+    pull_err = percent_error(predict_pull(theta, X_test[:, 0], y_test), X_test[:, 1])
+    resid = y_test - design(X_test) @ theta
+    return {
+        'rmse': float(np.sqrt(np.mean(resid ** 2))),
+        'distance mape': float(np.nanmean(np.abs(dist_err))),
+        'pull mape': float(np.nanmean(np.abs(pull_err))),
+    }
+
+
+def _folds(order, folds):
+    for test in np.array_split(order, folds):
+        train = np.setdiff1d(order, test, assume_unique=True)
+        yield train, test
+
+
+def _splits(n, folds, repeats, seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(repeats):
+        yield from _folds(rng.permutation(n), folds)
+
+
+def _repeat_errors(args):
+    # Every fold of one shuffled order; top-level so it can run in a worker
+    # process.  The folds are sliced here, one at a time, so only the data
+    # and an index order travel with the job.
+    X, y, order, folds = args
+    return [_fold_errors(X[tr], y[tr], X[te], y[te]) for tr, te in _folds(order, folds)]
+
+
+def kfold(X, y, folds=5, repeats=1, seed=0, workers=None):
+    # Per-fold error metrics for repeated k-fold CV; workers > 1 uses processes
+    folds = min(folds, len(y))
+    rng = np.random.default_rng(seed)
+    jobs = ((X, y, rng.permutation(len(y)), folds) for _ in range(repeats))
+    if workers and workers > 1 and repeats > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            per_repeat = list(pool.map(_repeat_errors, jobs))
+    else:
+        per_repeat = map(_repeat_errors, jobs)
+    return [r for results in per_repeat for r in results]
+
+
+def _describe(values):
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return {'mean': None, 'std': None, 'p50': None, 'p90': None, 'max': None}
+    return {'mean': float(values.mean()), 'std': float(values.std()),
+            'p50': float(np.percentile(values, 50)), 'p90': float(np.percentile(values, 90)),
+            'max': float(values.max())}
+
+
+def summarize(theta, columns, cv_results):
+    summary = {
+        'rows': int(len(columns['leverage'])),
+        'theta': [float(t) for t in theta],
+        'distance abs error %': _describe(np.abs(columns['distance error %'])),
+        'pull abs error %': _describe(np.abs(columns['pull error %'])),
+        'loo distance abs error %': _describe(np.abs(columns['loo distance error %'])),
+        'loo pull abs error %': _describe(np.abs(columns['loo pull error %'])),
+        'loo rmse': float(np.sqrt(np.nanmean(columns['loo distance residual'] ** 2))),
+    }
+    if cv_results:
+        summary['cv folds'] = len(cv_results)
+        for key in cv_results[0]:
+            summary['cv ' + key] = _describe([r[key] for r in cv_results])
+    return summary
+
+
+def analyze(X, y, folds=5, repeats=1, seed=0, workers=None):
+    # Returns (per-row error columns, summary report dict)
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    theta, columns = shot_errors(X, y)
+    cv_results = kfold(X, y, folds, repeats, seed, workers) if folds > 1 and len(y) >= folds else []
+    return columns, summarize(theta, columns, cv_results)
+
+
+def main(argv=None):
+    from pumpkin_seasons import load_seasons
+
+    parser = argparse.ArgumentParser(description="Percent-error, leave-one-out and k-fold analysis of the model.")
+    parser.add_argument('paths', nargs='+', help="season CSV files and/or directories")
+    parser.add_argument('--season', nargs='+', help="analyze only these seasons (default: all)")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--rows', help="write the data with per-row error columns to this CSV")
+    parser.add_argument('--report', help="write the summary report to this JSON file")
+    args = parser.parse_args(argv)
+
+    data = load_seasons(args.paths)
+    X, y, _ = data.arrays(args.season)
+    columns, summary = analyze(X, y, args.folds, args.repeats, args.seed, args.workers)
+
+    if args.rows:
+        frame = data.to_frame(args.season)
+        for name, values in columns.items():
+            frame[name] = values
+        frame.to_csv(args.rows, index=False)
+    text = json.dumps(summary, indent=2)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
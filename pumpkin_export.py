@@ -0,0 +1,227 @@
+"""Headless figure export (Agg/SVG), no Tk needed.
+
+Renders the main window's 3D scene for all seasons together and for each
+season with its own fit, from any number of camera angles, plus a residual
+plot.  The scene geometry (data, fits, wireframe and interval band) is
+computed once per dataset in the parent process; each worker builds one
+figure per dataset and re-renders it for every view, only moving the camera.
+
+Every output file is recorded in ``.export_cache.json`` in the output
+directory with a key made from the data hash, the fitted model and the view;
+files whose key is unchanged are skipped.
+
+    python pumpkin_export.py . -o figures --views 30,-60 20,45 10,135 --formats png svg --workers 4
+"""
+import argparse
+import hashlib
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pumpkin_model import RunningFit, data_digest
+from pumpkin_intervals import ols_uncertainty, analytic_interval
+
+STYLE_VERSION = 1  # Bump when the look of the figures changes, to re-render everything
+CACHE_FILE = '.export_cache.json'
+
+# Everything a worker needs to draw one dataset; computed once, shared by all views
+SceneGeometry = namedtuple('SceneGeometry', 'name mass pull dist theta band digest')
+
+
+def scene_geometry(name, X, y, digest):
+    from pumpkin_plot import wireframe_mesh
+    fit = RunningFit()
+    fit.reset(X, y)
+    theta, cov, s2, dof = ols_uncertainty(fit.n, fit.mean, fit.comoment)
+    mass, pull = X[:, 0], X[:, 1]
+    ranges = ((mass.min(), mass.max()), (y.min(), y.max()))
+    mesh = wireframe_mesh(theta, *ranges)
+    band = analytic_interval(theta, cov, s2, dof, mesh[0], mesh[2])[2] if dof > 0 else None
+    return SceneGeometry(name, np.asarray(mass), np.asarray(pull), np.asarray(y), theta, band, digest)
+
+
+def _key(*parts):
+    return hashlib.blake2b(json.dumps(parts, default=str).encode(), digest_size=16).hexdigest()
+
+
+def scene_key(geometry, view, fmt):
+    return _key(STYLE_VERSION, 'scene', geometry.digest, np.round(geometry.theta, 12).tolist(), view, fmt)
+
+
+def _render_scene(job):
+    # One dataset, every requested view; top-level so it runs in a worker process
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from pumpkin_plot import ScenePlot, BG
+
+    geometry, outputs = job
+    fig = Figure(figsize=(12, 8), dpi=100, facecolor=BG)
+    canvas = FigureCanvasAgg(fig)
+    scene = ScenePlot(fig.add_subplot(111, projection='3d'), canvas)
+    scene.set_data(geometry.mass, geometry.pull, geometry.dist)
+    band = geometry.band
+    scene.set_model(geometry.theta, (geometry.mass.min(), geometry.mass.max()),
+                    (geometry.dist.min(), geometry.dist.max()),
+                    interval=None if band is None else (lambda m, d: band))
+    scene.ax.set_title(f'{geometry.name}: Mass, Pull Strength and Distance', fontsize=18)
+    scene.draw()  # Sets the axis limits once for all views
+    written = []
+    for (elev, azim), path in outputs:
+        scene.ax.view_init(elev=elev, azim=azim)
+        fig.savefig(path, facecolor=fig.get_facecolor())
+        written.append(path)
+    return written
+
+
+def _render_residuals(job):
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from pumpkin_plot import BG, FG
+
+    geometries, paths = job
+    fig = Figure(figsize=(12, 5), dpi=100, facecolor=BG)
+    FigureCanvasAgg(fig)
+    ax_fit, ax_mass = fig.subplots(1, 2)
+    for geometry in geometries:
+        fitted = geometry.theta[0] + geometry.theta[1] * geometry.mass + geometry.theta[2] * geometry.pull
+        resid = geometry.dist - fitted
+        ax_fit.scatter(fitted, resid, label=geometry.name, s=40)
+        ax_mass.scatter(geometry.mass, resid, label=geometry.name, s=40)
+    for ax, xlabel in ((ax_fit, 'Fitted distance (feet)'), (ax_mass, 'Mass (g)')):
+        ax.axhline(0, color=FG, linewidth=1)
+        ax.set_facecolor('#2C3A47')
+        ax.set_xlabel(xlabel, color=FG)
+        ax.set_ylabel('Residual (feet)', color=FG)
+        ax.tick_params(colors=FG)
+    ax_fit.legend()
+    fig.suptitle('Distance residuals by season (each season with its own fit)', color=FG)
+    fig.tight_layout()
+    for path in paths:
+        fig.savefig(path, facecolor=fig.get_facecolor())
+    return list(paths)
+
+
+def _load_cache(out_dir):
+    try:
+        with open(os.path.join(out_dir, CACHE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(out_dir, cache):
+    path = os.path.join(out_dir, CACHE_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def export_figures(data, out_dir, views=((30, -60),), formats=('png',), seasons=None,
+                   per_season=True, residuals=True, workers=None, force=False):
+    # data: a SeasonData; returns (written paths, skipped paths)
+    os.makedirs(out_dir, exist_ok=True)
+    cache = {} if force else _load_cache(out_dir)
+    names = data.seasons if seasons is None else list(seasons)
+    sources = [data.sources[data.seasons.index(n)] for n in names]
+
+    X, y, _ = data.arrays(names)
+    geometries = [scene_geometry('All seasons', X, y, data_digest(sources))]
+    season_geometries = []
+    for name, source in zip(names, sources):
+        Xs, ys, _ = data.arrays([name])
+        if len(ys) >= 3:
+            season_geometries.append(scene_geometry(name, Xs, ys, data_digest([source])))
+    if per_season:
+        geometries += season_geometries
+
+    scene_jobs, keys, skipped = [], {}, []
+    for geometry in geometries:
+        outputs = []
+        slug = 'all' if geometry.name == 'All seasons' else f'season_{geometry.name}'
+        for elev, azim in views:
+            for fmt in formats:
+                filename = f'scene_{slug}_e{elev:g}_a{azim:g}.{fmt}'
+                key = scene_key(geometry, (elev, azim), fmt)
+                if cache.get(filename) == key and os.path.exists(os.path.join(out_dir, filename)):
+                    skipped.append(filename)
+                    continue
+                keys[filename] = key
+                outputs.append(((elev, azim), os.path.join(out_dir, filename)))
+        if outputs:
+            scene_jobs.append((geometry, outputs))
+
+    residual_jobs = []
+    if residuals and season_geometries:
+        paths = []
+        for fmt in formats:
+            filename = f'residuals.{fmt}'
+            key = _key(STYLE_VERSION, 'residuals', [(g.digest, np.round(g.theta, 12).tolist())
+                                                    for g in season_geometries], fmt)
+            if cache.get(filename) == key and os.path.exists(os.path.join(out_dir, filename)):
+                skipped.append(filename)
+                continue
+            keys[filename] = key
+            paths.append(os.path.join(out_dir, filename))
+        if paths:
+            residual_jobs.append((season_geometries, paths))
+
+    written = []
+    if workers and workers > 1 and len(scene_jobs) + len(residual_jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_scene, job) for job in scene_jobs]
+            futures += [pool.submit(_render_residuals, job) for job in residual_jobs]
+            for future in futures:
+                written.extend(future.result())
+    else:
+        for job in scene_jobs:
+            written.extend(_render_scene(job))
+        for job in residual_jobs:
+            written.extend(_render_residuals(job))
+
+    for path in written:
+        cache[os.path.basename(path)] = keys[os.path.basename(path)]
+    _save_cache(out_dir, cache)
+    return written, skipped
+
+
+def _view(text):
+    elev, _, azim = text.partition(',')
+    try:
+        return float(elev), float(azim)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"view must be 'elev,azim', got {text!r}")
+
+
+def main(argv=None):
+    from pumpkin_seasons import load_seasons
+
+    parser = argparse.ArgumentParser(description="Render the 3D scene, per-season and residual figures headlessly.")
+    parser.add_argument('paths', nargs='+', help="season CSV files and/or directories")
+    parser.add_argument('-o', '--output', default='figures', help="output directory (default: figures)")
+    parser.add_argument('--season', nargs='+', help="only these seasons (default: all)")
+    parser.add_argument('--views', type=_view, nargs='+', default=[(30.0, -60.0)],
+                        help="camera angles as elev,azim (default: 30,-60)")
+    parser.add_argument('--formats', nargs='+', default=['png'], choices=['png', 'svg', 'pdf'])
+    parser.add_argument('--no-seasons', action='store_true', help="skip the per-season scenes")
+    parser.add_argument('--no-residuals', action='store_true', help="skip the residual plot")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--force', action='store_true', help="re-render even unchanged figures")
+    args = parser.parse_args(argv)
+
+    data = load_seasons(args.paths)
+    written, skipped = export_figures(data, args.output, args.views, args.formats, args.season,
+                                      not args.no_seasons, not args.no_residuals, args.workers, args.force)
+    for path in written:
+        print(f"wrote {path}")
+    print(f"{len(written)} figure(s) written, {len(skipped)} unchanged")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Monte Carlo hit probability for a target window.
+
+Each draw perturbs one shot the way real shots vary:
+
+- the fitted coefficients, from their covariance (model uncertainty)
+- the true mass, around the weighed mass (scale error, ``mass_sd``)
+- the pull actually delivered, around the pull set (``pull_sd``)
+- the landing distance, by the model's residual scatter (normal with the
+  fitted s^2, or resampled residuals when ``resid`` is given)
+
+All candidate pulls share the same random draws, so their hit
+probabilities are directly comparable and the curve is smooth.  Draws are
+processed in chunks (bounded memory) and chunks can run in a process pool;
+a fixed seed gives the same result for any worker count.
+
+    python pumpkin_hitprob.py . --mass 900 --distance 150 --window 10 --draws 2000000 --workers 4
+"""
+import argparse
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pumpkin_model import predict_pull
+
+CHUNK_CELLS = 4_000_000  # Candidate pulls x draws per chunk (bounds memory)
+BINS = 120               # Landing-distance histogram bins
+
+# probability[k] = P(hit) for pulls[k]; hist[k] counts landing distances in the
+# uniform bins `edges` (distances outside fall into the first/last bin)
+HitResult = namedtuple('HitResult', 'pulls probability stderr edges hist draws')
+
+
+def _chunk(args):
+    # One chunk of draws for every candidate pull; top-level for worker processes
+    theta, cov, s, resid, mass, pulls, window, mass_sd, pull_sd, edges, n, seed = args
+    rng = np.random.default_rng(seed)
+    if cov is not None:
+        thetas = rng.multivariate_normal(theta, cov, size=n, method='cholesky')
+    else:
+        thetas = np.broadcast_to(theta, (n, 3))
+    true_mass = mass + rng.normal(0.0, mass_sd, n) if mass_sd else np.full(n, float(mass))
+    pull_error = rng.normal(0.0, pull_sd, n) if pull_sd else np.zeros(n)
+    noise = rng.choice(resid, n) if resid is not None else rng.normal(0.0, s, n)
+
+    base = thetas[:, 0] + thetas[:, 1] * true_mass + thetas[:, 2] * pull_error + noise
+    dist = thetas[None, :, 2] * pulls[:, None]   # (candidates, draws), updated in place
+    dist += base
+    lo, hi = window
+    hits = np.count_nonzero((dist >= lo) & (dist <= hi), axis=1)
+    # Histogram of every candidate at once (uniform bins): offset each row
+    # into its own range of bin numbers and count them all in one bincount
+    nb = len(edges) - 1
+    dist -= edges[0]
+    dist *= nb / (edges[-1] - edges[0])
+    np.clip(dist, 0, nb - 1, out=dist)
+    bins = dist.astype(np.intp)
+    bins += np.arange(len(pulls))[:, None] * nb
+    hist = np.bincount(bins.ravel(), minlength=len(pulls) * nb).reshape(len(pulls), nb)
+    return hits, hist
+
+
+def simulate(theta, mass, pulls, window, draws=1_000_000, cov=None, s=0.0, resid=None,
+             mass_sd=0.0, pull_sd=0.0, seed=0, workers=None, edges=None):
+    # Hit probability of each candidate pull for the window (lo, hi) in feet
+    theta = np.asarray(theta, dtype=float)
+    pulls = np.atleast_1d(np.asarray(pulls, dtype=float))
+    resid = None if resid is None else np.asarray(resid, dtype=float)
+    if edges is None:
+        center = (window[0] + window[1]) / 2
+        half = max(window[1] - window[0], 1.0) * 4
+        edges = np.linspace(center - half, center + half, BINS + 1)
+
+    chunk = max(1, min(draws, CHUNK_CELLS // len(pulls)))
+    sizes = [min(chunk, draws - start) for start in range(0, draws, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(theta, cov, s, resid, mass, pulls, window, mass_sd, pull_sd, edges, n, sd)
+            for n, sd in zip(sizes, seeds)]
+    hits = np.zeros(len(pulls), dtype=np.int64)
+    hist = np.zeros((len(pulls), len(edges) - 1), dtype=np.int64)
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for h, c in pool.map(_chunk, jobs):
+                hits += h
+                hist += c
+    else:
+        for job in jobs:
+            h, c = _chunk(job)
+            hits += h
+            hist += c
+    p = hits / draws
+    return HitResult(pulls, p, np.sqrt(p * (1 - p) / draws), edges, hist, draws)
+
+
+def best_pull(theta, mass, window, draws=1_000_000, cov=None, s=0.0, resid=None,
+              mass_sd=0.0, pull_sd=0.0, seed=0, workers=None, candidates=41):
+    # Searches the pull with the highest hit probability: a coarse grid
+    # around the model's pull for the window center, then a finer one around
+    # the best coarse candidate.  Returns (best index, HitResult of the fine grid).
+    theta = np.asarray(theta, dtype=float)
+    center = (window[0] + window[1]) / 2
+    nominal = float(predict_pull(theta, mass, center))
+    spread = np.sqrt(s ** 2 + (theta[1] * mass_sd) ** 2 + (theta[2] * pull_sd) ** 2
+                     + (window[1] - window[0]) ** 2 / 12)
+    half = 4 * spread / abs(theta[2]) if theta[2] else 1.0
+    kw = dict(cov=cov, s=s, resid=resid, mass_sd=mass_sd, pull_sd=pull_sd, seed=seed, workers=workers)
+
+    coarse = np.linspace(nominal - half, nominal + half, candidates)
+    # A tenth of the draws is plenty to locate the peak
+    result = simulate(theta, mass, coarse, window, max(draws // 10, 1000), **kw)
+    step = coarse[1] - coarse[0]
+    peak = coarse[int(np.argmax(result.probability))]
+    fine = np.linspace(peak - 2 * step, peak + 2 * step, candidates)
+    result = simulate(theta, mass, fine, window, draws, **kw)
+    return int(np.argmax(result.probability)), result
+
+
+def main(argv=None):
+    from pumpkin_seasons import load_seasons
+    from pumpkin_intervals import ols_uncertainty
+    from pumpkin_model import RunningFit
+
+    parser = argparse.ArgumentParser(description="Monte Carlo hit probability for a target window.")
+    parser.add_argument('paths', nargs='+', help="season CSV files and/or directories")
+    parser.add_argument('--season', nargs='+', help="fit only these seasons (default: all)")
+    parser.add_argument('--mass', type=float, required=True, help="weighed mass (g)")
+    parser.add_argument('--distance', type=float, required=True, help="target distance (feet)")
+    parser.add_argument('--window', type=float, default=10.0, help="hit if within +/- this many feet")
+    parser.add_argument('--mass-sd', type=float, default=5.0, help="mass measurement error (g)")
+    parser.add_argument('--pull-sd', type=float, default=10.0, help="pull setting error (lbs)")
+    parser.add_argument('--draws', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--empirical', action='store_true', help="resample residuals instead of a normal")
+    args = parser.parse_args(argv)
+
+    X, y, _ = load_seasons(args.paths).arrays(args.season)
+    fit = RunningFit()
+    fit.reset(X, y)
+    theta, cov, s2, _ = ols_uncertainty(fit.n, fit.mean, fit.comoment)
+    resid = y - (theta[0] + X @ theta[1:]) if args.empirical else None
+    window = (args.distance - args.window, args.distance + args.window)
+
+    nominal = float(predict_pull(theta, args.mass, args.distance))
+    at_nominal = simulate(theta, args.mass, [nominal], window, args.draws, cov, np.sqrt(s2), resid,
+                          args.mass_sd, args.pull_sd, args.seed, args.workers)
+    best, result = best_pull(theta, args.mass, window, args.draws, cov, np.sqrt(s2), resid,
+                             args.mass_sd, args.pull_sd, args.seed, args.workers)
+    print(f"model pull {nominal:.1f} lbs: P(hit) = {at_nominal.probability[0]:.3f}")
+    print(f"best pull  {result.pulls[best]:.1f} lbs: P(hit) = {result.probability[best]:.3f} "
+          f"(+/- {result.stderr[best]:.4f}, {result.draws} draws)")
+
+
+if __name__ == '__main__':
+    main()
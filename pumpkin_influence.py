@@ -0,0 +1,71 @@
+"""Closed-form influence diagnostics for the plane fit.
+
+Leverage, externally studentized residuals and Cook's distance for every
+shot, in one vectorized pass over the data using only the fit's running
+statistics (count, means and centered co-moments).  Nothing is refitted:
+the leave-one-out residual variance follows from the hat-matrix identity
+``s2_(i) = (SSE - e_i^2 / (1 - h_i)) / (n - p - 1)``, so a pass over 100k
+rows takes a few milliseconds and can simply be redone after every edit.
+
+    fit = RunningFit(); fit.reset(X, y)
+    diag = influence(X, y, fit.n, fit.mean, fit.comoment, ids=df.index.values)
+    print(diag.ids[diag.flagged])
+"""
+from collections import namedtuple
+
+import numpy as np
+
+STUDENT_LIMIT = 3.0   # |studentized residual| above this is an outlier
+_stats = False        # scipy.stats once looked up, None when scipy is not installed
+
+# Arrays aligned with the rows passed in; flagged is a boolean mask
+Influence = namedtuple('Influence', 'ids leverage studentized cooks flagged')
+
+
+def cooks_limit(n, p=3):
+    # Cook's distance above the median of F(p, n - p) moves the fit further
+    # than half a confidence ellipsoid; unlike 4/n it flags almost nothing on
+    # clean data however many rows there are
+    global _stats
+    dof = max(n - p, 1)
+    if _stats is False:  # scipy is optional and slow to import: looked up on first use
+        try:
+            from scipy import stats as _stats
+        except ImportError:  # A closed-form approximation of the F median is used instead
+            _stats = None
+    if _stats is not None:
+        return float(_stats.f.ppf(0.5, p, dof))
+    # Paulson's cube-root normal approximation at the median
+    return ((1 - 2 / (9 * p)) / (1 - 2 / (9 * dof))) ** 3
+
+
+def influence(X, y, n, mean, comoment, ids=None, student_limit=STUDENT_LIMIT, cooks_cutoff=None):
+    # cooks_cutoff: Cook's distance above which a row is flagged (default cooks_limit(n))
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    ids = np.arange(len(y)) if ids is None else np.asarray(ids)
+    p = 3
+    dof = n - p
+    if dof < 2 or len(y) == 0:
+        zeros = np.zeros(len(y))
+        return Influence(ids, zeros, zeros, zeros, np.zeros(len(y), dtype=bool))
+
+    Sxx_inv = np.linalg.pinv(comoment[:2, :2])
+    slopes = Sxx_inv @ comoment[:2, 2]
+    D = X - mean[:2]
+    # h_i = 1/n + d_i^T Sxx^-1 d_i with d_i the centered features
+    leverage = (D @ Sxx_inv * D).sum(axis=1)
+    leverage += 1.0 / n
+    resid = (y - mean[2]) - D @ slopes
+    sse = max(comoment[2, 2] - comoment[:2, 2] @ slopes, 0.0)
+    s2 = sse / dof
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        one_minus_h = 1.0 - leverage
+        s2_loo = np.maximum(sse - resid ** 2 / one_minus_h, 0.0) / (dof - 1)
+        studentized = resid / np.sqrt(s2_loo * one_minus_h)
+        cooks = resid ** 2 * leverage / (p * s2 * one_minus_h ** 2)
+    if cooks_cutoff is None:
+        cooks_cutoff = cooks_limit(n, p)
+    flagged = (np.abs(studentized) > student_limit) | (cooks > cooks_cutoff)
+    return Influence(ids, leverage, studentized, cooks, flagged)
@@ -0,0 +1,174 @@
+"""Confidence and prediction intervals for the required pull strength.
+
+The pull strength is the plane solved for pull, ``(d - b0 - b_mass*m) / b_pull``,
+so its uncertainty comes from the coefficients (confidence interval) plus,
+for a single shot, the scatter of distances around the plane (prediction
+interval).
+
+- ``analytic_interval``: delta method on the OLS covariance, computed from
+  the running statistics in constant time.
+- ``bootstrap_interval``: resamples the shot log thousands of times; every
+  chunk of resamples is one batched solve, and chunks can be spread over a
+  process pool.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pumpkin_model import predict_pull
+from pumpkin_solver import bootstrap_weights, fit, fit_weighted
+
+CHUNK_CELLS = 4_000_000  # Resamples x rows per batched solve (bounds memory)
+_stats = False  # scipy.stats once looked up, None when scipy is not installed
+
+
+def _scipy_stats():
+    # scipy is optional and takes about a second to import, so it is only
+    # looked up the first time a quantile is needed (not at GUI startup)
+    global _stats
+    if _stats is False:
+        try:
+            from scipy import stats as _stats
+        except ImportError:
+            _stats = None
+    return _stats
+
+
+def _normal_quantile(p):
+    # Bisection on erf
+    lo, hi = 0.0, 10.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if 0.5 * (1 + math.erf(mid / math.sqrt(2))) < p:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def _t_within(t, dof):
+    # P(|T| <= t) for Student's t with integer dof (Abramowitz & Stegun 26.7.3/4)
+    theta = math.atan(t / math.sqrt(dof))
+    c2 = math.cos(theta) ** 2
+    if dof % 2:
+        total = term = 1.0 if dof > 1 else 0.0
+        for k in range(1, (dof - 1) // 2):
+            term *= 2 * k / (2 * k + 1) * c2
+            total += term
+        return 2 / math.pi * (theta + math.sin(theta) * math.cos(theta) * total)
+    total = term = 1.0
+    for k in range(1, dof // 2):
+        term *= (2 * k - 1) / (2 * k) * c2
+        total += term
+    return math.sin(theta) * total
+
+
+def _t_quantile(level, dof):
+    # Two-sided Student t quantile without scipy: exact series inverted by
+    # bisection up to 100 dof, the Cornish-Fisher expansion (A&S 26.7.5,
+    # relative error below 1e-10) beyond
+    if dof > 100:
+        z = _normal_quantile(0.5 + level / 2)
+        g1 = (z ** 3 + z) / 4
+        g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+        g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+        g4 = (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / 92160
+        return z + g1 / dof + g2 / dof ** 2 + g3 / dof ** 3 + g4 / dof ** 4
+    lo, hi = 0.0, 1.0
+    while _t_within(hi, dof) < level:
+        hi *= 2
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if _t_within(mid, dof) < level:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def _quantile(level, dof):
+    p = 0.5 + level / 2
+    if dof <= 0:
+        return _normal_quantile(p)
+    stats = _scipy_stats()
+    if stats is not None:
+        return float(stats.t.ppf(p, dof))
+    return _t_quantile(level, int(dof))
+
+
+def ols_uncertainty(n, mean, comoment):
+    # From RunningFit-style statistics: (theta, coefficient covariance, s^2, dof)
+    Sxx = comoment[:2, :2]
+    Sxy = comoment[:2, 2]
+    Sxx_inv = np.linalg.pinv(Sxx)
+    slopes = Sxx_inv @ Sxy
+    b0 = mean[2] - slopes @ mean[:2]
+    dof = n - 3
+    ssr = max(comoment[2, 2] - Sxy @ slopes, 0.0)
+    s2 = ssr / dof if dof > 0 else np.nan
+    cov_slopes = s2 * Sxx_inv
+    cov = np.empty((3, 3))
+    cov[1:, 1:] = cov_slopes
+    cov[0, 1:] = cov[1:, 0] = -cov_slopes @ mean[:2]
+    cov[0, 0] = s2 / n + mean[:2] @ cov_slopes @ mean[:2]
+    return np.r_[b0, slopes], cov, s2, dof
+
+
+def analytic_interval(theta, cov, s2, dof, mass, target_distance, level=0.95):
+    # Returns (pull, (ci_lo, ci_hi), (pi_lo, pi_hi)); broadcasts over arrays
+    mass = np.asarray(mass, dtype=float)
+    pull = predict_pull(theta, mass, target_distance)
+    b2 = theta[2]
+    grad = np.stack(np.broadcast_arrays(-1.0 / b2, -mass / b2, -pull / b2), axis=-1)
+    var_mean = np.einsum('...i,ij,...j->...', grad, cov, grad)
+    var_shot = var_mean + s2 / b2 ** 2
+    q = _quantile(level, dof)
+    ci = q * np.sqrt(var_mean)
+    pi = q * np.sqrt(var_shot)
+    return pull, (pull - ci, pull + ci), (pull - pi, pull + pi)
+
+
+def _bootstrap_chunk(args):
+    # One chunk of resamples; top-level so it can run in a worker process
+    X, y, resid, mass, target_distance, resamples, seed = args
+    rng = np.random.default_rng(seed)
+    thetas = fit_weighted(X, y, bootstrap_weights(len(y), resamples, rng))
+    pulls = (target_distance[None, :] - thetas[:, :1] - thetas[:, 1:2] * mass[None, :]) / thetas[:, 2:3]
+    # A resampled distance residual per draw turns coefficient spread into shot spread
+    noise = rng.choice(resid, size=pulls.shape) / thetas[:, 2:3]
+    return pulls, pulls - noise
+
+
+def bootstrap_interval(X, y, mass, target_distance, resamples=10_000, level=0.95, seed=0, workers=None):
+    # Percentile intervals from `resamples` bootstrap refits; same return
+    # layout as analytic_interval.  A fixed seed gives identical results for
+    # any worker count.
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    mass, target_distance = (np.atleast_1d(np.asarray(a, dtype=float)) for a in (mass, target_distance))
+    mass, target_distance = np.broadcast_arrays(mass, target_distance)
+    shape = mass.shape
+    mass, target_distance = mass.ravel(), target_distance.ravel()
+
+    theta = fit(X, y)
+    resid = y - (theta[0] + X @ theta[1:])
+
+    chunk = max(1, min(resamples, CHUNK_CELLS // max(1, len(y))))
+    sizes = [min(chunk, resamples - start) for start in range(0, resamples, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(X, y, resid, mass, target_distance, size, s) for size, s in zip(sizes, seeds)]
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_bootstrap_chunk, jobs))
+    else:
+        results = [_bootstrap_chunk(job) for job in jobs]
+    mean_pulls = np.concatenate([r[0] for r in results])
+    shot_pulls = np.concatenate([r[1] for r in results])
+
+    tail = (1 - level) / 2 * 100
+    pull = np.nanmedian(mean_pulls, axis=0)
+    ci = np.nanpercentile(mean_pulls, [tail, 100 - tail], axis=0)
+    pi = np.nanpercentile(shot_pulls, [tail, 100 - tail], axis=0)
+    reshape = lambda a: a.reshape(shape)
+    return reshape(pull), (reshape(ci[0]), reshape(ci[1])), (reshape(pi[0]), reshape(pi[1]))
@@ -0,0 +1,327 @@
+"""Live pull-strength capture from a load cell.
+
+A reader thread pulls blocks of samples from a source, converts them to
+pounds in place, stores them in a preallocated ring buffer and runs a
+vectorized peak detector over each block.  A shot starts when the force
+rises above ``trigger`` and ends when it falls below ``release``; its peak
+is queued for the GUI, which only drains the queue from ``root.after``.
+
+Sources (one ASCII number per line, e.g. from an HX711 sketch):
+
+    serial:/dev/ttyUSB0@115200    serial port (needs pyserial)
+    replay:samples.txt@2000       a recorded file replayed at 2000 samples/s
+    /tmp/loadcell.fifo  or  -     a named pipe, or standard input
+
+    python pumpkin_loadcell.py --synth samples.txt --shots 20 --rate 2000
+    python pumpkin_loadcell.py replay:samples.txt@2000
+"""
+import argparse
+import os
+import queue
+import select
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+
+BLOCK = 4096  # Max samples handled per detector pass
+_NUMBER_BYTES = b'0123456789+-.eE \t\r\n'  # Everything a clean block of readings contains
+
+
+class RingBuffer:
+    """Fixed-size float64 history of the newest samples."""
+
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity)
+        self.capacity = capacity
+        self.count = 0  # Samples written in total
+
+    def write(self, values):
+        n = len(values)
+        if n > self.capacity:  # Only the newest samples fit
+            self.count += n - self.capacity
+            values = values[n - self.capacity:]
+            n = self.capacity
+        start = self.count % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = values[:first]
+        self.data[:n - first] = values[first:]
+        self.count += n
+
+    def latest(self, n, out=None):
+        # Copy of the newest n samples, oldest first
+        n = min(n, self.count, self.capacity)
+        if out is None:
+            out = np.empty(n)
+        end = self.count % self.capacity
+        first = min(n, end)
+        out[n - first:n] = self.data[end - first:end]
+        out[:n - first] = self.data[self.capacity - (n - first):]
+        return out[:n]
+
+
+class PeakDetector:
+    """Peak force of each shot, found one block of samples at a time."""
+
+    def __init__(self, trigger=50.0, release=20.0, min_samples=20):
+        self.trigger = trigger          # Force that starts a shot (lbs)
+        self.release = release          # Force that ends it (lbs)
+        self.min_samples = min_samples  # Shorter excursions are ignored as spikes
+        self.in_shot = False
+        self.peak = -np.inf
+        self.length = 0
+        self.offset = 0                 # Sample index of the block start
+        self.start = 0                  # Sample index where the current shot began
+        self._on = np.empty(BLOCK, dtype=np.intp)
+        self._off = np.empty(BLOCK, dtype=np.intp)
+        self._state = np.empty(BLOCK + 1, dtype=bool)
+        self._flips = np.empty(BLOCK, dtype=bool)
+        self._bounds = np.empty(BLOCK + 1, dtype=np.intp)
+        self._idx = np.arange(BLOCK)
+
+    def process(self, x):
+        # Returns [(peak, start_index, end_index), ...] of shots that ended in x
+        shots = []
+        for lo in range(0, len(x), BLOCK):
+            self._block(x[lo:lo + BLOCK], shots)
+        return shots
+
+    def _block(self, x, shots):
+        n = len(x)
+        if not n:
+            return
+        idx = self._idx[:n]
+        # Index of the last trigger / release crossing at or before each sample
+        on, off = self._on[:n], self._off[:n]
+        np.copyto(on, -2 if not self.in_shot else -1)
+        np.copyto(off, -1 if not self.in_shot else -2)
+        np.copyto(on, idx, where=x >= self.trigger)
+        np.copyto(off, idx, where=x <= self.release)
+        np.maximum.accumulate(on, out=on)
+        np.maximum.accumulate(off, out=off)
+        state = self._state[:n + 1]
+        state[0] = self.in_shot
+        np.greater(on, off, out=state[1:])
+
+        flips = self._flips[:n]
+        np.not_equal(state[1:], state[:-1], out=flips)
+        changes = np.flatnonzero(flips)
+        # Segments of constant state inside this block
+        bounds = self._bounds[:len(changes) + 2]
+        bounds[0], bounds[-1] = 0, n
+        bounds[1:-1] = changes
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            if a == b:
+                continue
+            if state[a + 1]:
+                if not self.in_shot:
+                    self.in_shot, self.peak, self.length = True, -np.inf, 0
+                    self.start = self.offset + a
+                self.peak = max(self.peak, float(x[a:b].max()))
+                self.length += b - a
+            elif self.in_shot:
+                self.in_shot = False
+                if self.length >= self.min_samples:
+                    shots.append((self.peak, self.start, self.offset + a))
+        self.offset += n
+
+
+class _LineParser:
+    # Bytes in, float array out; a partial last line waits for the next read
+    def __init__(self):
+        self.rest = b''
+
+    def feed(self, data):
+        data = self.rest + data
+        end = data.rfind(b'\n') + 1
+        self.rest = data[end:]
+        block = data[:end]
+        if not block.translate(None, _NUMBER_BYTES):
+            # Only digits and separators: NumPy parses the whole block in C,
+            # one array per block rather than a Python object per sample
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter('error', DeprecationWarning)  # Older NumPy only warns
+                    return np.fromstring(block, dtype=float, sep=' ')
+            except (ValueError, DeprecationWarning):
+                pass  # e.g. '1.2.3': fall back to token by token
+        good = []
+        for t in block.split():  # Noise on the line: keep what parses
+            try:
+                good.append(float(t))
+            except ValueError:
+                pass
+        return np.array(good, dtype=float)
+
+
+def _stream_chunks(read, stop=None, close=None):
+    # Yields parsed blocks until the stream ends or stop is set, then closes it
+    parser = _LineParser()
+    try:
+        while stop is None or not stop.is_set():
+            data = read()
+            if not data:
+                if data is None:
+                    continue  # Read timeout
+                return
+            values = parser.feed(data)
+            if len(values):
+                yield values
+    finally:
+        if close is not None:
+            close()
+
+
+def serial_source(port, baud=115200, stop=None):
+    try:
+        import serial
+    except ImportError:
+        raise RuntimeError("Reading a serial load cell needs pyserial (pip install pyserial)")
+    dev = serial.Serial(port, baud, timeout=0.05)
+    return _stream_chunks(lambda: dev.read(BLOCK) or None, stop, dev.close)
+
+
+def pipe_source(path, stop=None, timeout=0.1):
+    f = sys.stdin.buffer.raw if path == '-' else open(path, 'rb', buffering=0)
+
+    def read():
+        # Wait at most timeout for data so a stop request is noticed; pipes
+        # cannot be waited on like this on Windows, where reads block
+        if os.name != 'nt' and not select.select([f], [], [], timeout)[0]:
+            return None
+        return f.read(BLOCK * 8)
+
+    return _stream_chunks(read, stop, None if path == '-' else f.close)
+
+
+def replay_source(path, rate=2000.0, tick=0.01, loop=False, stop=None):
+    # Plays a recorded file back in real time, in blocks of rate * tick samples
+    samples = np.loadtxt(path, dtype=float, ndmin=1)
+    step = max(1, int(rate * tick))
+    while True:
+        start = time.perf_counter()
+        for i, lo in enumerate(range(0, len(samples), step)):
+            if stop is not None and stop.is_set():
+                return
+            yield samples[lo:lo + step]  # Views, no copies
+            delay = start + (i + 1) * step / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        if not loop:
+            return
+
+
+def open_source(spec, stop=None):
+    # stop: threading.Event that ends the stream and closes the port or pipe
+    kind, _, rest = spec.partition(':')
+    if kind == 'serial' and rest:
+        port, _, baud = rest.partition('@')
+        return serial_source(port, int(baud or 115200), stop)
+    if kind == 'replay' and rest:
+        path, _, rate = rest.rpartition('@') if '@' in rest else (rest, '', '')
+        return replay_source(path, float(rate or 2000), stop=stop)
+    return pipe_source(spec, stop)
+
+
+class LoadCellReader:
+    def __init__(self, spec, scale=1.0, offset=0.0, history=1 << 16, **detector):
+        self.spec = spec
+        self.scale = scale      # lbs per raw unit
+        self.offset = offset    # lbs at zero raw reading
+        self.ring = RingBuffer(history)
+        self.detector = PeakDetector(**detector)
+        self.peaks = queue.Queue()
+        self.error = None
+        self.samples = 0
+        self._work = np.empty(BLOCK)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='load-cell', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for chunk in open_source(self.spec, self._stop):
+                for lo in range(0, len(chunk), BLOCK):
+                    part = chunk[lo:lo + BLOCK]
+                    lbs = self._work[:len(part)]
+                    np.multiply(part, self.scale, out=lbs)
+                    lbs += self.offset
+                    self.ring.write(lbs)
+                    for shot in self.detector.process(lbs):
+                        self.peaks.put(shot)
+                    self.samples += len(part)
+        except Exception as exc:  # Reported by the GUI poller
+            self.error = exc
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def new_peaks(self):
+        # Shots finished since the last call; never blocks
+        found = []
+        while True:
+            try:
+                found.append(self.peaks.get_nowait())
+            except queue.Empty:
+                return found
+
+    def close(self, timeout=1.0):
+        # Stops the reader, which closes the serial port or pipe on its way out
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+
+def write_synthetic_replay(path, shots=20, rate=2000, seed=0):
+    # Quiet baseline with noise, and one smooth pull of 550-950 lbs per shot
+    rng = np.random.default_rng(seed)
+    parts = []
+    for _ in range(shots):
+        parts.append(rng.normal(0, 2, int(rate * rng.uniform(1, 3))))
+        width = int(rate * rng.uniform(0.2, 0.6))
+        pull = rng.uniform(550, 950) * np.sin(np.linspace(0, np.pi, width))
+        parts.append(pull + rng.normal(0, 3, width))
+    parts.append(rng.normal(0, 2, rate))
+    np.savetxt(path, np.concatenate(parts), fmt='%.2f')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the peak pull of each shot from a load-cell stream.")
+    parser.add_argument('source', nargs='?', help="serial:PORT@BAUD, replay:FILE@RATE, a pipe path or -")
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--offset', type=float, default=0.0)
+    parser.add_argument('--trigger', type=float, default=50.0)
+    parser.add_argument('--release', type=float, default=20.0)
+    parser.add_argument('--synth', help="write a synthetic replay file here and exit")
+    parser.add_argument('--shots', type=int, default=20)
+    parser.add_argument('--rate', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    if args.synth:
+        write_synthetic_replay(args.synth, args.shots, args.rate)
+        return
+    if not args.source:
+        parser.error("a source is required")
+    reader = LoadCellReader(args.source, args.scale, args.offset,
+                            trigger=args.trigger, release=args.release).start()
+    start = time.perf_counter()
+    while reader.running:
+        time.sleep(0.05)
+        for peak, _, _ in reader.new_peaks():
+            print(f"shot: peak {peak:.1f} lbs")
+    for peak, _, _ in reader.new_peaks():
+        print(f"shot: peak {peak:.1f} lbs")
+    if reader.error is not None:
+        raise SystemExit(f"load cell error: {reader.error}")
+    elapsed = time.perf_counter() - start
+    print(f"{reader.samples} samples in {elapsed:.2f} s ({reader.samples / elapsed:,.0f} samples/s)")
+
+
+if __name__ == '__main__':
+    main()
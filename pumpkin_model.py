@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from pumpkin_solver import fit as solver_fit
+
+# Column names shared with the CSV data files
+MASS_COL = 'mass(g)'
+PULL_COL = 'pull strength(lbs)'
+DIST_COL = 'distance feet'
+FEATURE_COLS = [MASS_COL, PULL_COL]
+
+
+# --- Batch fit ---
+def batch_theta(X, y):
+    # X: (n, 2) features [mass, pull], y: (n,) distances -> [b0, b_mass, b_pull]
+    # Centered/scaled QR solve with an SVD fallback for singular data
+    return solver_fit(X, y)
+
+
+class RunningFit:
+    """Plane fit kept as running sufficient statistics.
+
+    Stores the count, the column means and the 3x3 centered co-moment matrix
+    of [mass, pull, distance]; the top-left 2x2 block is the centered Gram
+    matrix of the features and the last column is the centered X^T y.  Adding,
+    removing or replacing a shot is a rank-one update, so an edit costs the
+    same no matter how many rows are logged.  Centering keeps the updates
+    accurate with raw grams and pounds, where the uncentered Gram matrix would
+    lose most of its digits to cancellation on removal.
+    """
+
+    def __init__(self, cond_limit=1e10, refresh_every=10000):
+        self.cond_limit = cond_limit        # above this, re-solve from the data
+        self.refresh_every = refresh_every  # removals before a drift-clearing re-solve
+        self.clear()
+
+    def clear(self):
+        self.n = 0
+        self.mean = np.zeros(3)
+        self.comoment = np.zeros((3, 3))
+        self._removals = 0
+
+    def reset(self, X, y):
+        # Rebuild the statistics from full data in one pass
+        self.clear()
+        Z = np.c_[np.asarray(X, dtype=float), np.asarray(y, dtype=float)]
+        self.n = Z.shape[0]
+        if self.n:
+            self.mean = Z.mean(axis=0)
+            D = Z - self.mean
+            self.comoment = D.T @ D
+
+    def add(self, mass, pull, distance):
+        z = np.array([mass, pull, distance], dtype=float)
+        self.n += 1
+        delta = z - self.mean
+        self.mean = self.mean + delta / self.n
+        self.comoment += np.outer(delta, z - self.mean)
+
+    def extend(self, X, y):
+        # Merge a block of new shots (pairwise combination of the statistics)
+        Z = np.c_[np.asarray(X, dtype=float), np.asarray(y, dtype=float)]
+        m = Z.shape[0]
+        if not m:
+            return
+        block_mean = Z.mean(axis=0)
+        D = Z - block_mean
+        delta = block_mean - self.mean
+        total = self.n + m
+        self.comoment += D.T @ D + np.outer(delta, delta) * (self.n * m / total)
+        self.mean = self.mean + delta * (m / total)
+        self.n = total
+
+    def retract(self, X, y):
+        # Remove a block of shots (the inverse of extend)
+        Z = np.c_[np.asarray(X, dtype=float), np.asarray(y, dtype=float)]
+        m = Z.shape[0]
+        if not m:
+            return
+        if self.n <= m:
+            self.clear()
+            return
+        block_mean = Z.mean(axis=0)
+        D = Z - block_mean
+        rest = self.n - m
+        rest_mean = (self.mean * self.n - block_mean * m) / rest
+        delta = block_mean - rest_mean
+        self.comoment -= D.T @ D + np.outer(delta, delta) * (rest * m / self.n)
+        self.mean = rest_mean
+        self.n = rest
+        self._removals += m
+
+    def remove(self, mass, pull, distance):
+        z = np.array([mass, pull, distance], dtype=float)
+        if self.n <= 1:
+            self.clear()
+            return
+        delta = z - self.mean
+        self.n -= 1
+        self.mean = self.mean - delta / self.n
+        self.comoment -= np.outer(delta, z - self.mean)
+        self._removals += 1
+
+    def replace(self, old_row, new_row):
+        self.remove(*old_row)
+        self.add(*new_row)
+
+    def solve(self):
+        # Returns [b0, b_mass, b_pull], or None when a full re-solve is needed
+        if self.n < 3 or self._removals >= self.refresh_every:
+            return None
+        Sxx = self.comoment[:2, :2]
+        Sxy = self.comoment[:2, 2]
+        if not np.all(np.isfinite(Sxx)) or np.linalg.cond(Sxx) > self.cond_limit:
+            return None
+        slopes = np.linalg.solve(Sxx, Sxy)
+        b0 = self.mean[2] - slopes @ self.mean[:2]
+        return np.r_[b0, slopes]
+
+    def state(self):
+        return {'n': self.n, 'mean': self.mean.tolist(), 'comoment': self.comoment.tolist()}
+
+    def restore(self, state):
+        self.clear()
+        self.n = state['n']
+        self.mean = np.array(state['mean'], dtype=float)
+        self.comoment = np.array(state['comoment'], dtype=float)
+
+    def theta(self, data=None):
+        # data: callable returning (X, y); used to re-solve when the running
+        # statistics are ill-conditioned or have absorbed many removals
+        theta = self.solve()
+        if theta is None and data is not None:
+            X, y = data()
+            self.reset(X, y)
+            theta = batch_theta(np.asarray(X, dtype=float), np.asarray(y, dtype=float))
+        return theta
+
+
+# --- Prediction (vectorized over any array shape) ---
+def predict_pull(theta, mass, target_distance):
+    # theta: [b0, b_mass, b_pull]; solve the plane for pull strength.
+    # mass and target_distance broadcast, so one call covers a grid or a plan.
+    mass = np.asarray(mass, dtype=float)
+    target_distance = np.asarray(target_distance, dtype=float)
+    return (target_distance - theta[0] - theta[1] * mass) / theta[2]
+
+
+# --- Cached fit artifact (skips parsing and fitting when the data is unchanged) ---
+def data_digest(paths):
+    # Content hash of the data files, in order; missing files hash as absent
+    h = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        h.update(os.path.basename(path).encode())
+        if not os.path.exists(path):
+            h.update(b'\0missing')
+            continue
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    return h.hexdigest()
+
+
+def _rows_path(cache_path):
+    return os.path.splitext(cache_path)[0] + '.rows.npz'
+
+
+def save_fit_cache(cache_path, digest, theta, running_fit, rows=None):
+    # rows: optional (n, 3) [mass, pull, distance] array kept next to the fit,
+    # so a first plot needs no parse either
+    if rows is not None:
+        tmp = _rows_path(cache_path) + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, digest=digest, rows=np.asarray(rows, dtype=float))
+        os.replace(tmp, _rows_path(cache_path))
+    tmp = cache_path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'digest': digest, 'theta': np.asarray(theta).tolist(),
+                   'stats': running_fit.state()}, f)
+    os.replace(tmp, cache_path)
+
+
+def load_fit_cache(cache_path, digest, running_fit):
+    # Returns theta and restores running_fit on a digest match, else None
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('digest') != digest:
+        return None
+    running_fit.restore(cached['stats'])
+    return np.array(cached['theta'], dtype=float)
+
+
+def load_cached_rows(cache_path, digest):
+    # The rows saved with the fit on a digest match, else None
+    try:
+        with np.load(_rows_path(cache_path)) as f:
+            if str(f['digest']) != digest:
+                return None
+            return f['rows']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def cached_fit(cache_path, paths, running_fit, data, with_rows=False):
+    # paths: data files to hash; data: callable returning (X, y), only called
+    # on a cache miss.  with_rows: return (theta, rows) with the cached
+    # (n, 3) [mass, pull, distance] rows as well
+    digest = data_digest(paths)
+    theta = load_fit_cache(cache_path, digest, running_fit)
+    rows = None
+    if theta is not None and with_rows:
+        rows = load_cached_rows(cache_path, digest)
+        if rows is None:
+            theta = None  # Cached before the rows were: rebuild both
+    if theta is None:
+        X, y = data()
+        X = np.asarray(X, dtype=float); y = np.asarray(y, dtype=float)
+        running_fit.reset(X, y)
+        theta = batch_theta(X, y)
+        rows = np.c_[X, y]
+        # Re-hash: loading may have normalized the files (e.g. a first import)
+        save_fit_cache(cache_path, data_digest(paths), theta, running_fit,
+                       rows if with_rows else None)
+    return (theta, rows) if with_rows else theta
@@ -0,0 +1,79 @@
+"""Headless firing-plan predictor.
+
+Reads a CSV of (mass, target distance) rows and writes the predicted pull
+strength for each row, one chunk at a time, so plans far larger than memory
+can be processed without opening the GUI.
+
+    python pumpkin_plan.py plan.csv --data "pumpkin 2024.csv" "pumpkin 2025.csv" -o plan_out.csv
+    python pumpkin_plan.py plan.csv --data seasons/ --model interaction/huber -o plan_out.csv
+
+``--model`` picks any model from pumpkin_registry (features/fitter); the
+default is the plane fit the GUI uses.  A ``--data`` directory contributes
+only its season CSVs, and the plan and output files are never read as
+training data, even when they sit in that directory.
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from pumpkin_model import predict_pull, MASS_COL, PULL_COL, DIST_COL
+from pumpkin_seasons import load_seasons
+
+
+def fit_from_files(paths, seasons=None, exclude=()):
+    # Fit theta_best on the training seasons (files or directories)
+    return load_seasons(paths, exclude).fit(seasons)
+
+
+def predict_plan(theta, plan_path, out, chunksize=100_000, model=None):
+    # Stream the plan through in chunks; returns the number of rows written.
+    # With a pumpkin_registry model, its numeric inverse replaces the plane.
+    rows = 0
+    for i, chunk in enumerate(pd.read_csv(plan_path, chunksize=chunksize)):
+        missing = {MASS_COL, DIST_COL} - set(chunk.columns)
+        if missing:
+            raise ValueError(f"{plan_path}: missing column(s) {sorted(missing)}")
+        mass, dist = chunk[MASS_COL].values, chunk[DIST_COL].values
+        pull = model.solve_pull(mass, dist) if model is not None else predict_pull(theta, mass, dist)
+        chunk[PULL_COL] = np.round(pull, 1)
+        chunk.to_csv(out, index=False, header=(i == 0))
+        rows += len(chunk)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predict pull strength for every row of a firing plan CSV.")
+    parser.add_argument('plan', help=f"CSV with '{MASS_COL}' and '{DIST_COL}' columns")
+    parser.add_argument('--data', nargs='+', required=True,
+                        help="training season CSV file(s) or directories with logged shots")
+    parser.add_argument('--season', nargs='+', help="train on these seasons only (default: all)")
+    parser.add_argument('--model', default='plane/ols',
+                        help="registered model as features/fitter, e.g. physics/huber (default: plane/ols)")
+    parser.add_argument('-o', '--output', help="output CSV (default: stdout)")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="rows per chunk (default: 100000)")
+    args = parser.parse_args(argv)
+
+    theta, model = None, None
+    exclude = [args.plan] + ([args.output] if args.output else [])  # Never trained on
+    if args.model == 'plane/ols':
+        theta = fit_from_files(args.data, args.season, exclude)
+    else:
+        from pumpkin_registry import FEATURES, FITTERS, fit_model
+        features, _, fitter = args.model.partition('/')
+        if features not in FEATURES or fitter not in FITTERS:
+            parser.error(f"unknown model {args.model!r}; features: {sorted(FEATURES)}, fitters: {sorted(FITTERS)}")
+        X, y, _ = load_seasons(args.data, exclude).arrays(args.season)
+        model = fit_model(features, fitter, X, y)
+    if args.output:
+        with open(args.output, 'w', newline='') as out:
+            rows = predict_plan(theta, args.plan, out, args.chunksize, model)
+    else:
+        rows = predict_plan(theta, args.plan, sys.stdout, args.chunksize, model)
+    coef = theta if model is None else model.coef
+    print(f"Predicted {rows} shot(s) with {args.model} coefficients {np.round(coef, 6).tolist()}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""Retained-mode 3D scene for the main window.
+
+The data scatter, regression wireframe and prediction marker are created
+once and updated in place.  A full redraw is only requested when the data or
+the model actually changed; moving the prediction marker restores a cached
+background and blits the marker on top.
+"""
+import numpy as np
+import seaborn as sns
+
+from pumpkin_model import predict_pull
+from pumpkin_profile import span
+
+BG = '#1E272E'
+FG = '#D3E0EA'
+NUM_POINTS = 5  # Wireframe grid size; fewer points give a less dense mesh
+
+
+def wireframe_mesh(theta, mass_range, dist_range, num_points=NUM_POINTS):
+    # Returns (mass, pull, distance) meshes of the fitted plane
+    x_range = np.linspace(mass_range[0], mass_range[1], num_points)
+    y_range = np.linspace(dist_range[0], dist_range[1], num_points)
+    x_mesh, y_mesh = np.meshgrid(x_range, y_range)
+    z_mesh = predict_pull(theta, x_mesh, y_mesh)
+    return x_mesh, z_mesh, y_mesh
+
+
+def _mesh_segments(X, Y, Z):
+    # Wireframe polylines: every mesh row and every mesh column
+    rows = [np.c_[X[i], Y[i], Z[i]] for i in range(X.shape[0])]
+    cols = [np.c_[X[:, j], Y[:, j], Z[:, j]] for j in range(X.shape[1])]
+    return rows + cols
+
+
+def _limits(*arrays):
+    lo = min(np.nanmin(a) for a in arrays if np.size(a))
+    hi = max(np.nanmax(a) for a in arrays if np.size(a))
+    pad = 0.05 * (hi - lo) or 1.0
+    return lo - pad, hi + pad
+
+
+class ScenePlot:
+    def __init__(self, ax, canvas):
+        self.ax = ax
+        self.canvas = canvas
+        self.fig = ax.figure
+        self._data = None       # (mass, pull, dist) currently shown
+        self._mesh = None       # (X, Y, Z) of the wireframe currently shown
+        self._band = None       # (lower, upper) pull meshes of the interval band
+        self._theta = None
+        self._prediction = None
+        self._dirty = True      # Needs a full redraw
+        self._background = None
+
+        sns.set_style('darkgrid')
+        sns.set_palette('husl')
+
+        # Dark theme styling, applied once
+        ax.set_facecolor(BG)
+        ax.xaxis.label.set_color(FG)
+        ax.yaxis.label.set_color(FG)
+        ax.zaxis.label.set_color(FG)
+        ax.tick_params(colors=FG, labelsize=16)
+        ax.set_xlabel('Mass (g)', fontsize=16)
+        ax.set_ylabel('Pull Strength (lbs)', fontsize=16)
+        ax.set_zlabel('Distance (feet)', fontsize=16)
+        ax.set_title('3D Scatter Plot of Mass, Pull Strength, and Distance', fontsize=18, color=FG)
+
+        # Persistent artists
+        self.scatter = ax.scatter([], [], [], color='lightblue', marker='o', s=100)
+        self.wireframe = ax.plot_wireframe(np.zeros((2, 2)), np.zeros((2, 2)), np.zeros((2, 2)),
+                                           color='#2ECC71', alpha=0.8)
+        self.band = [ax.plot_wireframe(np.zeros((2, 2)), np.zeros((2, 2)), np.zeros((2, 2)),
+                                       color='#2ECC71', alpha=0.25, linestyle='--')
+                     for _ in range(2)]
+        for artist in self.band:
+            artist.set_visible(False)
+        self.marker = ax.scatter([np.nan], [np.nan], [np.nan], color='#E74C3C', marker='o', s=200,
+                                 label='Prediction', animated=True)
+        self.marker.set_visible(False)
+        self.legend = ax.legend(handles=[self.marker], fontsize=18)
+        self.legend.set_visible(False)
+
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    # --- Scene updates (each is a no-op when nothing changed) ---
+    def set_data(self, mass, pull, dist):
+        data = tuple(np.asarray(a, dtype=float) for a in (mass, pull, dist))
+        if self._data is not None and all(np.array_equal(a, b) for a, b in zip(data, self._data)):
+            return
+        self._data = data
+        self.scatter._offsets3d = data
+        self._dirty = True
+
+    def set_model(self, theta, mass_range, dist_range, interval=None):
+        # interval(mass_mesh, dist_mesh) -> (lower, upper) pull meshes drawn as a band
+        key = (tuple(np.asarray(theta, dtype=float)), tuple(mass_range), tuple(dist_range))
+        if key == self._theta:
+            return
+        self._theta = key
+        self._mesh = wireframe_mesh(theta, mass_range, dist_range)
+        self.wireframe.set_segments(_mesh_segments(*self._mesh))
+        self._band = None
+        if interval is not None:
+            mass_mesh, _, dist_mesh = self._mesh
+            self._band = interval(mass_mesh, dist_mesh)
+            for artist, pull_mesh in zip(self.band, self._band):
+                artist.set_segments(_mesh_segments(mass_mesh, pull_mesh, dist_mesh))
+        for artist in self.band:
+            artist.set_visible(self._band is not None)
+        self._dirty = True
+
+    def set_prediction(self, mass=None, pull=None, dist=None):
+        prediction = None if mass is None else (float(mass), float(pull), float(dist))
+        if prediction == self._prediction:
+            return
+        self._prediction = prediction
+        shown = prediction is not None
+        if shown:
+            self.marker._offsets3d = tuple(np.array([v]) for v in prediction)
+            if not self._within_limits(prediction):
+                self._dirty = True  # Rescale so the marker stays in view
+        if self.legend.get_visible() != shown:
+            self.legend.set_visible(shown)
+            self._dirty = True
+        self.marker.set_visible(shown)
+
+    # --- Drawing ---
+    def draw(self):
+        if self._dirty or self._background is None:
+            self._update_limits()
+            self._dirty = False
+            self.canvas.draw_idle()  # draw_event recaptures the background
+        else:
+            with span('plot.blit'):
+                self.canvas.restore_region(self._background)
+                self._draw_marker()
+                self.canvas.blit(self.fig.bbox)
+
+    def _update_limits(self):
+        if self._data is None or not np.size(self._data[0]):
+            return
+        mass, pull, dist = self._data
+        masses, pulls, dists = [mass], [pull], [dist]
+        if self._mesh is not None:
+            masses.append(self._mesh[0]); pulls.append(self._mesh[1]); dists.append(self._mesh[2])
+        if self._band is not None:
+            pulls.extend(self._band)
+        if self._prediction is not None:
+            masses.append(self._prediction[0]); pulls.append(self._prediction[1]); dists.append(self._prediction[2])
+        self.ax.set_xlim(*_limits(*masses))
+        self.ax.set_ylim(*_limits(*pulls))
+        self.ax.set_zlim(*_limits(*dists))
+
+    def _within_limits(self, point):
+        bounds = (self.ax.get_xlim(), self.ax.get_ylim(), self.ax.get_zlim())
+        return all(lo <= v <= hi for v, (lo, hi) in zip(point, bounds))
+
+    def _on_draw(self, event):
+        # Full redraws (including rotation) leave the animated marker out
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_marker()
+
+    def _draw_marker(self):
+        if self.marker.get_visible():
+            self.marker.do_3d_projection()
+            self.ax.draw_artist(self.marker)
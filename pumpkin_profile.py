@@ -0,0 +1,131 @@
+"""Opt-in timing of the GUI hot paths.
+
+Turned on with ``PUMPKIN_PROFILE=1`` (or ``--profile`` on the command line);
+``PUMPKIN_PROFILE=trace.json`` also writes a Chrome trace of the session on
+exit (open it in chrome://tracing or https://ui.perfetto.dev).  When off,
+``timed`` returns the function unchanged and ``span`` returns one shared
+no-op context manager, so instrumented code pays nothing measurable.
+
+    from pumpkin_profile import span, timed
+
+    @timed('refit_from_df')
+    def refit_from_df(): ...
+
+    with span('store.export_csv'):
+        frame.to_csv(path)
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+_setting = os.environ.get('PUMPKIN_PROFILE', '')
+ENABLED = _setting not in ('', '0')
+TRACE_PATH = _setting if ENABLED and _setting != '1' else None  # Chrome trace written on exit
+
+MAX_EVENTS = 200_000  # Timeline kept for export (oldest dropped first)
+WINDOW = 200          # Recent samples per name behind the percentiles
+
+_events = deque(maxlen=MAX_EVENTS)  # (name, start_ns, duration_ns, thread id)
+_recent = {}                        # name -> deque of recent durations (ns)
+_threads = {}                       # thread id -> thread name
+_NO_SPAN = contextlib.nullcontext()
+
+
+def enable(trace_path=None):
+    # Turn profiling on at runtime; only code instrumented afterwards with
+    # `timed` is wrapped, `span` takes effect immediately
+    global ENABLED, TRACE_PATH
+    ENABLED = True
+    if trace_path:
+        TRACE_PATH = trace_path
+
+
+def record(name, start_ns, duration_ns):
+    tid = threading.get_ident()
+    if tid not in _threads:
+        _threads[tid] = threading.current_thread().name
+    _events.append((name, start_ns, duration_ns, tid))
+    recent = _recent.get(name)
+    if recent is None:
+        recent = _recent.setdefault(name, deque(maxlen=WINDOW))
+    recent.append(duration_ns)
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+
+def span(name):
+    return _Span(name) if ENABLED else _NO_SPAN
+
+
+def timed(name=None):
+    # Decorator; a no-op when profiling is off at decoration time
+    def decorate(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, start, time.perf_counter_ns() - start)
+        return wrapper
+    return decorate
+
+
+def stats():
+    # {name: {'count', 'last_ms', 'p50_ms', 'p95_ms', 'max_ms'}} over the recent window
+    result = {}
+    for name, recent in list(_recent.items()):
+        ms = np.array(recent, dtype=float) / 1e6
+        if not ms.size:
+            continue
+        p50, p95 = np.percentile(ms, [50, 95])
+        result[name] = {'count': len(ms), 'last_ms': float(ms[-1]), 'p50_ms': float(p50),
+                        'p95_ms': float(p95), 'max_ms': float(ms.max())}
+    return result
+
+
+def summary_line(names=None):
+    # One line for a status bar: "name p50/p95 ms | ..."
+    parts = []
+    for name, s in stats().items():
+        if names is None or name in names:
+            parts.append(f"{name} {s['p50_ms']:.1f}/{s['p95_ms']:.1f}")
+    return ("p50/p95 ms: " + " | ".join(parts)) if parts else "p50/p95 ms: (no samples yet)"
+
+
+def export_chrome_trace(path):
+    # Complete ('X') events in the Chrome trace event format, microseconds
+    pid = os.getpid()
+    events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': tname}}
+              for tid, tname in list(_threads.items())]
+    events.extend({'name': name, 'cat': name.split('.')[0], 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': start / 1e3, 'dur': duration / 1e3}
+                  for name, start, duration, tid in list(_events))
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    os.replace(tmp, path)
+    return len(events)
@@ -0,0 +1,341 @@
+"""Registry of distance models beyond the plane fit.
+
+A model is a feature set (how mass and pull become design columns) plus a
+fitter (how the coefficients are estimated), both registered by name:
+
+- features: ``plane`` (the GUI's model), ``interaction`` (adds mass*pull),
+  ``quadratic`` (adds squares and the interaction) and ``physics``
+  (pull/mass, which launch energy per gram scales with, its square root
+  and mass)
+- fitters:  ``ols`` (the standardized QR solve of pumpkin_solver) and
+  ``huber`` (iteratively reweighted least squares with Huber weights, so
+  a few bad shots pull the fit much less)
+
+Every feature/fitter pair is scored by the same repeated k-fold splits,
+spread over a process pool.  The required pull strength comes from
+``solve_pull``, a vectorized numeric inverse that works for any registered
+model.  Fitted models are cached per dataset version.
+
+    python pumpkin_registry.py . --folds 5 --repeats 5 --workers 4
+    python pumpkin_registry.py . --features physics --fitter huber --mass 900 --distance 150
+"""
+import argparse
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pumpkin_solver import fit as ols_fit, RCOND
+
+FEATURES = {}  # name -> f(mass, pull) returning (..., k) design columns
+FITTERS = {}   # name -> f(F, y) returning [b0, b_1, ..., b_k]
+
+HUBER_K = 1.345     # Huber tuning constant (95% efficiency for normal noise)
+IRLS_ITER = 50
+SOLVE_GRID = 65     # Pulls scanned to bracket the target distance
+SOLVE_TOL = 1e-6    # lbs
+SOLVE_ROWS = 65536  # Rows per chunk in solve_pull (bounds memory)
+
+
+def register_features(name):
+    def decorate(func):
+        FEATURES[name] = func
+        return func
+    return decorate
+
+
+def register_fitter(name):
+    def decorate(func):
+        FITTERS[name] = func
+        return func
+    return decorate
+
+
+# --- Feature sets (broadcast over any shape of mass and pull) ---
+@register_features('plane')
+def plane_features(mass, pull):
+    mass, pull = np.broadcast_arrays(np.asarray(mass, dtype=float), np.asarray(pull, dtype=float))
+    return np.stack([mass, pull], axis=-1)
+
+
+@register_features('interaction')
+def interaction_features(mass, pull):
+    mass, pull = np.broadcast_arrays(np.asarray(mass, dtype=float), np.asarray(pull, dtype=float))
+    return np.stack([mass, pull, mass * pull], axis=-1)
+
+
+@register_features('quadratic')
+def quadratic_features(mass, pull):
+    mass, pull = np.broadcast_arrays(np.asarray(mass, dtype=float), np.asarray(pull, dtype=float))
+    return np.stack([mass, pull, mass * mass, pull * pull, mass * pull], axis=-1)
+
+
+@register_features('physics')
+def physics_features(mass, pull):
+    # Launch speed^2 ~ stored energy / mass, and the stored energy grows with pull
+    mass, pull = np.broadcast_arrays(np.asarray(mass, dtype=float), np.asarray(pull, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = pull / mass
+    return np.stack([ratio, np.sqrt(np.clip(ratio, 0, None)), mass], axis=-1)
+
+
+# --- Fitters ---
+@register_fitter('ols')
+def fit_ols(F, y):
+    return ols_fit(F, y)
+
+
+def _weighted_lstsq(F, y, w):
+    # Standardized weighted least squares -> [b0, b_1, ..., b_k]
+    center = np.average(F, axis=0, weights=w)
+    scale = F.std(axis=0)
+    scale[~(scale > 0)] = 1.0
+    A = np.c_[np.ones(len(F)), (F - center) / scale]
+    sw = np.sqrt(w)
+    coef = np.linalg.lstsq(A * sw[:, None], y * sw, rcond=RCOND)[0]
+    slopes = coef[1:] / scale
+    return np.r_[coef[0] - slopes @ center, slopes]
+
+
+@register_fitter('huber')
+def fit_huber(F, y, k=HUBER_K, max_iter=IRLS_ITER, tol=1e-8):
+    coef = ols_fit(F, y)
+    for _ in range(max_iter):
+        resid = y - coef[0] - F @ coef[1:]
+        scale = np.median(np.abs(resid - np.median(resid))) / 0.6745  # Robust sigma (MAD)
+        if not scale > 0:
+            break
+        u = np.abs(resid) / (k * scale)
+        w = 1.0 / np.maximum(u, 1.0)
+        new = _weighted_lstsq(F, y, w)
+        done = np.max(np.abs(new - coef)) <= tol * (1 + np.max(np.abs(coef)))
+        coef = new
+        if done:
+            break
+    return coef
+
+
+# --- Fitted models ---
+class FittedModel:
+    def __init__(self, features, fitter, coef, pull_range):
+        self.features = features
+        self.fitter = fitter
+        self.coef = np.asarray(coef, dtype=float)
+        self.pull_range = tuple(pull_range)  # Pulls solve_pull searches by default
+
+    @property
+    def name(self):
+        return f'{self.features}/{self.fitter}'
+
+    def predict(self, mass, pull):
+        # Distance for any broadcastable mass and pull arrays
+        F = FEATURES[self.features](mass, pull)
+        return self.coef[0] + F @ self.coef[1:]
+
+    def solve_pull(self, mass, distance, lo=None, hi=None):
+        return solve_pull(self, mass, distance, lo, hi)
+
+    def to_dict(self):
+        return {'features': self.features, 'fitter': self.fitter,
+                'coef': self.coef.tolist(), 'pull_range': list(self.pull_range)}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['features'], d['fitter'], d['coef'], d['pull_range'])
+
+
+def fit_model(features, fitter, X, y):
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    coef = FITTERS[fitter](FEATURES[features](X[:, 0], X[:, 1]), y)
+    # Search the logged pulls widened by half their span on each side;
+    # nonlinear fits are not trusted far outside the data
+    if len(X):
+        low, high = float(X[:, 1].min()), float(X[:, 1].max())
+        margin = max(0.5 * (high - low), 1.0)
+        pull_range = (max(low - margin, 0.0), high + margin)
+    else:
+        pull_range = (0.0, 1.0)
+    return FittedModel(features, fitter, coef, pull_range)
+
+
+def solve_pull(model, mass, distance, lo=None, hi=None):
+    # Pull that gives `distance` for each mass, for any model: scan a grid of
+    # pulls for the first point where the distance rises through the target
+    # (a curved fit can also cross it on a falling branch, which is not a
+    # physical answer), then bisect every row at once.  NaN where the
+    # distance is not reached within [lo, hi].
+    lo = model.pull_range[0] if lo is None else lo
+    hi = model.pull_range[1] if hi is None else hi
+    mass, distance = np.broadcast_arrays(np.asarray(mass, dtype=float), np.asarray(distance, dtype=float))
+    shape = mass.shape
+    mass, distance = mass.ravel(), distance.ravel()
+    out = np.full(mass.shape, np.nan)
+    grid = np.linspace(lo, hi, SOLVE_GRID)
+    steps = int(np.ceil(np.log2(max((hi - lo) / (SOLVE_GRID - 1) / SOLVE_TOL, 1.0))))
+    for start in range(0, len(mass), SOLVE_ROWS):
+        m = mass[start:start + SOLVE_ROWS]
+        d = distance[start:start + SOLVE_ROWS]
+        gap = model.predict(m[:, None], grid[None, :]) - d[:, None]
+        crossing = (gap[:, :-1] < 0) & (gap[:, 1:] >= 0)
+        found = crossing.any(axis=1)
+        first = np.argmax(crossing, axis=1)
+        rows = np.arange(len(m))
+        a, b = grid[first], grid[first + 1]
+        fa = gap[rows, first]
+        for _ in range(steps):
+            mid = 0.5 * (a + b)
+            fm = model.predict(m, mid) - d
+            left = np.signbit(fm) == np.signbit(fa)
+            a = np.where(left, mid, a)
+            fa = np.where(left, fm, fa)
+            b = np.where(left, b, mid)
+        out[start:start + SOLVE_ROWS] = np.where(found, 0.5 * (a + b), np.nan)
+    return out.reshape(shape)
+
+
+# --- Per-dataset-version cache ---
+def dataset_version(X, y):
+    # Content hash of the training arrays
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(X, dtype=float).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=float).tobytes())
+    return h.hexdigest()
+
+
+class ModelCache:
+    """Fitted models keyed by (dataset version, features, fitter).
+
+    In memory (least recently used entries are dropped first), and in a JSON
+    file when ``path`` is given, so a rerun on unchanged data refits nothing.
+    """
+
+    def __init__(self, path=None, max_entries=64):
+        self.path = path
+        self.max_entries = max_entries
+        self.models = OrderedDict()
+        if path is not None:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    for key, d in json.load(f).items():
+                        self.models[key] = FittedModel.from_dict(d)
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def get(self, features, fitter, X, y, version=None):
+        version = dataset_version(X, y) if version is None else version
+        key = f'{version}:{features}:{fitter}'
+        model = self.models.get(key)
+        if model is None:
+            model = fit_model(features, fitter, X, y)
+            self.models[key] = model
+            while len(self.models) > self.max_entries:
+                self.models.popitem(last=False)
+            self._save()
+        else:
+            self.models.move_to_end(key)
+        return model
+
+    def _save(self):
+        if self.path is None:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({key: m.to_dict() for key, m in self.models.items()}, f)
+        os.replace(tmp, self.path)
+
+
+# --- Cross-validated comparison ---
+def _cv_job(args):
+    # Every fold of one repeat for one candidate; top-level for worker processes
+    features, fitter, X, y, splits = args
+    sq, count, pull_err = 0.0, 0, []
+    for train, test in splits:
+        model = fit_model(features, fitter, X[train], y[train])
+        resid = y[test] - model.predict(X[test, 0], X[test, 1])
+        sq += float(resid @ resid)
+        count += len(test)
+        pull_err.append(model.solve_pull(X[test, 0], y[test]) - X[test, 1])
+    pull_err = np.concatenate(pull_err)
+    solved = np.isfinite(pull_err)
+    return (features, fitter, np.sqrt(sq / count),
+            float(np.abs(pull_err[solved]).mean()) if solved.any() else np.nan,
+            float(solved.mean()))
+
+
+def compare(X, y, features=None, fitters=None, folds=5, repeats=1, seed=0, workers=None):
+    # Returns [{'model', 'rmse', 'pull mae', 'solved'}, ...] best (lowest CV RMSE) first;
+    # every candidate sees the same splits
+    from pumpkin_errors import _splits
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    features = list(FEATURES) if features is None else features
+    fitters = list(FITTERS) if fitters is None else fitters
+    folds = min(folds, len(y))
+    splits = list(_splits(len(y), folds, repeats, seed))
+    per_repeat = [splits[r * folds:(r + 1) * folds] for r in range(repeats)]
+    jobs = [(f, fit, X, y, part) for f in features for fit in fitters for part in per_repeat]
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_cv_job, jobs))
+    else:
+        results = [_cv_job(job) for job in jobs]
+
+    scores = {}
+    for f, fit, rmse, mae, solved in results:
+        scores.setdefault((f, fit), []).append((rmse, mae, solved))
+    table = []
+    for (f, fit), values in scores.items():
+        rmse, mae, solved = np.array(values).T
+        table.append({'model': f'{f}/{fit}', 'features': f, 'fitter': fit,
+                      'rmse': float(rmse.mean()), 'rmse sd': float(rmse.std()),
+                      'pull mae': float(np.nanmean(mae)) if np.isfinite(mae).any() else None,
+                      'solved': float(solved.mean())})
+    table.sort(key=lambda row: row['rmse'])
+    return table
+
+
+def main(argv=None):
+    from pumpkin_model import data_digest
+    from pumpkin_seasons import load_seasons
+
+    parser = argparse.ArgumentParser(description="Compare registered distance models by cross-validation.")
+    parser.add_argument('paths', nargs='+', help="season CSV files and/or directories")
+    parser.add_argument('--season', nargs='+', help="use only these seasons (default: all)")
+    parser.add_argument('--features', nargs='+', choices=sorted(FEATURES), help="feature sets (default: all)")
+    parser.add_argument('--fitter', nargs='+', choices=sorted(FITTERS), help="fitters (default: all)")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--mass', type=float, help="also predict the pull for this mass (g) ...")
+    parser.add_argument('--distance', type=float, help="... and this target distance (feet)")
+    parser.add_argument('--cache', help="keep fitted models in this JSON file between runs")
+    parser.add_argument('--report', help="write the comparison as JSON to this file")
+    args = parser.parse_args(argv)
+
+    data = load_seasons(args.paths)
+    X, y, _ = data.arrays(args.season)
+    table = compare(X, y, args.features, args.fitter, args.folds, args.repeats, args.seed, args.workers)
+    print(f"{'model':<22}{'cv rmse (ft)':>14}{'pull mae (lbs)':>16}{'solved':>8}")
+    for row in table:
+        mae = f"{row['pull mae']:.2f}" if row['pull mae'] is not None else 'n/a'
+        print(f"{row['model']:<22}{row['rmse']:>14.2f}{mae:>16}{row['solved']:>8.0%}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'rows': len(y), 'folds': args.folds, 'repeats': args.repeats, 'models': table}, f, indent=2)
+
+    if args.mass is not None and args.distance is not None:
+        cache = ModelCache(args.cache)
+        version = data_digest([data.sources[data.seasons.index(s)] for s in (args.season or data.seasons)])
+        for row in table:
+            model = cache.get(row['features'], row['fitter'], X, y, version)
+            pull = float(model.solve_pull(args.mass, args.distance))
+            print(f"{model.name}: pull {pull:.1f} lbs for {args.mass:g} g at {args.distance:g} ft")
+
+
+if __name__ == '__main__':
+    main()
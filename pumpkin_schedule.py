@@ -0,0 +1,215 @@
+"""Launch scheduler: pair the pumpkins on hand with the target distances.
+
+The required pull for every (pumpkin, target) pair comes from one broadcast
+``predict_pull`` over the whole grid.  Pairs above the launcher's maximum
+safe pull are ruled out, and the pairing is an optimal assignment that
+minimizes either the total pull or the peak pull (with the total as the
+tie-break).  scipy's ``linear_sum_assignment`` is used when scipy is
+installed, a NumPy Hungarian solver otherwise.
+
+    python pumpkin_schedule.py pumpkins.csv targets.csv --data . --max-pull 900 --objective peak -o order.csv
+
+``pumpkins.csv`` needs a ``mass(g)`` column and ``targets.csv`` a
+``distance feet`` column; an optional ``name`` column labels the rows.
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from pumpkin_model import predict_pull, MASS_COL, PULL_COL, DIST_COL
+
+try:
+    from scipy.optimize import linear_sum_assignment as _scipy_assignment
+except ImportError:  # Optional: the NumPy solver below is used instead
+    _scipy_assignment = None
+
+
+def pull_matrix(theta, masses, distances):
+    # (pumpkins, targets) required pull strengths in one vectorized pass
+    masses = np.asarray(masses, dtype=float)
+    distances = np.asarray(distances, dtype=float)
+    return predict_pull(theta, masses[:, None], distances[None, :])
+
+
+def _hungarian(cost):
+    # Shortest augmenting path Hungarian method, O(n^2 m) with NumPy inner
+    # loops; cost is (n, m) with n <= m.  Returns the column of each row.
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.intp)    # Row matched to each column (1-based, 0 = free)
+    way = np.zeros(m + 1, dtype=np.intp)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+            j1 = int(np.argmin(np.where(free, minv[1:], np.inf))) + 1
+            delta = minv[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    cols = np.empty(n, dtype=np.intp)
+    matched = np.flatnonzero(p[1:])
+    cols[p[1:][matched] - 1] = matched
+    return cols
+
+
+def solve_assignment(cost):
+    # Minimum-cost matching of min(rows, cols) pairs; returns (rows, cols)
+    cost = np.asarray(cost, dtype=float)
+    if _scipy_assignment is not None:
+        return _scipy_assignment(cost)
+    if cost.shape[0] <= cost.shape[1]:
+        return np.arange(cost.shape[0]), _hungarian(cost)
+    cols = _hungarian(cost.T)
+    order = np.argsort(cols)
+    return cols[order], np.arange(cost.shape[1])[order]
+
+
+def _forbid(cost, allowed):
+    # Disallowed pairs get a cost larger than any full matching of allowed ones
+    finite = cost[allowed]
+    span = (finite.max() - finite.min() + 1.0) if finite.size else 1.0
+    big = (finite.max() if finite.size else 0.0) + span * (min(cost.shape) + 1)
+    return np.where(allowed, cost, big)
+
+
+def assign(pull, max_pull=None, min_pull=0.0, objective='total'):
+    # Returns (pumpkin indices, target indices) of the chosen pairs; pairs
+    # that would need an unsafe pull are never chosen, so fewer than
+    # min(pumpkins, targets) shots come back when there are not enough safe pairs
+    pull = np.asarray(pull, dtype=float)
+    allowed = np.isfinite(pull) & (pull >= min_pull)
+    if max_pull is not None:
+        allowed &= pull <= max_pull
+    if not allowed.any():
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    if objective not in ('total', 'peak'):
+        raise ValueError(f"objective must be 'total' or 'peak', not {objective!r}")
+    rows, cols = solve_assignment(_forbid(pull, allowed))
+    keep = allowed[rows, cols]
+    rows, cols = rows[keep], cols[keep]
+    if objective == 'total' or not len(rows):
+        return rows, cols
+
+    # Bottleneck: the smallest threshold that still allows as many safe
+    # shots, by bisection over the distinct pulls between a lower bound and
+    # the peak of the min-total pairing
+    best = len(rows)
+    levels = np.unique(pull[allowed])
+    lo = 0
+    if best == min(pull.shape):
+        # Every pumpkin (or every target) is matched, so the peak is at least
+        # the largest of their cheapest safe pulls
+        axis = 1 if pull.shape[0] <= pull.shape[1] else 0
+        floor = np.where(allowed, pull, np.inf).min(axis=axis).max()
+        lo = int(np.searchsorted(levels, floor))
+    hi = int(np.searchsorted(levels, pull[rows, cols].max()))
+    while lo < hi:
+        mid = (lo + hi) // 2
+        ok = allowed & (pull <= levels[mid])
+        r, c = solve_assignment(_forbid(np.zeros_like(pull), ok))
+        if _matched(ok, r, c) >= best:
+            hi = mid
+        else:
+            lo = mid + 1
+    allowed = allowed & (pull <= levels[hi])
+    rows, cols = solve_assignment(_forbid(pull, allowed))
+    keep = allowed[rows, cols]
+    return rows[keep], cols[keep]
+
+
+def _matched(allowed, rows, cols):
+    return int(allowed[rows, cols].sum())
+
+
+def shot_order(pumpkins, targets, pull, rows, cols, order='pull'):
+    # DataFrame of the scheduled shots; 'pull' orders them from the lightest
+    # pull up, 'distance' from the nearest target out
+    import pandas as pd
+    plan = pd.DataFrame({
+        'pumpkin': pumpkins['name'].values[rows] if 'name' in pumpkins else rows + 1,
+        MASS_COL: pumpkins[MASS_COL].values[rows],
+        'target': targets['name'].values[cols] if 'name' in targets else cols + 1,
+        DIST_COL: targets[DIST_COL].values[cols],
+        PULL_COL: np.round(pull[rows, cols], 1),
+    })
+    key = PULL_COL if order == 'pull' else DIST_COL
+    plan = plan.sort_values(key, kind='stable').reset_index(drop=True)
+    plan.insert(0, 'shot', np.arange(1, len(plan) + 1))
+    return plan
+
+
+def schedule(theta, pumpkins, targets, max_pull=None, objective='total', order='pull'):
+    # Returns (shot order DataFrame, unscheduled pumpkin rows, unscheduled target rows)
+    pull = pull_matrix(theta, pumpkins[MASS_COL].values, targets[DIST_COL].values)
+    rows, cols = assign(pull, max_pull, objective=objective)
+    plan = shot_order(pumpkins, targets, pull, rows, cols, order)
+    left_pumpkins = np.setdiff1d(np.arange(len(pumpkins)), rows)
+    left_targets = np.setdiff1d(np.arange(len(targets)), cols)
+    return plan, left_pumpkins, left_targets
+
+
+def format_order(plan, left_pumpkins=(), left_targets=()):
+    # Printable shot sheet
+    lines = [plan.to_string(index=False)]
+    if len(plan):
+        lines.append(f"\n{len(plan)} shot(s); total pull {plan[PULL_COL].sum():.1f} lbs, "
+                     f"peak {plan[PULL_COL].max():.1f} lbs")
+    if len(left_pumpkins):
+        lines.append(f"Pumpkins not scheduled (rows): {(np.asarray(left_pumpkins) + 1).tolist()}")
+    if len(left_targets):
+        lines.append(f"Targets not scheduled (rows): {(np.asarray(left_targets) + 1).tolist()}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    import pandas as pd
+    from pumpkin_plan import fit_from_files
+
+    parser = argparse.ArgumentParser(description="Pair pumpkins with target distances and print the shot order.")
+    parser.add_argument('pumpkins', help=f"CSV with a '{MASS_COL}' column (optional 'name')")
+    parser.add_argument('targets', help=f"CSV with a '{DIST_COL}' column (optional 'name')")
+    parser.add_argument('--data', nargs='+', required=True,
+                        help="training season CSV file(s) or directories with logged shots")
+    parser.add_argument('--season', nargs='+', help="train on these seasons only (default: all)")
+    parser.add_argument('--max-pull', type=float, help="maximum safe pull strength (lbs)")
+    parser.add_argument('--objective', choices=['total', 'peak'], default='total',
+                        help="minimize the total pull or the largest single pull")
+    parser.add_argument('--order', choices=['pull', 'distance'], default='pull',
+                        help="shot order: lightest pull first, or nearest target first")
+    parser.add_argument('-o', '--output', help="also write the shot order to this CSV")
+    args = parser.parse_args(argv)
+
+    pumpkins = pd.read_csv(args.pumpkins)
+    targets = pd.read_csv(args.targets)
+    theta = fit_from_files(args.data, args.season)
+    plan, left_pumpkins, left_targets = schedule(theta, pumpkins, targets, args.max_pull,
+                                                 args.objective, args.order)
+    print(format_order(plan, left_pumpkins, left_targets))
+    if args.output:
+        plan.to_csv(args.output, index=False)
+    if not len(plan):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""Multi-season shot log loader with a memory-mapped columnar cache.
+
+Each season CSV (e.g. ``pumpkin 2024.csv``) is validated, tagged with its
+season and stored as one ``.npy`` file per column under ``.pumpkin_cache``
+next to the CSV.  The cache is keyed on the file's size and mtime, with a
+content hash as the fallback check, so reloading unchanged seasons only
+memory-maps the columns and never re-parses text.
+
+    python pumpkin_seasons.py .                  # every season CSV in a directory
+    python pumpkin_seasons.py "pumpkin 2025.csv" --season 2025
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+from pumpkin_model import batch_theta, MASS_COL, PULL_COL, DIST_COL
+from pumpkin_solver import fit_groups
+
+COLUMNS = [MASS_COL, PULL_COL, DIST_COL]
+CACHE_DIR = '.pumpkin_cache'
+
+
+def season_name(path):
+    # 'pumpkin 2024.csv' -> '2024'; otherwise the file stem
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = re.search(r'(19|20)\d\d', stem)
+    return match.group(0) if match else stem
+
+
+def is_season_csv(path):
+    # Whether the header is exactly the season columns, in order (only the
+    # header line is read).  Plan output has them in another order and error
+    # reports add columns, so neither passes for season data.
+    import csv
+    try:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            header = next(csv.reader(f), [])
+    except (OSError, UnicodeDecodeError):
+        return False
+    return [name.strip() for name in header] == COLUMNS
+
+
+def expand_paths(paths, exclude=()):
+    # Files are taken as given; directories contribute every *.csv inside
+    # that is a season file, so plan output and error reports saved next to
+    # the seasons are skipped (with a warning).  exclude: files to leave
+    # out, e.g. the caller's own output.
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    excluded = {os.path.abspath(p) for p in exclude}
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for found in sorted(glob.glob(os.path.join(path, '*.csv'))):
+                if os.path.abspath(found) in excluded:
+                    continue
+                if is_season_csv(found):
+                    files.append(found)
+                else:
+                    print(f"Skipping {found}: not a season file (needs columns {COLUMNS})", file=sys.stderr)
+        elif os.path.abspath(path) not in excluded:
+            files.append(path)
+    return files
+
+
+def _file_hash(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def parse_season_csv(path):
+    # Returns a dict of float64 columns; raises ValueError on a bad schema
+    import pandas as pd
+    data = pd.read_csv(path)
+    missing = [c for c in COLUMNS if c not in data.columns]
+    if missing:
+        raise ValueError(f"{path}: missing column(s) {missing}")
+    columns = {}
+    for c in COLUMNS:
+        values = pd.to_numeric(data[c], errors='coerce').to_numpy(dtype=float)
+        bad = np.flatnonzero(~np.isfinite(values))
+        if bad.size:
+            raise ValueError(f"{path}: non-numeric '{c}' value on line {bad[0] + 2}")
+        columns[c] = values
+    return columns
+
+
+class SeasonCache:
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+        self.dir = os.path.join(directory, os.path.basename(path))
+        self.meta_path = os.path.join(self.dir, 'meta.json')
+
+    def _column_path(self, i):
+        return os.path.join(self.dir, f'col{i}.npy')
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta):
+        tmp = self.meta_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.meta_path)
+
+    def load(self):
+        # Memory-mapped columns, re-parsing the CSV only when it changed
+        st = os.stat(self.path)
+        meta = self._read_meta()
+        if meta is not None and (meta['size'], meta['mtime_ns']) != (st.st_size, st.st_mtime_ns):
+            # Touched but maybe not changed (copied, checked out again...)
+            if meta['size'] == st.st_size and meta['hash'] == _file_hash(self.path):
+                meta.update(mtime_ns=st.st_mtime_ns)
+                self._write_meta(meta)
+            else:
+                meta = None
+        if meta is None:
+            columns = parse_season_csv(self.path)
+            os.makedirs(self.dir, exist_ok=True)
+            for i, c in enumerate(COLUMNS):
+                np.save(self._column_path(i), columns[c])
+            self._write_meta({'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                              'hash': _file_hash(self.path), 'rows': len(columns[MASS_COL])})
+        return [np.load(self._column_path(i), mmap_mode='r') for i in range(len(COLUMNS))]
+
+
+class SeasonData:
+    """Shot logs from several seasons, one memory-mapped column set per season."""
+
+    def __init__(self, paths, exclude=()):
+        self.seasons = []   # Season names, in load order
+        self.sources = []   # CSV path of each season
+        self.columns = []   # [mass, pull, dist] memmaps of each season
+        for path in expand_paths(paths, exclude):
+            name = season_name(path)
+            if name in self.seasons:
+                name = os.path.splitext(os.path.basename(path))[0]
+            self.seasons.append(name)
+            self.sources.append(path)
+            self.columns.append(SeasonCache(path).load())
+
+    def _indices(self, seasons):
+        if seasons is None:
+            return range(len(self.seasons))
+        if isinstance(seasons, str):
+            seasons = [seasons]
+        unknown = set(seasons) - set(self.seasons)
+        if unknown:
+            raise KeyError(f"unknown season(s) {sorted(unknown)}; have {self.seasons}")
+        return [self.seasons.index(s) for s in seasons]
+
+    def arrays(self, seasons=None):
+        # (X, y, season_codes) for a subset of seasons; codes index self.seasons
+        idx = self._indices(seasons)
+        mass = np.concatenate([self.columns[i][0] for i in idx]) if idx else np.empty(0)
+        pull = np.concatenate([self.columns[i][1] for i in idx]) if idx else np.empty(0)
+        dist = np.concatenate([self.columns[i][2] for i in idx]) if idx else np.empty(0)
+        codes = np.concatenate([np.full(len(self.columns[i][0]), i) for i in idx]) if idx else np.empty(0, int)
+        return np.c_[mass, pull], dist, codes
+
+    def fit(self, seasons=None):
+        X, y, _ = self.arrays(seasons)
+        return batch_theta(X, y)
+
+    def fit_each(self, seasons=None):
+        # {season: theta} from one batched solve over the selected seasons
+        X, y, codes = self.arrays(seasons)
+        thetas = fit_groups(X, y, codes, len(self.seasons))
+        return {self.seasons[i]: thetas[i] for i in self._indices(seasons)}
+
+    def to_frame(self, seasons=None):
+        # DataFrame in the CSV schema plus 'season' and 'source' columns
+        import pandas as pd
+        X, y, codes = self.arrays(seasons)
+        return pd.DataFrame({MASS_COL: X[:, 0], PULL_COL: X[:, 1], DIST_COL: y,
+                             'season': np.array(self.seasons, dtype=object)[codes],
+                             'source': np.array(self.sources, dtype=object)[codes]})
+
+
+def load_seasons(paths, exclude=()):
+    return SeasonData(paths, exclude)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load season CSVs through the columnar cache and fit them.")
+    parser.add_argument('paths', nargs='+', help="season CSV files and/or directories")
+    parser.add_argument('--season', nargs='+', help="fit only these seasons (default: all)")
+    args = parser.parse_args(argv)
+
+    data = load_seasons(args.paths)
+    for name, source, cols in zip(data.seasons, data.sources, data.columns):
+        print(f"{name}: {len(cols[0])} shot(s) from {source}")
+    for name, season_theta in data.fit_each(args.season).items():
+        print(f"{name}: theta [b0, b_mass, b_pull] = {np.round(season_theta, 6).tolist()}")
+    theta = data.fit(args.season)
+    print(f"theta_best [b0, b_mass, b_pull] = {np.round(theta, 6).tolist()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,379 @@
+"""Local prediction service shared by several launch stations.
+
+A small asyncio HTTP/JSON server (standard library only) on top of the
+model core.  It owns the shot log (a ``ShotStore``) and publishes the fitted
+model as an immutable snapshot; edits are applied and refit on an executor
+thread and the new snapshot is swapped in with one reference assignment, so
+in-flight requests keep using the model they started with.
+
+    python pumpkin_service.py "pumpkin 2025.csv" --port 8765
+    PUMPKIN_SERVICE=http://127.0.0.1:8765 python p-LR-model.py
+
+Endpoints (JSON in, JSON out):
+
+    GET  /model     {"version", "theta", "rows"}
+    GET  /data      {"version", "rows": [[id, mass, pull, distance], ...]}
+    POST /predict   {"mass": m, "distance": d, "interval": false}
+                    mass/distance may be lists for a batch; returns "pull"
+    POST /ids       {"count": n} -> {"ids": [...]} reserved row ids
+    POST /edits     {"edits": [{"op": "add", "row": [m, p, d], "id": optional},
+                                {"op": "update", "id": i, "row": [m, p, d]},
+                                {"op": "delete", "ids": [...]},
+                                {"op": "txn", "ids": [...], "rows": [[m, p, d] or null, ...],
+                                 "added": [true for new rows, ...]}]}
+                    -> {"ids": [ids of added rows], "version", "previous"}
+
+A txn only adds the ids flagged in "added" (all of them when it is left
+out); the others change rows that still exist, so an edit from a station
+that has not seen another station's delete does not bring the row back.
+An "add" with an id that is already taken rejects the batch with 409.
+"""
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import threading
+import traceback
+import urllib.request
+from collections import namedtuple
+
+import numpy as np
+
+from pumpkin_model import RunningFit, predict_pull
+from pumpkin_intervals import ols_uncertainty, analytic_interval
+
+# Immutable published model; replaced as a whole on every refit
+Model = namedtuple('Model', 'version theta uncertainty rows')
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 500: 'Internal Server Error'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PredictionService:
+    def __init__(self, store):
+        self.store = store
+        self.fit = RunningFit()
+        self.model = None
+        self._edit_lock = threading.Lock()  # Serializes edits and refits
+
+    def load(self):
+        frame = self.store.load()
+        self.fit.reset(frame.iloc[:, :2].values, frame.iloc[:, 2].values)
+        self.model = self._snapshot(1)
+
+    def _snapshot(self, version):
+        theta = self.fit.theta(data=self._store_arrays)
+        uncertainty = ols_uncertainty(self.fit.n, self.fit.mean, self.fit.comoment)
+        return Model(version, theta, uncertainty, self.fit.n)
+
+    def _store_arrays(self):
+        frame = self.store.to_frame()
+        return frame.iloc[:, :2].values, frame.iloc[:, 2].values
+
+    # --- Request handlers (all but edits run directly on the event loop) ---
+    def get_model(self, body):
+        model = self.model
+        return {'version': model.version, 'theta': model.theta.tolist(), 'rows': model.rows}
+
+    def get_data(self, body):
+        model = self.model
+        frame = self.store.to_frame()
+        rows = np.c_[frame.index.values, frame.values].tolist()
+        return {'version': model.version, 'rows': rows}
+
+    def predict(self, body):
+        model = self.model  # One snapshot for the whole request
+        try:
+            mass = np.asarray(body['mass'], dtype=float)
+            distance = np.asarray(body['distance'], dtype=float)
+        except (KeyError, TypeError, ValueError):
+            raise HTTPError(400, "expected numeric 'mass' and 'distance'")
+        result = {'version': model.version}
+        if body.get('interval'):
+            theta, cov, s2, dof = model.uncertainty
+            pull, ci, pi = analytic_interval(model.theta, cov, s2, dof, mass, distance)
+            result.update(ci=[np.asarray(a).tolist() for a in ci], pi=[np.asarray(a).tolist() for a in pi])
+        else:
+            pull = predict_pull(model.theta, mass, distance)
+        result['pull'] = np.asarray(pull).tolist()
+        return result
+
+    def reserve_ids(self, body):
+        count = int(body.get('count', 1))
+        return {'ids': self.store.new_ids(count)}
+
+    @staticmethod
+    def _check_edit(edit):
+        # Normalized copy of one edit; raises HTTPError(400) for anything malformed
+        def row_of(values):
+            row = [float(v) for v in values]
+            if len(row) != 3 or not np.all(np.isfinite(row)):
+                raise ValueError("a row is three finite numbers")
+            return row
+
+        op = edit.get('op') if isinstance(edit, dict) else None
+        try:
+            if op == 'add':
+                row_id = edit.get('id')
+                return {'op': op, 'row': row_of(edit['row']), 'id': None if row_id is None else int(row_id)}
+            if op == 'update':
+                return {'op': op, 'id': int(edit['id']), 'row': row_of(edit['row'])}
+            if op == 'delete':
+                return {'op': op, 'ids': [int(i) for i in edit['ids']]}
+            if op == 'txn':
+                ids = [int(i) for i in edit['ids']]
+                rows = [None if row is None else row_of(row) for row in edit['rows']]
+                added = edit.get('added')
+                added = [True] * len(ids) if added is None else [bool(a) for a in added]
+                if not len(ids) == len(rows) == len(added):
+                    raise ValueError(f"{len(ids)} id(s), {len(rows)} row(s) and {len(added)} added flag(s)")
+                return {'op': op, 'ids': ids, 'rows': rows, 'added': added}
+        except (KeyError, TypeError, ValueError) as exc:
+            raise HTTPError(400, f"malformed {op} edit: {exc}")
+        raise HTTPError(400, f"unknown edit op {op!r}")
+
+    def apply_edits(self, body):
+        # Runs on an executor thread; the new snapshot is published before returning.
+        # The whole batch is checked before anything changes, so a bad edit
+        # rejects it with 400 and leaves the data alone.
+        edits = body.get('edits')
+        if not isinstance(edits, list):
+            raise HTTPError(400, "expected an 'edits' list")
+        edits = [self._check_edit(edit) for edit in edits]
+        with self._edit_lock:
+            self._check_ids(edits)
+            previous = self.model.version
+            added = []
+            try:
+                for edit in edits:
+                    self._apply_edit(edit, added)
+            except Exception:
+                # Not a bad request (e.g. the journal could not be written):
+                # bring the fit back in line with what the store kept
+                self.fit.reset(*self._store_arrays())
+                self.model = self._snapshot(previous + 1)
+                raise
+            model = self._snapshot(previous + 1)
+            self.model = model  # Atomic hot swap
+        return {'ids': added, 'version': model.version, 'previous': previous}
+
+    def _check_ids(self, edits):
+        # Caller holds _edit_lock.  An add must not reuse a taken id: the store
+        # would overwrite the row while the fit counted it twice.
+        taken = set()
+        for edit in edits:
+            row_id = edit['id'] if edit['op'] == 'add' else None
+            if row_id is None:
+                continue
+            if row_id in self.store.rows or row_id in taken:
+                raise HTTPError(409, f"row id {row_id} is already taken")
+            taken.add(row_id)
+
+    def _apply_edit(self, edit, added):
+        # Caller holds _edit_lock; edit is already checked
+        op = edit['op']
+        if op == 'add':
+            added.append(self.store.add(*edit['row'], row_id=edit['id']))
+            self.fit.add(*edit['row'])
+        elif op == 'update':
+            old = self.store.rows.get(edit['id'])
+            if old is None:
+                return  # Deleted by another station
+            self.store.update(edit['id'], *edit['row'])
+            self.fit.replace(old, edit['row'])
+        elif op == 'delete':
+            ids = [i for i in edit['ids'] if i in self.store.rows]
+            old = [self.store.rows[i] for i in ids]
+            self.store.delete(ids)
+            for row in old:
+                self.fit.remove(*row)
+        elif op == 'txn':
+            # Unflagged ids another station deleted meanwhile are skipped
+            kept = [(i, row) for i, row, new in zip(edit['ids'], edit['rows'], edit['added'])
+                    if new or i in self.store.rows]
+            old = [self.store.rows.get(i) for i, _ in kept]
+            self.store.commit([i for i, _ in kept], [row for _, row in kept])
+            for before, (_, row) in zip(old, kept):
+                if before is not None:
+                    self.fit.remove(*before)
+                if row is not None:
+                    self.fit.add(*row)
+
+    # --- HTTP plumbing ---
+    ROUTES = {
+        ('GET', '/model'): ('get_model', False),
+        ('GET', '/data'): ('get_data', True),
+        ('POST', '/predict'): ('predict', False),
+        ('POST', '/ids'): ('reserve_ids', False),
+        ('POST', '/edits'): ('apply_edits', True),
+    }
+
+    async def dispatch(self, method, path, body):
+        route = self.ROUTES.get((method, path))
+        if route is None:
+            if any(p == path for _, p in self.ROUTES):
+                raise HTTPError(405, f"{method} not allowed on {path}")
+            raise HTTPError(404, f"no route {path}")
+        name, blocking = route
+        handler = getattr(self, name)
+        if blocking:
+            # Refits and full-table reads run off the event loop
+            return await asyncio.get_running_loop().run_in_executor(None, handler, body)
+        return handler(body)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                raw = await reader.readexactly(length) if length else b''
+                try:
+                    body = json.loads(raw) if raw else {}
+                    if not isinstance(body, dict):
+                        raise HTTPError(400, "expected a JSON object")
+                    status, payload = 200, await self.dispatch(method, path.split('?', 1)[0], body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {'error': str(exc)}
+                except (ValueError, KeyError, TypeError) as exc:
+                    status, payload = 400, {'error': str(exc)}
+                except Exception as exc:
+                    traceback.print_exc()  # Answer anyway so the client does not hang up blind
+                    status, payload = 500, {'error': f"{type(exc).__name__}: {exc}"}
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+class RemoteStore:
+    """ShotStore stand-in that keeps the shot log in a pumpkin_service instance.
+
+    Lets the GUI point at a shared service instead of its own CSV copy.
+    ``stale`` turns true when another station changed the data.
+    """
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.version = None
+        self.stale = False
+
+    def _call(self, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode()
+        req = urllib.request.Request(self.url + path, data=data,
+                                     headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read())
+
+    def files(self):
+        return []  # Nothing local to hash
+
+    def load(self):
+        import pandas as pd
+        from pumpkin_store import COLUMNS
+        reply = self._call('/data')
+        self.version, self.stale = reply['version'], False
+        rows = np.array(reply['rows'], dtype=float).reshape(-1, 4)
+        return pd.DataFrame(rows[:, 1:], index=rows[:, 0].astype(int), columns=COLUMNS)
+
+    def model(self):
+        reply = self._call('/model')
+        if self.version is not None and reply['version'] != self.version:
+            self.stale = True
+        return reply
+
+    def new_id(self):
+        return self._call('/ids', {'count': 1})['ids'][0]
+
+    def new_ids(self, count):
+        return self._call('/ids', {'count': count})['ids']
+
+    def _edit(self, edit):
+        reply = self._call('/edits', {'edits': [edit]})
+        if reply['previous'] != self.version:
+            self.stale = True  # Someone else edited in between
+        self.version = reply['version']
+        return reply
+
+    def add(self, mass, pull, distance, row_id=None):
+        edit = {'op': 'add', 'row': [mass, pull, distance]}
+        if row_id is not None:
+            edit['id'] = row_id
+        return self._edit(edit)['ids'][0]
+
+    def update(self, row_id, mass, pull, distance):
+        self._edit({'op': 'update', 'id': row_id, 'row': [mass, pull, distance]})
+
+    def delete(self, row_ids):
+        self._edit({'op': 'delete', 'ids': [int(i) for i in row_ids]})
+
+    def commit(self, ids, rows, added=None):
+        rows = [None if row is None or row[0] != row[0] else [float(v) for v in row] for row in rows]
+        edit = {'op': 'txn', 'ids': [int(i) for i in ids], 'rows': rows}
+        if added is not None:
+            edit['added'] = [bool(a) for a in added]
+        self._edit(edit)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def main(argv=None):
+    from pumpkin_store import ShotStore
+
+    parser = argparse.ArgumentParser(description="Serve predictions and shot edits over HTTP/JSON.")
+    parser.add_argument('data', help="shot log CSV (journaled next to it, like the GUI)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    store = ShotStore(args.data)
+    service = PredictionService(store)
+    service.load()
+    print(f"Serving {service.model.rows} shot(s) on http://{args.host}:{args.port}")
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # Close the store on terminate too
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Numerically stable least-squares fits of the plane model.
+
+The features are centered and scaled before solving, so the raw grams and
+pounds never enter a normal-equation inverse (which squares the condition
+number).  Single fits use a QR factorization; batched fits reduce each model
+to centered 3x3 moment matrices of standardized data and solve all of them
+in one stacked call.  Every fit returns ``[b0, b_mass, b_pull]`` in original
+units, like ``theta_best``.
+"""
+import numpy as np
+
+RCOND = 1e-12  # Relative singular-value cutoff for rank-deficient fits
+
+
+def _standardize(X, y):
+    Z = np.c_[np.asarray(X, dtype=float), np.asarray(y, dtype=float)]
+    center = Z.mean(axis=0) if len(Z) else np.zeros(Z.shape[1])
+    scale = Z.std(axis=0) if len(Z) else np.ones(Z.shape[1])
+    scale[~(scale > 0)] = 1.0
+    return (Z - center) / scale, center, scale
+
+
+def _to_original(slopes_z, center, scale, intercept_z=0.0):
+    # Map slopes/intercept fitted on standardized data back to [b0, b_mass, b_pull]
+    slopes = slopes_z * scale[-1] / scale[:-1]
+    b0 = center[-1] + scale[-1] * intercept_z - slopes @ center[:-1]
+    return np.r_[b0, slopes]
+
+
+def fit(X, y):
+    # Single fit via QR of the standardized design; SVD fallback when rank deficient
+    Z, center, scale = _standardize(X, y)
+    A = np.c_[np.ones(len(Z)), Z[:, :-1]]
+    Q, R = np.linalg.qr(A)
+    diag = np.abs(np.diag(R))
+    if len(Z) >= A.shape[1] and diag.min() > RCOND * diag.max():
+        coef = np.linalg.solve(R, Q.T @ Z[:, -1])
+    else:
+        coef = np.linalg.lstsq(A, Z[:, -1], rcond=RCOND)[0]
+    return _to_original(coef[1:], center, scale, coef[0])
+
+
+def _solve_moments(count, mean, second, center, scale):
+    # count (g,), mean (g, 3), second (g, 3, 3) raw moments of standardized data
+    cov = second - mean[:, :, None] * mean[:, None, :]
+    Sxx = cov[:, :2, :2]
+    Sxy = cov[:, :2, 2]
+    # Rescale each group's feature block to unit diagonal before solving
+    d = np.sqrt(np.clip(np.einsum('gii->gi', Sxx), 0, None))
+    d[~(d > 0)] = 1.0
+    Sxx_s = Sxx / (d[:, :, None] * d[:, None, :])
+    good = (count >= 3) & np.all(np.isfinite(Sxx_s), axis=(1, 2))
+    good[good] &= np.linalg.cond(Sxx_s[good]) < 1 / RCOND
+    slopes_s = np.full((len(count), 2), np.nan)
+    if good.any():
+        slopes_s[good] = np.linalg.solve(Sxx_s[good], (Sxy[good] / d[good])[:, :, None])[:, :, 0]
+    bad = ~good & (count > 0)
+    if bad.any():
+        slopes_s[bad] = (np.linalg.pinv(Sxx_s[bad], rcond=RCOND) @ (Sxy[bad] / d[bad])[:, :, None])[:, :, 0]
+    slopes_z = slopes_s / d
+    intercept_z = mean[:, 2] - np.einsum('gi,gi->g', slopes_z, mean[:, :2])
+    slopes = slopes_z * scale[-1] / scale[:-1]
+    b0 = center[-1] + scale[-1] * intercept_z - slopes @ center[:-1]
+    return np.c_[b0, slopes]
+
+
+def fit_weighted(X, y, weights):
+    # One model per row of weights (g, n): case weights, bootstrap counts or
+    # 0/1 masks.  All g fits come from two matrix products and one stacked solve.
+    Z, center, scale = _standardize(X, y)
+    W = np.atleast_2d(np.asarray(weights, dtype=float))
+    count = W.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (W @ Z) / count[:, None]
+        outer = (Z[:, :, None] * Z[:, None, :]).reshape(len(Z), 9)
+        second = ((W @ outer) / count[:, None]).reshape(-1, 3, 3)
+    return _solve_moments(count, mean, second, center, scale)
+
+
+def fit_groups(X, y, codes, n_groups=None):
+    # One model per integer group code (season, launcher configuration, ...)
+    Z, center, scale = _standardize(X, y)
+    codes = np.asarray(codes, dtype=np.intp)
+    if n_groups is None:
+        n_groups = int(codes.max()) + 1 if codes.size else 0
+    count = np.bincount(codes, minlength=n_groups).astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.stack([np.bincount(codes, Z[:, i], n_groups) for i in range(3)], axis=1) / count[:, None]
+        D = Z - mean[codes]  # Two-pass: center within each group first
+        second = np.empty((n_groups, 3, 3))
+        for i in range(3):
+            for j in range(i, 3):
+                second[:, i, j] = second[:, j, i] = np.bincount(codes, D[:, i] * D[:, j], n_groups) / count
+    # Moments above are already centered within the group
+    second = second + mean[:, :, None] * mean[:, None, :]
+    return _solve_moments(count, mean, second, center, scale)
+
+
+def bootstrap_weights(n, resamples, rng=None):
+    # (resamples, n) resampling counts; each row is one bootstrap dataset
+    rng = np.random.default_rng(rng)
+    return rng.multinomial(n, np.full(n, 1.0 / n), size=resamples).astype(float)
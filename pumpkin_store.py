@@ -0,0 +1,413 @@
+"""Append-only journaled storage for the shot log.
+
+Edits are appended to ``<data file>.journal`` as JSON lines instead of
+rewriting the whole CSV.  Appends are fsync'd in batches by a background
+thread, which also compacts the journal into ``<data file>.snapshot`` once it
+grows.  At startup the snapshot is loaded and the journal replayed on top; if
+neither exists, the plain CSV is imported.  The plain
+``mass(g), pull strength(lbs), distance feet`` CSV stays the import/export
+format and is rewritten after every compaction; the snapshot records which
+file and size that export was, so rows other tools append to the CSV while
+the program is closed can be picked up at the next start.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+from pumpkin_model import MASS_COL, PULL_COL, DIST_COL
+from pumpkin_profile import span
+
+COLUMNS = [MASS_COL, PULL_COL, DIST_COL]
+
+
+def _fsync_replace(tmp_path, path):
+    # Atomically move a fully written temp file into place
+    with open(tmp_path, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ShotStore:
+    def __init__(self, csv_path, sync_every=32, sync_interval=0.5, compact_after=2000, retry_after=10.0):
+        self.csv_path = csv_path
+        self.journal_path = csv_path + '.journal'
+        self.snapshot_path = csv_path + '.snapshot'
+        self.sync_every = sync_every        # pending records that force an fsync
+        self.sync_interval = sync_interval  # max seconds an append stays un-fsync'd
+        self.compact_after = compact_after  # journal records before compaction
+        self.retry_after = retry_after      # seconds before a failed compaction is retried
+
+        self.rows = {}      # id -> (mass, pull, distance)
+        self.next_id = 0
+        self.seq = 0        # sequence number of the last journal record
+        self._journal = None
+        self._journal_records = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._closed = False
+        self._worker = None
+        self.exported = None  # (st_dev, st_ino, st_size) of our last CSV export
+        self.error = None     # Last background sync/compaction failure, None once one succeeds
+        self._retry_at = 0.0
+        self._export_failed = False  # Compact again (after retry_after) until the CSV is exported
+        # ((st_dev, st_ino), size, mtime_ns) of the CSV when whoever follows it
+        # for rows other tools append (CsvTail.stamp) last put them in the
+        # store.  While set, the CSV is only rewritten when it is still in
+        # that state or is still our own export.
+        self.csv_seen = None
+
+    # --- Startup ---
+    def load(self):
+        # Returns the shot log as a DataFrame indexed by stable row id
+        snap_seq = -1
+        if os.path.exists(self.snapshot_path):
+            snap_seq = self._read_snapshot()
+            self.seq = snap_seq
+        replayed = self._replay_journal(snap_seq)
+        imported = snap_seq < 0 and not replayed and os.path.exists(self.csv_path)
+        if imported:
+            self.import_csv(self.csv_path)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        if imported:
+            self.compact()  # Persist the imported rows before any edit is journaled
+        self._worker = threading.Thread(target=self._run, name='shot-store', daemon=True)
+        self._worker.start()
+        return self.to_frame()
+
+    def files(self):
+        # Everything load() reads, for content hashing
+        return [self.snapshot_path, self.journal_path, self.csv_path]
+
+    def _read_snapshot(self):
+        import pandas as pd  # Deferred: pandas is slow to import
+        with open(self.snapshot_path, encoding='utf-8') as f:
+            meta = json.loads(f.readline())
+            snap = pd.read_csv(f)
+        self.next_id = meta['next_id']
+        self.exported = tuple(meta['exported']) if meta.get('exported') else None
+        ids = snap['id'].tolist()
+        values = snap[COLUMNS].itertuples(index=False, name=None)
+        self.rows = dict(zip(ids, values))
+        return meta['seq']
+
+    def last_export(self):
+        # self.exported; before load() it is read from the snapshot header
+        # alone, so a file watcher can check the CSV without parsing the rows
+        if self._journal is None and self.exported is None:
+            try:
+                with open(self.snapshot_path, encoding='utf-8') as f:
+                    exported = json.loads(f.readline()).get('exported')
+            except (OSError, ValueError):
+                return None
+            self.exported = tuple(exported) if exported else None
+        return self.exported
+
+    def _read_journal(self):
+        # Returns the parseable records and the byte offset just past the
+        # last of them.  A torn final record (crash mid-append) ends the read;
+        # a bad line in the middle is skipped with a warning, and a line that
+        # an older version glued onto a torn fragment still yields its record.
+        records, good_end = [], 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                torn = not line.endswith(b'\n')
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    start = line.rfind(b'{"op": ')
+                    try:
+                        rec = json.loads(line[start:]) if start > 0 else None
+                    except ValueError:
+                        rec = None
+                if rec is None or torn:
+                    if not torn:
+                        print(f"Shot store: skipping a damaged record in {self.journal_path}", file=sys.stderr)
+                        good_end = f.tell()
+                    continue
+                records.append(rec)
+                good_end = f.tell()
+        return records, good_end
+
+    def _replay_journal(self, after_seq):
+        if not os.path.exists(self.journal_path):
+            return False
+        records, good_end = self._read_journal()
+        if good_end < os.path.getsize(self.journal_path):
+            # Cut the torn tail off before anything is appended after it
+            with open(self.journal_path, 'rb+') as f:
+                f.truncate(good_end)
+                os.fsync(f.fileno())
+        replayed = False
+        for rec in records:
+            self._journal_records += 1
+            if rec['seq'] <= after_seq:
+                continue
+            self._apply(rec)
+            self.seq = rec['seq']
+            replayed = True
+        return replayed
+
+    def _apply(self, rec):
+        op = rec['op']
+        if op in ('add', 'update'):
+            self.rows[rec['id']] = tuple(rec['row'])
+            self.next_id = max(self.next_id, rec['id'] + 1)
+        elif op == 'delete':
+            for i in rec['ids']:
+                self.rows.pop(i, None)
+        elif op == 'txn':
+            for i, row in zip(rec['ids'], rec['rows']):
+                if row is None:
+                    self.rows.pop(i, None)
+                else:
+                    self.rows[i] = tuple(row)
+                    self.next_id = max(self.next_id, i + 1)
+        elif op == 'reserve':
+            self.next_id = max(self.next_id, rec['next_id'])
+
+    # --- Edits ---
+    def new_id(self):
+        return self.new_ids(1)[0]
+
+    def new_ids(self, count):
+        # Reserve row ids up front (e.g. to show rows before they are saved).
+        # The reservation is journaled, so ids handed out before a crash are
+        # not handed out again after it.
+        with self._lock:
+            start = self.next_id
+            self._append({'op': 'reserve', 'next_id': start + count})
+        return list(range(start, start + count))
+
+    def add(self, mass, pull, distance, row_id=None):
+        with self._lock:
+            if row_id is None:
+                row_id = self.next_id
+            self._append({'op': 'add', 'id': row_id, 'row': [mass, pull, distance]})
+        return row_id
+
+    def add_many(self, rows):
+        # Journal a block of new shots as one record; returns their ids
+        rows = [[float(m), float(p), float(d)] for m, p, d in rows]
+        with self._lock:
+            ids = list(range(self.next_id, self.next_id + len(rows)))
+            self._append({'op': 'txn', 'ids': ids, 'rows': rows})
+        return ids
+
+    def replace_all(self, rows):
+        # Swap the whole shot log (e.g. the CSV was rewritten by another tool),
+        # also as one record
+        rows = [[float(m), float(p), float(d)] for m, p, d in rows]
+        with self._lock:
+            gone = list(self.rows)
+            ids = list(range(self.next_id, self.next_id + len(rows)))
+            self._append({'op': 'txn', 'ids': gone + ids, 'rows': [None] * len(gone) + rows})
+        return ids
+
+    def update(self, row_id, mass, pull, distance):
+        with self._lock:
+            if row_id not in self.rows:
+                raise KeyError(row_id)
+            self._append({'op': 'update', 'id': row_id, 'row': [mass, pull, distance]})
+
+    def delete(self, row_ids):
+        with self._lock:
+            self._append({'op': 'delete', 'ids': [int(i) for i in row_ids]})
+
+    def commit(self, ids, rows, added=None):
+        # Journal a transaction as a single record, so a crash keeps all of it
+        # or none.  rows[i] is the new (mass, pull, distance) of ids[i]; None
+        # or a NaN row deletes it, any other id is added or overwritten.
+        # With added flags, an id that is neither flagged nor present any more
+        # is skipped instead of being brought back.
+        ids = [int(i) for i in ids]
+        rows = [None if row is None or row[0] != row[0] else [float(v) for v in row] for row in rows]
+        with self._lock:
+            if added is not None:
+                kept = [k for k, (i, new) in enumerate(zip(ids, added)) if new or i in self.rows]
+                ids, rows = [ids[k] for k in kept], [rows[k] for k in kept]
+            self._append({'op': 'txn', 'ids': ids, 'rows': rows})
+
+    def _append(self, rec):
+        # Caller holds the lock.  Journaled before it is applied, so a failed
+        # write leaves the rows as they were
+        rec['seq'] = self.seq + 1
+        self._journal.write(json.dumps(rec) + '\n')
+        self.seq += 1
+        self._apply(rec)
+        self._journal_records += 1
+        self._pending += 1
+        if self._pending >= self.sync_every or self._journal_records >= self.compact_after:
+            self._wake.notify()
+
+    # --- Durability ---
+    def flush(self):
+        # Force pending journal records to disk
+        self._sync()
+
+    def _sync(self):
+        # Hand the records to the OS under the lock, but fsync outside it so
+        # edits are not held up by a slow disk
+        with self._lock:
+            if not self._pending or self._journal is None:
+                return
+            self._journal.flush()
+            fd = os.dup(self._journal.fileno())  # Stays valid if compaction swaps the journal
+            self._pending = 0
+        try:
+            with span('store.fsync'):
+                os.fsync(fd)
+        except OSError:
+            with self._lock:
+                self._pending += 1  # Try again next round
+            raise
+        finally:
+            os.close(fd)
+
+    def compact(self):
+        # Write a snapshot of the current rows and start a fresh journal
+        self._sync()
+        with self._lock:
+            rows = dict(self.rows)
+            seq, next_id = self.seq, self.next_id
+        frame = self._frame(rows)
+        # Export first so the snapshot can record which CSV holds these rows.
+        # A failed export (e.g. the CSV is open in Excel on Windows) does not
+        # stop the snapshot, which then keeps pointing at the previous export.
+        try:
+            self.export_csv(self.csv_path, frame)
+            export_error = None
+        except OSError as exc:
+            export_error = exc
+
+        tmp = self.snapshot_path + '.tmp'
+        with span('store.snapshot'), open(tmp, 'w', encoding='utf-8', newline='') as f:
+            exported = list(self.exported) if self.exported else None
+            f.write(json.dumps({'seq': seq, 'next_id': next_id, 'exported': exported}) + '\n')
+            frame.rename_axis('id').reset_index().to_csv(f, index=False)
+        _fsync_replace(tmp, self.snapshot_path)
+
+        # Keep only records newer than the snapshot in the journal
+        with self._lock:
+            self._journal.flush()  # The kept records are fsync'd with the new journal
+            self._pending = 0
+            self._journal.close()
+            kept = [rec for rec in self._read_journal()[0] if rec['seq'] > seq]
+            tmp = self.journal_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(rec) + '\n' for rec in kept)
+            _fsync_replace(tmp, self.journal_path)
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            self._journal_records = len(kept)
+        self._export_failed = export_error is not None
+        if export_error is not None:
+            raise export_error
+
+    def _run(self):
+        # Background fsync batching and compaction.  A failure is reported
+        # (self.error and stderr) and retried instead of ending the thread;
+        # the journal keeps every edit in the meantime.
+        while True:
+            with self._lock:
+                self._wake.wait(self.sync_interval)
+                if self._closed:
+                    return
+                due = self._journal_records >= self.compact_after or self._export_failed
+                needs_compaction = due and time.monotonic() >= self._retry_at
+            try:
+                self._sync()
+                if needs_compaction:
+                    self.compact()
+            except Exception as exc:
+                if self.error is None or str(self.error) != str(exc):
+                    print(f"Shot store: {exc} (will retry)", file=sys.stderr)
+                self.error = exc
+                self._retry_at = time.monotonic() + self.retry_after
+            else:
+                if needs_compaction or not due:
+                    self.error = None
+
+    def close(self):
+        if self._worker is None:
+            return
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self._worker.join()
+        self._worker = None
+        try:
+            # Nothing since the last compaction: leave the files (and so the
+            # startup cache's content hash) as they are
+            if self._journal_records or self._export_failed:
+                self.compact()
+        finally:
+            self._journal.close()
+
+    # --- Import/export in the plain CSV format ---
+    def _frame(self, rows):
+        import pandas as pd
+        frame = pd.DataFrame.from_dict(rows, orient='index', columns=COLUMNS)
+        return frame.sort_index()
+
+    def to_frame(self):
+        with self._lock:
+            return self._frame(self.rows)
+
+    def import_csv(self, path):
+        # Journal every row of a plain CSV as a new shot; returns the new ids
+        import pandas as pd
+        data = pd.read_csv(path, usecols=COLUMNS)
+        with self._lock:
+            ids = []
+            for m, p, d in data[COLUMNS].itertuples(index=False, name=None):
+                ids.append(self.next_id)
+                rec = {'op': 'add', 'id': self.next_id, 'row': [float(m), float(p), float(d)]}
+                if self._journal is None:
+                    # Still loading: the import is captured by the first snapshot
+                    self.seq += 1
+                    rec['seq'] = self.seq
+                    self._apply(rec)
+                else:
+                    self._append(rec)
+        return ids
+
+    def export_csv(self, path, frame=None):
+        if frame is None:
+            frame = self.to_frame()
+        tmp = path + '.tmp'
+        with span('store.export_csv'):
+            frame[COLUMNS].to_csv(tmp, index=False)
+        st = os.stat(tmp)  # Before the rename, so later appends by others are not counted
+        if path != self.csv_path:
+            _fsync_replace(tmp, path)
+            return
+        try:
+            self._check_unseen()
+        except OSError:
+            os.remove(tmp)
+            raise
+        # Set before the rename: a tail read in between must see our own rewrite
+        previous, self.exported = self.exported, (st.st_dev, st.st_ino, st.st_size)
+        try:
+            _fsync_replace(tmp, path)
+        except OSError:
+            self.exported = previous
+            raise
+
+    def _check_unseen(self):
+        # Raises OSError when the CSV changed since the follower's last read
+        # (e.g. rows appended): replacing it now would drop them.  The export
+        # is then retried like any failed one, by which time they are read in.
+        if self.csv_seen is None:
+            return
+        try:
+            st = os.stat(self.csv_path)
+        except FileNotFoundError:
+            return
+        identity = (st.st_dev, st.st_ino)
+        ours = self.exported is not None and tuple(self.exported) == identity + (st.st_size,)
+        seen = self.csv_seen == (identity, st.st_size, st.st_mtime_ns)
+        if not (ours or seen):
+            raise OSError(f"{os.path.basename(self.csv_path)} has changes that were not read in yet")
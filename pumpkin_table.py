@@ -0,0 +1,171 @@
+"""Virtualized view of the shot log on top of a ttk.Treeview.
+
+Only the rows in the visible window exist as Treeview items; scrolling
+re-renders the window, and edits touch only the affected items.  Item iids
+are the stable row ids from the data store, so deleting a row never renumbers
+the others.
+"""
+import bisect
+import heapq
+from tkinter import ttk
+
+
+class VirtualTable:
+    def __init__(self, tree, vscroll, columns):
+        self.tree = tree
+        self.vscroll = vscroll
+        self.columns = list(columns)
+        self.ids = []        # All row ids, ascending
+        self.values = {}     # id -> tuple of display values
+        self.selected = set()
+        self.marked = set()  # Row ids drawn with the 'marked' tag
+        self.top = 0         # Index into self.ids of the first visible row
+        self.visible = 20    # Rows that fit, updated on <Configure>
+
+        style = ttk.Style()
+        self.rowheight = int(style.lookup(str(tree.cget('style')) or 'Treeview', 'rowheight') or 20)
+
+        tree.configure(yscrollcommand='')
+        vscroll.config(command=self.yview)
+        tree.bind('<Configure>', self._on_configure, add='+')
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+        tree.bind('<MouseWheel>', lambda e: self._wheel(-1 if e.delta > 0 else 1))
+        tree.bind('<Button-4>', lambda e: self._wheel(-1))  # X11 wheel up
+        tree.bind('<Button-5>', lambda e: self._wheel(1))   # X11 wheel down
+
+    # --- Data changes ---
+    def set_rows(self, frame):
+        # Load every row of a DataFrame indexed by row id
+        self.ids = [int(i) for i in frame.index]
+        self.values = dict(zip(self.ids, frame[self.columns].itertuples(index=False, name=None)))
+        self.selected &= set(self.ids)
+        self._render()
+
+    def upsert(self, row_id, values):
+        row_id = int(row_id)
+        if row_id not in self.values:
+            bisect.insort(self.ids, row_id)  # New ids are the largest: an append
+        self.values[row_id] = tuple(values)
+        iid = str(row_id)
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=self.values[row_id])
+        elif self._in_window(row_id):
+            self._render()
+        else:
+            self._update_scrollbar()
+
+    def upsert_many(self, row_ids, rows):
+        # Bulk upsert: one merge of the id list and one render
+        new = []
+        for row_id, values in zip(map(int, row_ids), rows):
+            if row_id not in self.values:
+                new.append(row_id)
+            self.values[row_id] = tuple(values)
+        if new:
+            self.ids = list(heapq.merge(self.ids, sorted(new)))
+        for iid in self.tree.get_children():
+            self.tree.item(iid, values=self.values[int(iid)])
+        self._render()
+
+    def remove(self, row_ids):
+        gone = {row_id for row_id in map(int, row_ids) if self.values.pop(row_id, None) is not None}
+        if not gone:
+            return
+        # One pass over the ids from the first removed one, however many go
+        first = bisect.bisect_left(self.ids, min(gone))
+        self.ids[first:] = [i for i in self.ids[first:] if i not in gone]
+        self.selected -= gone
+        if first < self.top + self.visible:
+            self._render()
+        else:
+            self._update_scrollbar()
+
+    def set_marked(self, row_ids):
+        # Highlight these rows (configure the look with tree.tag_configure('marked', ...));
+        # only the visible items are re-tagged
+        self.marked = set(map(int, row_ids))
+        for iid in self.tree.get_children():
+            self.tree.item(iid, tags=self._tags(int(iid)))
+
+    def _tags(self, row_id):
+        return ('marked',) if row_id in self.marked else ()
+
+    # --- Selection (kept for rows outside the window too) ---
+    def selection(self):
+        return [str(i) for i in sorted(self.selected)]
+
+    def selection_set(self, row_id):
+        self.selected = {int(row_id)}
+        self.see(row_id)
+        self._render()
+
+    def _on_select(self, event=None):
+        # Fires <<TableSelect>> only when the user's selection actually changed,
+        # not when scrolling re-selects rows coming into view
+        shown = {int(iid) for iid in self.tree.get_children()}
+        selected = (self.selected - shown) | {int(iid) for iid in self.tree.selection()}
+        if selected != self.selected:
+            self.selected = selected
+            self.tree.event_generate('<<TableSelect>>')
+
+    # --- Scrolling ---
+    def see(self, row_id):
+        i = bisect.bisect_left(self.ids, int(row_id))
+        if i < self.top:
+            self._scroll_to(i)
+        elif i >= self.top + self.visible:
+            self._scroll_to(i - self.visible + 1)
+
+    def yview(self, *args):
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * len(self.ids)))
+        elif args[0] == 'scroll':
+            step = int(args[1]) * (self.visible if args[2] == 'pages' else 1)
+            self._scroll_to(self.top + step)
+
+    def _wheel(self, direction):
+        self._scroll_to(self.top + 3 * direction)
+        return 'break'
+
+    def _scroll_to(self, top):
+        top = max(0, min(top, len(self.ids) - self.visible))
+        if top != self.top:
+            self.top = top
+            self._render()
+
+    def _on_configure(self, event):
+        # One row's worth of height goes to the headings
+        visible = max(1, event.height // self.rowheight - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
+
+    # --- Rendering ---
+    def _in_window(self, row_id):
+        i = bisect.bisect_left(self.ids, row_id)
+        return self.top <= i < self.top + self.visible
+
+    def _render(self):
+        self.top = max(0, min(self.top, len(self.ids) - self.visible))
+        wanted = self.ids[self.top:self.top + self.visible]
+        wanted_iids = [str(i) for i in wanted]
+        keep = set(wanted_iids)
+        stale = [iid for iid in self.tree.get_children() if iid not in keep]
+        if stale:
+            self.tree.delete(*stale)
+        for pos, (row_id, iid) in enumerate(zip(wanted, wanted_iids)):
+            if self.tree.exists(iid):
+                self.tree.move(iid, '', pos)
+            else:
+                self.tree.insert('', pos, iid=iid, values=self.values[row_id], tags=self._tags(row_id))
+        shown_selected = [iid for iid in wanted_iids if int(iid) in self.selected]
+        if set(shown_selected) != set(self.tree.selection()):
+            self.tree.selection_set(shown_selected)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        n = len(self.ids)
+        if n == 0:
+            self.vscroll.set(0, 1)
+        else:
+            self.vscroll.set(self.top / n, min(1.0, (self.top + self.visible) / n))
@@ -0,0 +1,140 @@
+"""Tail-following reader for a shot log CSV that other tools append to.
+
+``CsvTail`` remembers the byte offset of the last complete line it parsed
+and reads only what was appended since.  A file that shrank, was replaced
+(new inode) or whose first bytes changed is reported as rewritten, and the
+caller reloads it in full.  ``changed()`` is a single ``os.stat`` so it can
+be polled from the Tk loop; the reads themselves belong on a worker.
+
+    tail = CsvTail('pumpkin 2025.csv')
+    rows = tail.read_all()            # (n, 3) mass, pull, distance
+    kind, rows = tail.read()          # ('append', new rows) or ('reload', None)
+
+After a restart, ``resume`` picks up from the store's last export so rows
+appended while nothing was following the file are not lost.
+"""
+import hashlib
+import io
+import os
+
+import numpy as np
+
+from pumpkin_model import MASS_COL, PULL_COL, DIST_COL
+
+COLUMNS = [MASS_COL, PULL_COL, DIST_COL]
+PROBE_BYTES = 4096  # Leading bytes hashed to notice in-place rewrites
+
+
+class CsvTail:
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0        # End of the last complete line parsed
+        self.header = None     # Column names from the first line
+        self.identity = None   # (st_dev, st_ino) of the file we are following
+        self.stamp = None      # (identity, size, mtime) seen by the last read
+        self._probe = (0, None)
+
+    def _prefix_hash(self, f, length):
+        f.seek(0)
+        return hashlib.blake2b(f.read(length), digest_size=16).digest()
+
+    def rebase(self, offset=None):
+        # Follow the file as it is now, treating everything before offset
+        # (default: the last complete line) as already ingested
+        with open(self.path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            first = f.readline()
+            self.header = [c.strip() for c in first.decode('utf-8-sig').split(',')]
+            if offset is None:
+                f.seek(0)
+                data = f.read(st.st_size)
+                offset = data.rfind(b'\n') + 1
+            offset = max(offset, len(first) if first.endswith(b'\n') else 0)
+            length = min(PROBE_BYTES, offset)
+            self._probe = (length, self._prefix_hash(f, length))
+        self.offset = offset
+        self.identity = (st.st_dev, st.st_ino)
+        self.stamp = (self.identity, st.st_size, st.st_mtime_ns)
+
+    def changed(self):
+        # Cheap check for the polling loop: anything to read (or reload)?
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return ((st.st_dev, st.st_ino), st.st_size, st.st_mtime_ns) != self.stamp
+
+    def _parse(self, data):
+        # Complete CSV lines -> (n, 3) float array; malformed lines are skipped
+        import pandas as pd
+        if not data:
+            return np.empty((0, 3))
+        names = self.header if self.header and all(c in self.header for c in COLUMNS) else COLUMNS
+        frame = pd.read_csv(io.BytesIO(data), header=None, names=names, usecols=COLUMNS,
+                            on_bad_lines='skip', skip_blank_lines=True)
+        values = frame[COLUMNS].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        return values[np.isfinite(values).all(axis=1)]
+
+    def read_all(self):
+        # Parse the whole file and follow it from its end; returns (n, 3) rows
+        self.rebase(0)
+        return self._read_new()
+
+    def read(self, exported=None):
+        # ('append', rows) with only the rows added since the last read, or
+        # ('reload', None) when the file was truncated or rewritten.
+        # exported: (st_dev, st_ino, st_size) of a rewrite we made ourselves,
+        # which is followed from that size instead of being reloaded.
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return 'append', np.empty((0, 3))
+        identity = (st.st_dev, st.st_ino)
+        if identity != self.identity:
+            if exported is None or tuple(exported[:2]) != identity:
+                return 'reload', None
+            self.rebase(exported[2])
+        if st.st_size < self.offset:
+            return 'reload', None
+        length, digest = self._probe
+        with open(self.path, 'rb') as f:
+            if self._prefix_hash(f, length) != digest:
+                return 'reload', None
+        return 'append', self._read_new()
+
+    def resume(self, exported, known):
+        # First read after a restart.  exported: the store's last export as
+        # saved with its snapshot; rows appended after it are new.  A file
+        # that is not that export is compared with the rows the store holds
+        # (known, (n, 3) in CSV order): if it extends them, the extra rows
+        # count as appended, otherwise it was rewritten ('reload').
+        kind, rows = self.read(exported)
+        if kind == 'append':
+            return kind, rows
+        rows = self.read_all()
+        n = len(known)
+        if len(rows) >= n and np.allclose(rows[:n], known, rtol=1e-12, atol=0):
+            return 'append', rows[n:]
+        return 'reload', None
+
+    def checkpoint(self):
+        # Where the reader is; rewind() to it when the rows read could not be stored
+        return dict(vars(self))
+
+    def rewind(self, checkpoint):
+        vars(self).update(checkpoint)
+
+    def _read_new(self):
+        with open(self.path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            f.seek(self.offset)
+            data = f.read(max(0, st.st_size - self.offset))
+        end = data.rfind(b'\n') + 1  # A partly written last line waits for the next read
+        rows = self._parse(data[:end])
+        self.offset += end
+        if self._probe[0] < PROBE_BYTES:
+            with open(self.path, 'rb') as f:
+                length = min(PROBE_BYTES, self.offset)
+                self._probe = (length, self._prefix_hash(f, length))
+        self.stamp = (self.identity, st.st_size, st.st_mtime_ns)
+        return rows
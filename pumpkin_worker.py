@@ -0,0 +1,102 @@
+"""Background worker that keeps slow model work off the Tk main loop.
+
+Edits are queued from the GUI and applied on a worker thread.  Everything
+queued while the worker was busy is coalesced into one batch, so a burst of
+edits costs one refit/save/render job.  Results go back through a queue that
+the GUI drains with ``root.after`` polling, and only the newest result is
+published.  A batch that fails is rolled back by apply_batch, which raises
+``BatchError`` with the edits that still need applying.
+"""
+import queue
+import threading
+
+
+class BatchError(Exception):
+    # Raised by apply_batch after rolling a failed batch back; edits are the
+    # ones that did not go through, for on_error to offer a retry
+    def __init__(self, edits, cause):
+        super().__init__(str(cause))
+        self.edits = list(edits)
+        self.cause = cause
+
+
+class ModelWorker:
+    def __init__(self, root, apply_batch, on_result, on_error=None, poll_ms=50):
+        # apply_batch(edits) runs on the worker thread and returns a result,
+        # or None when the batch changed nothing worth publishing;
+        # on_result(version, result) and on_error(exc) run on the Tk thread
+        self.root = root
+        self.apply_batch = apply_batch
+        self.on_result = on_result
+        self.on_error = on_error
+        self.poll_ms = poll_ms
+        self.submitted = 0   # Version of the newest queued edit
+        self.published = 0   # Version of the newest edit reflected in on_result
+        self._edits = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='model-worker', daemon=True)
+        self._thread.start()
+        self._poll_id = root.after(poll_ms, self._poll)
+
+    @property
+    def pending(self):
+        # Edits queued or in flight that the displayed model does not include yet
+        return self.submitted - self.published
+
+    def submit(self, edit):
+        self.submitted += 1
+        self._edits.put((self.submitted, edit))
+        return self.submitted
+
+    def _run(self):
+        while True:
+            item = self._edits.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while True:  # Coalesce everything queued meanwhile
+                try:
+                    item = self._edits.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            version = batch[-1][0]
+            try:
+                self._results.put((version, self.apply_batch([edit for _, edit in batch]), None))
+            except Exception as exc:  # Reported on the Tk thread
+                self._results.put((version, None, exc))
+            if stop:
+                return
+
+    def _poll(self):
+        self._deliver()
+        self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _deliver(self):
+        latest = None
+        while True:
+            try:
+                version, result, exc = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if exc is not None:
+                if self.on_error is not None:
+                    self.on_error(exc)
+            elif result is not None:
+                latest = (version, result)
+            self.published = max(self.published, version)
+        if latest is not None:
+            self.on_result(*latest)
+
+    def close(self):
+        # Finish every queued edit, then publish the final result
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._edits.put(None)
+        self._thread.join()
+        self._deliver()
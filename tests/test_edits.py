@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pumpkin_edits import EditHistory, check_transaction, parse_rows
+from pumpkin_store import ShotStore, COLUMNS
+
+NAN = [np.nan] * 3
+
+
+def apply(store, ids, rows):
+    # What the GUI does with a step: one store transaction
+    store.commit(ids, [None if np.isnan(r[0]) else r for r in np.asarray(rows, dtype=float)])
+
+
+def test_undo_redo_through_the_store(tmp_path):
+    path = str(tmp_path / 'shots.csv')
+    pd.DataFrame([(5000, 300, 100), (5100, 310, 110)], columns=COLUMNS).to_csv(path, index=False)
+    store = ShotStore(path)
+    original = store.load()
+    history = EditHistory()
+
+    # Update row 0, delete row 1 and add row 2 in one step
+    ids = [0, 1, 2]
+    before = [list(original.loc[0]), list(original.loc[1]), NAN]
+    after = [[1.0, 2.0, 3.0], NAN, [4.0, 5.0, 6.0]]
+    apply(store, ids, after)
+    history.record("Edit", ids, before, after)
+    edited = store.to_frame()
+
+    delta = history.undo()
+    apply(store, delta.ids, delta.before)
+    pd.testing.assert_frame_equal(store.to_frame(), original, check_dtype=False)
+    assert history.undo_label is None and history.redo_label == "Edit"
+
+    delta = history.redo()
+    apply(store, delta.ids, delta.after)
+    pd.testing.assert_frame_equal(store.to_frame(), edited, check_dtype=False)
+    store.close()
+    reopened = ShotStore(path)
+    pd.testing.assert_frame_equal(reopened.load(), edited, check_dtype=False)
+    reopened.close()
+
+
+def test_new_step_clears_redo_and_budget_drops_oldest():
+    history = EditHistory(max_rows=3)
+    history.record("a", [0], [NAN], [[1, 2, 3]])
+    history.record("b", [1, 2], [NAN, NAN], [[1, 2, 3], [4, 5, 6]])
+    assert history.undo().label == "b"
+    history.record("c", [3, 4], [NAN, NAN], [[1, 2, 3], [4, 5, 6]])
+    assert history.redo() is None
+    assert history.rows <= 3
+    assert history.undo().label == "c"
+    assert history.undo().label == "a"
+    assert history.undo() is None
+
+
+def test_check_transaction():
+    check_transaction([1, 2], [[1, 2, 3], NAN], [True, False])
+    check_transaction(None, [[1, 2, 3]], [True])
+    with pytest.raises(ValueError):
+        check_transaction([1, 2], [[1, 2, 3]], [True, True])
+    with pytest.raises(ValueError):
+        check_transaction([1], [[1, np.nan, 3]], [False])
+    with pytest.raises(ValueError):
+        check_transaction([1], [[1, 2]], [False])
+
+
+def test_parse_rows_skips_headers_and_bad_lines():
+    rows, skipped = parse_rows("mass,pull,distance\n5000\t300\t100\n1,2\n5100, 310, 110\n")
+    np.testing.assert_array_equal(rows, [[5000, 300, 100], [5100, 310, 110]])
+    assert skipped == 2
+
+
+def test_commit_skips_unflagged_missing_ids(tmp_path):
+    # A redo must not bring back a row that was deleted meanwhile
+    path = str(tmp_path / 'shots.csv')
+    pd.DataFrame([(5000 + i, 300, 100) for i in range(5)], columns=COLUMNS).to_csv(path, index=False)
+    store = ShotStore(path)
+    store.load()
+    store.delete([2])
+    store.commit([2, 50], [(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)], added=[False, True])
+    assert 2 not in store.rows
+    assert store.rows[50] == (4.0, 5.0, 6.0)
+    store.close()
@@ -0,0 +1,52 @@
+import numpy as np
+
+from pumpkin_influence import influence, cooks_limit
+from pumpkin_model import RunningFit, batch_theta
+
+
+def simulate(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.c_[rng.normal(5000, 300, n), rng.normal(300, 30, n)]
+    y = 1.0 + 0.01 * X[:, 0] + 0.3 * X[:, 1] + rng.normal(0, 5, n)
+    return X, y
+
+
+def diagnostics(X, y):
+    fit = RunningFit()
+    fit.reset(X, y)
+    return influence(X, y, fit.n, fit.mean, fit.comoment)
+
+
+def test_matches_brute_force_refits():
+    X, y = simulate(40)
+    y[7] += 60  # One clear outlier
+    diag = diagnostics(X, y)
+    A = np.c_[np.ones(len(y)), X]
+    theta = batch_theta(X, y)
+    n, p = A.shape
+    s2 = np.sum((y - A @ theta) ** 2) / (n - p)
+    H = A @ np.linalg.inv(A.T @ A) @ A.T
+    for i in range(n):
+        keep = np.arange(n) != i
+        theta_i = batch_theta(X[keep], y[keep])
+        s2_i = np.sum((y[keep] - A[keep] @ theta_i) ** 2) / (n - 1 - p)
+        cooks = np.sum((A @ theta - A @ theta_i) ** 2) / (p * s2)
+        studentized = (y[i] - A[i] @ theta) / np.sqrt(s2_i * (1 - H[i, i]))
+        np.testing.assert_allclose(diag.leverage[i], H[i, i], rtol=1e-9)
+        np.testing.assert_allclose(diag.cooks[i], cooks, rtol=1e-7)
+        np.testing.assert_allclose(diag.studentized[i], studentized, rtol=1e-7)
+    assert diag.flagged[7]
+
+
+def test_clean_data_flags_few_rows():
+    X, y = simulate(20_000, seed=1)
+    diag = diagnostics(X, y)
+    assert diag.flagged.mean() < 0.005  # |t| > 3 alone is ~0.27%
+    assert not (diag.cooks > cooks_limit(len(y))).any()
+
+
+def test_cooks_limit_without_scipy(monkeypatch):
+    import pumpkin_influence
+    exact = cooks_limit(50)
+    monkeypatch.setattr(pumpkin_influence, '_stats', None)
+    assert abs(cooks_limit(50) / exact - 1) < 0.01
@@ -0,0 +1,14 @@
+import pytest
+
+import pumpkin_intervals
+from pumpkin_intervals import _quantile
+
+stats = pytest.importorskip('scipy.stats')
+
+
+@pytest.mark.parametrize('dof', [1, 2, 3, 4, 7, 30, 100, 101, 5000])
+@pytest.mark.parametrize('level', [0.8, 0.95, 0.99])
+def test_student_t_quantile_without_scipy(monkeypatch, level, dof):
+    monkeypatch.setattr(pumpkin_intervals, '_stats', None)
+    expected = stats.t.ppf(0.5 + level / 2, dof)
+    assert _quantile(level, dof) == pytest.approx(expected, rel=1e-9)
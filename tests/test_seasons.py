@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pumpkin_seasons import COLUMNS, expand_paths, load_seasons
+
+
+def test_directory_skips_csvs_that_are_not_seasons(tmp_path, capsys):
+    pd.DataFrame([(5000, 300, 100), (5100, 310, 110)], columns=COLUMNS).to_csv(tmp_path / 'pumpkin 2024.csv', index=False)
+    # Plan output (same columns, other order) and an error report (extra columns)
+    pd.DataFrame([(5000, 100, 300)], columns=[COLUMNS[0], COLUMNS[2], COLUMNS[1]]).to_csv(tmp_path / 'plan_out.csv', index=False)
+    pd.DataFrame([(5000, 300, 100, 1.5)], columns=COLUMNS + ['pull error %']).to_csv(tmp_path / 'errors.csv', index=False)
+    (tmp_path / 'notes.csv').write_bytes(b'\xff\xfe')
+
+    assert expand_paths(str(tmp_path)) == [str(tmp_path / 'pumpkin 2024.csv')]
+    assert 'plan_out.csv' in capsys.readouterr().err
+    data = load_seasons(str(tmp_path))
+    assert data.seasons == ['2024'] and len(data.arrays()[1]) == 2
+
+
+def test_exclude_and_explicit_files(tmp_path):
+    season = tmp_path / 'pumpkin 2024.csv'
+    pd.DataFrame([(5000, 300, 100)], columns=COLUMNS).to_csv(season, index=False)
+    assert expand_paths(str(tmp_path), exclude=[str(season)]) == []
+    plan = tmp_path / 'plan.csv'
+    plan.write_text('x\n1\n')
+    assert expand_paths([str(plan)]) == [str(plan)]  # Named files are taken as given
+
+
+def test_plan_never_trains_on_its_own_files(tmp_path, monkeypatch):
+    from pumpkin_model import predict_pull
+    from pumpkin_plan import fit_from_files, main
+    rng = np.random.default_rng(0)
+    mass, pull = rng.uniform(600, 1200, 20), rng.uniform(500, 900, 20)
+    dist = -30 - 0.14 * mass + 0.42 * pull + rng.normal(0, 5, 20)
+    pd.DataFrame(np.c_[mass, pull, dist], columns=COLUMNS).to_csv(tmp_path / 'pumpkin 2024.csv', index=False)
+    # Laid out like a season file, so it (and its output) would pass for one
+    pd.DataFrame([(900, 0, 150)], columns=COLUMNS).to_csv(tmp_path / 'plan.csv', index=False)
+    monkeypatch.chdir(tmp_path)
+    expected = predict_pull(fit_from_files('pumpkin 2024.csv'), 900, 150)
+    for _ in range(2):
+        main(['plan.csv', '--data', '.', '-o', 'out.csv'])
+        assert pd.read_csv('out.csv')[COLUMNS[1]][0] == pytest.approx(expected, abs=0.05)
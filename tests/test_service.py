@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from pumpkin_service import PredictionService, HTTPError
+from pumpkin_store import ShotStore, COLUMNS
+
+
+@pytest.fixture
+def service(tmp_path):
+    path = tmp_path / 'shots.csv'
+    rows = [(5000 + 7 * i % 13, 300 + 3 * i % 11, 100 + i) for i in range(20)]
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False)
+    service = PredictionService(ShotStore(str(path)))
+    service.load()
+    yield service
+    service.store.close()
+
+
+def test_bad_edit_rejects_the_whole_batch(service):
+    before = dict(service.store.rows)
+    version = service.model.version
+    with pytest.raises(HTTPError) as err:
+        service.apply_edits({'edits': [{'op': 'add', 'row': [1, 2, 3]},
+                                       {'op': 'txn', 'ids': [1, 2], 'rows': [[1, 2, 3]]}]})
+    assert err.value.status == 400
+    assert service.store.rows == before and service.model.version == version
+
+
+def test_txn_does_not_resurrect_deleted_rows(service):
+    service.apply_edits({'edits': [{'op': 'delete', 'ids': [5]}]})
+    service.apply_edits({'edits': [{'op': 'txn', 'ids': [5, 6], 'rows': [[1, 2, 3], [4, 5, 6]],
+                                    'added': [False, False]}]})
+    assert 5 not in service.store.rows
+    assert service.store.rows[6] == (4.0, 5.0, 6.0)
+    assert service.model.rows == service.fit.n == 19
+
+
+def test_add_with_a_taken_id_is_rejected(service):
+    theta = service.model.theta
+    for ids in ([3], [70, 70]):
+        with pytest.raises(HTTPError) as err:
+            service.apply_edits({'edits': [{'op': 'add', 'row': [1, 2, 3], 'id': i} for i in ids]})
+        assert err.value.status == 409
+    assert service.model.rows == service.fit.n == len(service.store.rows) == 20
+    assert (service.model.theta == theta).all()
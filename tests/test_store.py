@@ -0,0 +1,137 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pumpkin_store import ShotStore, COLUMNS
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'shots.csv'
+    rows = [(5000 + i, 300 + 2 * i, 100 + 3 * i) for i in range(10)]
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False)
+    return str(path)
+
+
+def test_journal_and_compaction_round_trip(csv_path):
+    store = ShotStore(csv_path, compact_after=5)
+    assert len(store.load()) == 10
+    ids = store.add_many([(1.0, 2.0, 3.0), (4.0, 5.0, 6.0)])
+    store.commit([0, ids[0]], [None, (7.0, 8.0, 9.0)])
+    store.update(1, 10.0, 11.0, 12.0)
+    expected = store.to_frame()
+    store.compact()
+    store.add(13.0, 14.0, 15.0)
+    expected.loc[store.next_id - 1] = (13.0, 14.0, 15.0)
+    store.close()
+
+    reopened = ShotStore(csv_path)
+    pd.testing.assert_frame_equal(reopened.load(), expected, check_dtype=False)
+    reopened.close()
+    # The CSV export matches as well
+    exported = pd.read_csv(csv_path)
+    np.testing.assert_allclose(exported[COLUMNS].values, expected.values)
+
+
+def test_journal_replay_after_crash(csv_path):
+    store = ShotStore(csv_path)
+    store.load()
+    store.commit([3], [(1.0, 1.0, 1.0)])
+    store.delete([4])
+    store.flush()  # No close(): the snapshot is stale and the journal has the edits
+    reopened = ShotStore(csv_path)
+    frame = reopened.load()
+    assert tuple(frame.loc[3]) == (1.0, 1.0, 1.0)
+    assert 4 not in frame.index
+    reopened.close()
+
+
+def test_reserved_ids_survive_a_crash(csv_path):
+    store = ShotStore(csv_path)
+    store.load()
+    reserved = store.new_ids(3)
+    store.flush()
+    reopened = ShotStore(csv_path)
+    reopened.load()
+    assert reopened.new_id() > max(reserved)
+    reopened.close()
+
+
+def test_failed_export_keeps_the_edits(csv_path, monkeypatch):
+    store = ShotStore(csv_path)
+    store.load()
+    store.add(1.0, 2.0, 3.0)
+
+    def locked(*args, **kwargs):
+        raise PermissionError("locked")
+
+    monkeypatch.setattr(store, 'export_csv', locked)
+    with pytest.raises(PermissionError):
+        store.compact()
+    monkeypatch.undo()
+    store.close()
+    reopened = ShotStore(csv_path)
+    assert len(reopened.load()) == 11
+    reopened.close()
+
+
+def test_torn_record_is_cut_before_new_appends(csv_path):
+    store = ShotStore(csv_path)
+    store.load()
+    store.commit([3], [(1.0, 1.0, 1.0)])
+    store.flush()
+    with open(store.journal_path, 'a') as f:
+        f.write('{"op": "txn", "ids": [10')  # Crash mid-append
+    reopened = ShotStore(csv_path)
+    reopened.load()
+    reopened.commit([2000], [(2.0, 2.0, 2.0)])
+    reopened.flush()
+    again = ShotStore(csv_path)
+    frame = again.load()
+    assert tuple(frame.loc[3]) == (1.0, 1.0, 1.0)
+    assert tuple(frame.loc[2000]) == (2.0, 2.0, 2.0)
+    again.close()
+
+
+def test_record_glued_onto_a_torn_fragment_is_recovered(csv_path):
+    # Journals written before torn tails were cut
+    store = ShotStore(csv_path)
+    store.load()
+    store.flush()
+    seq = store.seq
+    with open(store.journal_path, 'a') as f:
+        f.write('{"op": "txn", "ids": [10')
+        f.write(json.dumps({'op': 'txn', 'ids': [2000], 'rows': [[2.0, 2.0, 2.0]], 'seq': seq + 1}) + '\n')
+        f.write(json.dumps({'op': 'delete', 'ids': [0], 'seq': seq + 2}) + '\n')
+    reopened = ShotStore(csv_path)
+    frame = reopened.load()
+    assert tuple(frame.loc[2000]) == (2.0, 2.0, 2.0)
+    assert 0 not in frame.index
+    reopened.compact()  # Keeps the records after the damaged line too
+    reopened.close()
+    last = ShotStore(csv_path)
+    assert 2000 in last.load().index
+    last.close()
+
+
+def test_close_without_edits_leaves_the_files_alone(csv_path):
+    # The startup cache is keyed on the files' content
+    from pumpkin_model import data_digest
+    store = ShotStore(csv_path)
+    store.load()
+    store.close()
+    digest = data_digest(store.files())
+    reopened = ShotStore(csv_path)
+    reopened.load()
+    assert reopened.last_export() == store.exported
+    reopened.close()
+    assert data_digest(store.files()) == digest
+
+
+def test_last_export_before_load(csv_path):
+    store = ShotStore(csv_path)
+    store.load()
+    store.close()
+    assert ShotStore(csv_path).last_export() == store.exported
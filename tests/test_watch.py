@@ -0,0 +1,111 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pumpkin_store import ShotStore, COLUMNS
+from pumpkin_watch import CsvTail
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'shots.csv'
+    rows = [(5000 + i, 300 + 2 * i, 100 + 3 * i) for i in range(10)]
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False)
+    return str(path)
+
+
+def append(path, *rows):
+    with open(path, 'a') as f:
+        f.writelines(','.join(map(str, row)) + '\n' for row in rows)
+
+
+def restart(path):
+    store = ShotStore(path)
+    frame = store.load()
+    return store, CsvTail(path), frame[COLUMNS].values
+
+
+def test_rows_appended_while_closed_are_resumed(csv_path):
+    store, _, _ = restart(csv_path)
+    store.close()
+    append(csv_path, (5100, 333, 150), (5101, 334, 151))
+
+    store, tail, known = restart(csv_path)
+    kind, rows = tail.resume(store.exported, known)
+    assert kind == 'append'
+    np.testing.assert_array_equal(rows, [[5100, 333, 150], [5101, 334, 151]])
+    store.add_many(rows)
+    store.close()
+    assert len(pd.read_csv(csv_path)) == 12  # The export kept them
+
+
+def test_nothing_new_after_a_clean_restart(csv_path):
+    store, _, _ = restart(csv_path)
+    store.add(1.0, 2.0, 3.0)
+    store.close()
+    store, tail, known = restart(csv_path)
+    kind, rows = tail.resume(store.exported, known)
+    assert kind == 'append' and len(rows) == 0
+    store.close()
+
+
+def test_foreign_copy_that_extends_the_log_is_appended(csv_path):
+    store, _, _ = restart(csv_path)
+    store.close()
+    copy = csv_path + '.copy'
+    shutil.copy(csv_path, copy)  # New inode, as an editor saving the file would make
+    append(copy, (5200, 340, 160))
+    os.replace(copy, csv_path)
+
+    store, tail, known = restart(csv_path)
+    kind, rows = tail.resume(store.exported, known)
+    assert kind == 'append'
+    np.testing.assert_array_equal(rows, [[5200, 340, 160]])
+    store.close()
+
+
+def test_foreign_rewrite_is_reloaded(csv_path):
+    store, _, _ = restart(csv_path)
+    store.close()
+    pd.DataFrame([(1, 2, 3)], columns=COLUMNS).to_csv(csv_path + '.new', index=False)
+    os.replace(csv_path + '.new', csv_path)
+    store, tail, known = restart(csv_path)
+    assert tail.resume(store.exported, known) == ('reload', None)
+    store.close()
+
+
+def test_tail_follows_appends_and_our_own_export(csv_path):
+    store, tail, known = restart(csv_path)
+    tail.resume(store.exported, known)
+    append(csv_path, (5300, 350, 170))
+    assert tail.changed()
+    kind, rows = tail.read(store.exported)
+    assert kind == 'append' and len(rows) == 1
+    store.add_many(rows)
+    store.compact()  # Rewrites the CSV (new inode): our own export, not a reload
+    append(csv_path, (5301, 351, 171))
+    kind, rows = tail.read(store.exported)
+    assert kind == 'append'
+    np.testing.assert_array_equal(rows, [[5301, 351, 171]])
+    store.close()
+
+
+def test_export_waits_for_rows_not_read_in_yet(csv_path):
+    store, tail, known = restart(csv_path)
+    tail.resume(store.exported, known)
+    store.csv_seen = tail.stamp
+    store.add(1.0, 2.0, 3.0)
+    append(csv_path, (5400, 360, 180))  # After the last poll
+    with pytest.raises(OSError):
+        store.compact()
+    assert pd.read_csv(csv_path)[COLUMNS[0]].iloc[-1] == 5400
+
+    kind, rows = tail.read(store.exported)  # The next poll
+    store.add_many(rows)
+    store.csv_seen = tail.stamp
+    store.close()
+    exported = pd.read_csv(csv_path)
+    assert len(exported) == 12 and 5400 in exported[COLUMNS[0]].values